@@ -7,12 +7,20 @@
 =========================================
 """
 import os
+import json
+import time
 import tempfile
 import asyncio
-from flask import Flask, render_template, request, redirect, url_for, send_file, flash, jsonify, session
+import uuid
+from flask import Flask, Response, render_template, request, redirect, url_for, send_file, flash, jsonify, session
 from werkzeug.utils import secure_filename
 import sys
 import main
+from core.job_queue import JOB_FAILED, JOB_SUCCEEDED, JobQueue, JobQueueFullError
+from config.settings import LLM_STREAMING
+from core.progress import (STAGE_EXCEL_WRITTEN, STAGE_GENERATION_DONE, STAGE_GENERATION_STARTED, STAGE_REQUIREMENTS_LOADED,
+                           STAGE_RESPONSE_TRUNCATED)
+from core.tracing import METRICS, trace_span, traced_run
 
 # 从环境变量或配置文件获取端口
 PORT = int(os.environ.get('APP_PORT', 5000))
@@ -31,6 +39,70 @@ ALLOWED_EXTENSIONS = {'txt', 'md', 'docx'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def run_generation_job(params, progress):
+    """后台任务：探索页面、加载需求文档、生成测试用例并导出到Excel，各阶段通过progress报告进度"""
+    url = params.get('url', '')
+    requirement_files = params.get('requirement_files') or []
+
+    # 每个任务单独生成运行报告，各阶段耗时同时汇总到 /metrics
+    with traced_run('job', url=url) as tracer:
+        # 运行Web Explorer
+        with trace_span('explore', urls=1):
+            page_data = main.run_web_explorer_on_multiple_urls_sync(
+                [url],
+                username=params.get('username'),
+                password=params.get('password'),
+                cookies=params.get('cookies'),
+                progress=progress
+            )
+
+        # 加载需求文档，API提交的任务通过文本传递需求内容
+        requirements = dict(params.get('requirements_content') or {})
+        if requirement_files:
+            requirements.update(main.load_multiple_requirements(requirement_files))
+        progress.emit(STAGE_REQUIREMENTS_LOADED, f"已加载 {len(requirements)} 个需求文档", documents=len(requirements))
+
+        # 生成测试用例；开启LLM_STREAMING时使用流式响应，以便报告接收的token数和解析出的测试用例，测试用例统一由返回值处理
+        progress.emit(STAGE_GENERATION_STARTED, "开始生成测试用例", pages=len(page_data))
+        with trace_span('generate', pages=len(page_data)):
+            test_cases = asyncio.run(main.generate_test_cases_async(
+                page_data, requirements, params.get('include_old', False),
+                on_test_case=(lambda test_case: None) if LLM_STREAMING else None,
+                progress=progress
+            ))
+        # 流式响应中途断开时只有部分测试用例，不能作为成功的结果
+        if progress.count(STAGE_RESPONSE_TRUNCATED):
+            raise RuntimeError(f"AI响应中断，只生成了 {len(test_cases)} 个测试用例，请重试")
+        progress.emit(STAGE_GENERATION_DONE, f"已生成 {len(test_cases)} 个测试用例", test_cases=len(test_cases))
+
+        # 导出到Excel
+        output_file = main.export_to_excel(test_cases, [url], requirement_files)
+        progress.emit(STAGE_EXCEL_WRITTEN, "已导出Excel文件", output_file=output_file)
+
+    return {'output_file': output_file, 'test_cases': test_cases, 'report_file': tracer.report_path if tracer else None}
+
+# 后台任务队列，在处理第一个请求时启动，避免调试模式下重载器的监控进程也执行任务
+job_queue = JobQueue(run_generation_job)
+
+@app.before_request
+def ensure_job_queue_started():
+    job_queue.start()
+
+def job_summary(job):
+    """任务状态信息，不包含任务参数和测试用例"""
+    result = job.get('result') or {}
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'queue_position': job.get('queue_position'),
+        'error': job.get('error'),
+        'created_at': job['created_at'],
+        'started_at': job.get('started_at'),
+        'finished_at': job.get('finished_at'),
+        'test_case_count': len(result.get('test_cases') or []) if result else None,
+        'output_file': result.get('output_file')
+    }
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -47,14 +119,16 @@ def generate():
     show_browser = 'show_browser' in request.form
     include_old = 'include_old' in request.form
     
-    # 处理需求文件上传
+    # 处理需求文件上传，每次提交使用独立目录，避免并发提交的同名文件互相覆盖
     requirement_files = []
     if 'requirements' in request.files:
         files = request.files.getlist('requirements')
+        upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], uuid.uuid4().hex)
         for file in files:
             if file and file.filename and allowed_file(file.filename):
+                os.makedirs(upload_dir, exist_ok=True)
                 filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                filepath = os.path.join(upload_dir, filename)
                 file.save(filepath)
                 requirement_files.append(filepath)
     
@@ -93,54 +167,127 @@ def start_processing():
         return jsonify({'status': 'error', 'message': '会话已过期，请重新提交'})
     
     try:
-        # 准备参数
-        url = params.get('url', '')
-        username = params.get('username')
-        password = params.get('password')
-        cookies = params.get('cookies')
-        use_ai_login = params.get('use_ai_login', False)
-        requirement_files = params.get('requirement_files', [])
-        include_old = params.get('include_old', False)
-        
-        # 运行Web Explorer
-        page_data = main.run_web_explorer_on_multiple_urls_sync(
-            [url], 
-            username=username, 
-            password=password, 
-            cookies=cookies
-        )
-        
-        # 加载需求文档
-        requirements = {}
-        if requirement_files:
-            requirements = main.load_multiple_requirements(requirement_files)
-        
-        # 生成测试用例
-        test_cases = main.generate_test_cases(page_data, requirements, include_old)
-        
-        # 导出到Excel
-        output_file = main.export_to_excel(
-            test_cases, 
-            [url], 
-            requirement_files
-        )
-        
-        # 保存结果路径到会话
-        session['output_file'] = output_file
-        
-        return jsonify({'status': 'success', 'message': '测试用例生成成功！', 'output_file': output_file})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': f'处理过程中出错: {str(e)}'})
+        job_id = job_queue.submit(params)
+    except JobQueueFullError as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+    
+    # 参数已保存到任务中，从会话中移除登录凭据
+    session.pop('params', None)
+    session['job_id'] = job_id
+    
+    return jsonify({'status': 'queued', 'message': '任务已提交', 'job_id': job_id})
 
 @app.route('/download')
 def download():
-    output_file = session.get('output_file')
+    job = job_queue.get(session.get('job_id', ''))
+    output_file = (job.get('result') or {}).get('output_file') if job else None
     if not output_file or not os.path.exists(output_file):
         flash('文件不存在或已过期', 'error')
         return redirect(url_for('index'))
     
     return send_file(output_file, as_attachment=True)
 
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """API端点，提交后台生成任务，立即返回任务ID"""
+    data = request.json or {}
+    params = {
+        'url': data.get('url', ''),
+        'username': data.get('username'),
+        'password': data.get('password'),
+        'cookies': data.get('cookies'),
+        'requirements_content': data.get('requirements_content', {}),
+        'include_old': data.get('include_old', False)
+    }
+    
+    try:
+        job_id = job_queue.submit(params)
+    except JobQueueFullError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 429
+    
+    return jsonify({'status': 'queued', 'job_id': job_id}), 202
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """API端点，查询后台任务状态"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'status': 'error', 'message': '任务不存在'}), 404
+    
+    return jsonify(job_summary(job))
+
+@app.route('/api/jobs/<job_id>/events')
+def api_job_events(job_id):
+    """API端点，以Server-Sent Events推送任务进度，任务结束后发送done事件并关闭连接"""
+    if not job_queue.get(job_id):
+        return jsonify({'status': 'error', 'message': '任务不存在'}), 404
+    
+    # 断线重连时浏览器通过Last-Event-ID续传
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('after') or 0
+    try:
+        last_id = int(last_id)
+    except ValueError:
+        last_id = 0
+    
+    def stream(last_id):
+        last_sent = time.time()
+        while True:
+            # 先读状态再读事件：任务结束前写入的事件都能在结束前读到
+            job = job_queue.get(job_id)
+            for event in job_queue.store.events(job_id, last_id):
+                last_id = event['id']
+                last_sent = time.time()
+                yield f"id: {last_id}\nevent: progress\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if job['status'] in (JOB_SUCCEEDED, JOB_FAILED):
+                yield f"event: done\ndata: {json.dumps(job_summary(job), ensure_ascii=False)}\n\n"
+                return
+            if time.time() - last_sent > 15:
+                # 心跳注释，防止代理关闭空闲连接
+                last_sent = time.time()
+                yield ": keep-alive\n\n"
+            time.sleep(0.5)
+    
+    return Response(stream(last_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/jobs/<job_id>/result')
+def api_job_result(job_id):
+    """API端点，获取已完成任务生成的测试用例"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'status': 'error', 'message': '任务不存在'}), 404
+    if job['status'] == JOB_FAILED:
+        return jsonify({'status': 'error', 'message': f"处理过程中出错: {job['error']}"}), 500
+    if job['status'] != JOB_SUCCEEDED:
+        return jsonify({'status': job['status'], 'message': '任务尚未完成'}), 409
+    
+    result = job['result'] or {}
+    return jsonify({
+        'status': 'success',
+        'message': '测试用例生成成功！',
+        'test_cases': result.get('test_cases', []),
+        'output_file': result.get('output_file')
+    })
+
+@app.route('/api/jobs/<job_id>/download')
+def api_job_download(job_id):
+    """API端点，下载已完成任务导出的Excel文件"""
+    job = job_queue.get(job_id)
+    output_file = (job.get('result') or {}).get('output_file') if job else None
+    if not output_file or not os.path.exists(output_file):
+        return jsonify({'status': 'error', 'message': '文件不存在或任务尚未完成'}), 404
+    
+    return send_file(output_file, as_attachment=True)
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus格式的指标：各阶段耗时、token数、峰值内存和各状态的任务数"""
+    lines = [METRICS.render()]
+    lines.append('# TYPE aitestcase_jobs gauge\n')
+    for status, count in job_queue.store.count_by_status().items():
+        lines.append(f'aitestcase_jobs{{status="{status}"}} {count}\n')
+    return Response(''.join(lines), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/generate', methods=['POST'])
 async def api_generate():
     """API端点，允许通过API调用生成测试用例"""
@@ -165,7 +312,7 @@ async def api_generate():
         )
         
         # 生成测试用例
-        test_cases = main.generate_test_cases(page_data, requirements_content)
+        test_cases = await main.generate_test_cases_async(page_data, requirements_content)
         
         # 导出到Excel
         output_file = main.export_to_excel(
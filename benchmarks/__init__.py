@@ -0,0 +1,8 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:离线基准测试包，提供本地测试页面服务和模拟的AI接口
+=========================================
+"""
@@ -0,0 +1,158 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:模拟的OpenAI兼容接口，根据提示信息的哈希返回确定的测试用例，支持配置延迟和流式响应
+=========================================
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+PRIORITIES = ["高", "中", "低"]
+TEST_TYPES = ["功能测试", "UI测试"]
+
+
+def build_test_cases(prompt: str, count: int) -> List[Dict[str, Any]]:
+    """
+    根据提示信息生成确定的测试用例，同一提示信息每次返回相同结果
+
+    Args:
+        prompt (str): 提示信息
+        count (int): 测试用例数
+
+    Returns:
+        List[Dict[str, Any]]: 测试用例列表
+    """
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    test_cases = []
+    for index in range(1, count + 1):
+        value = seed + index
+        test_cases.append({
+            "test_id": f"TC{index:03d}",
+            "test_title": f"验证表单提交功能 {value % 1000}",
+            "priority": PRIORITIES[value % len(PRIORITIES)],
+            "preconditions": "用户已打开页面",
+            "test_steps": [f"在输入框中输入测试数据 {value % 100}", "点击提交按钮", "查看页面提示信息"],
+            "expected_results": ["输入框显示输入的内容", "表单提交成功", "页面显示操作成功提示"],
+            "test_data": f"data-{value % 10000}",
+            "test_type": TEST_TYPES[value % len(TEST_TYPES)]
+        })
+    return test_cases
+
+
+class _FakeLLMHandler(BaseHTTPRequestHandler):
+    latency_ms = 0
+    chunk_ms = 0
+    cases = 10
+    chunk_size = 40
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages") or []
+        prompt = "".join(str(message.get("content", "")) for message in messages)
+        content = json.dumps(build_test_cases(prompt, self.cases), ensure_ascii=False, indent=2)
+        model = body.get("model", "fake-model")
+
+        # 模拟首个token之前的延迟
+        time.sleep(self.latency_ms / 1000)
+        if body.get("stream"):
+            self._send_stream(content, model)
+        else:
+            self._send_completion(content, model, prompt)
+
+    def _send_completion(self, content: str, model: str, prompt: str) -> None:
+        payload = json.dumps({
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4
+            }
+        }, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, content: str, model: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        created = int(time.time())
+        pieces = [content[i:i + self.chunk_size] for i in range(0, len(content), self.chunk_size)]
+        for index, piece in enumerate(pieces):
+            if index and self.chunk_ms:
+                time.sleep(self.chunk_ms / 1000)
+            self._write_event({
+                "id": "chatcmpl-benchmark",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+            })
+        self._write_event({
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+        })
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _write_event(self, payload: Dict[str, Any]) -> None:
+        self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLLMServer:
+    """模拟的OpenAI兼容接口，在后台线程中运行，将 OPENAI_BASE_URL 指向 base_url 即可使用"""
+
+    def __init__(self, latency_ms: int = 0, chunk_ms: int = 0, cases: int = 10):
+        """
+        初始化模拟接口
+
+        Args:
+            latency_ms (int): 每个请求返回首个token之前的延迟（毫秒）
+            chunk_ms (int): 流式响应中相邻两段之间的延迟（毫秒）
+            cases (int): 每个响应中的测试用例数
+        """
+        handler = type("FakeLLMHandler", (_FakeLLMHandler,), {
+            "latency_ms": latency_ms,
+            "chunk_ms": chunk_ms,
+            "cases": cases
+        })
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-llm-server", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
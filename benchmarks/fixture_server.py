@@ -0,0 +1,122 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:基准测试页面服务，在本地端口提供fixtures目录中的页面和动态生成的大表格页面
+=========================================
+"""
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 页面名称 -> 路径，large_table 由服务动态生成
+FIXTURES = {
+    "small": "/small.html",
+    "forms": "/forms.html",
+    "table": "/large_table.html",
+    "spa": "/spa.html",
+}
+
+
+def build_large_table(rows: int = 1500) -> str:
+    """
+    生成大表格页面，默认约1万个DOM节点
+
+    Args:
+        rows (int): 表格行数，每行6个单元格
+
+    Returns:
+        str: HTML文本
+    """
+    statuses = ["待付款", "待发货", "已发货", "已完成", "已取消"]
+    body = "\n".join(
+        f'<tr><td>{index:06d}</td><td>用户{index % 97}</td><td>{(index * 37) % 1000}.00</td>'
+        f'<td>{statuses[index % len(statuses)]}</td><td>2025-03-{index % 28 + 1:02d}</td>'
+        f'<td><a href="/order/{index}">详情</a></td></tr>'
+        for index in range(1, rows + 1)
+    )
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="UTF-8"><title>订单列表 - 基准测试</title></head>
+<body>
+<header><nav><a href="/small.html">首页</a> <a href="/forms.html">用户资料</a></nav></header>
+<main>
+<h1>订单列表</h1>
+<form id="filter" action="/orders" method="get">
+<input type="search" name="keyword" placeholder="订单号/用户名">
+<select name="status"><option value="">全部状态</option>{"".join(f"<option>{s}</option>" for s in statuses)}</select>
+<button type="submit">筛选</button> <button type="button" id="export">导出</button>
+</form>
+<table id="orders">
+<thead><tr><th>订单号</th><th>用户</th><th>金额</th><th>状态</th><th>日期</th><th>操作</th></tr></thead>
+<tbody>
+{body}
+</tbody>
+</table>
+</main>
+</body>
+</html>"""
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    large_table_html = b""
+
+    def do_GET(self):
+        if self.path.split("?")[0] == FIXTURES["table"]:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(self.large_table_html)))
+            self.end_headers()
+            self.wfile.write(self.large_table_html)
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        # 基准测试时不输出访问日志
+        pass
+
+
+class FixtureServer:
+    """本地页面服务，在后台线程中运行"""
+
+    def __init__(self, table_rows: int = 1500):
+        """
+        初始化页面服务
+
+        Args:
+            table_rows (int): 大表格页面的行数
+        """
+        handler = type("FixtureHandler", (_FixtureHandler,), {
+            "large_table_html": build_large_table(table_rows).encode("utf-8")
+        })
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=FIXTURES_DIR))
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, fixture: str) -> str:
+        """
+        获取页面URL
+
+        Args:
+            fixture (str): 页面名称，见 FIXTURES
+
+        Returns:
+            str: 页面URL
+        """
+        return self.base_url + FIXTURES[fixture]
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,360 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:离线基准测试，使用本地页面和模拟的AI接口测量页面探索、信息收集、测试用例生成和Excel导出的耗时
+
+用法：python -m benchmarks.run_benchmark --iterations 5 --compare output/benchmarks/baseline.json
+=========================================
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.fake_llm_server import FakeLLMServer
+from benchmarks.fixture_server import FIXTURES, FixtureServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUIREMENTS_EXAMPLE = os.path.join(PROJECT_ROOT, "examples", "new_requirements_example.txt")
+
+
+def configure_environment(llm_base_url: str, output_dir: str) -> None:
+    """
+    在导入项目模块之前设置环境变量：配置在导入时读取，之后修改不再生效
+
+    Args:
+        llm_base_url (str): 模拟AI接口地址
+        output_dir (str): 临时输出目录
+    """
+    os.environ.update({
+        "OPENAI_BASE_URL": llm_base_url,
+        "OPENAI_API_KEY": "benchmark",
+        "HEADLESS": "true",
+        "SLOW_MO": "0",
+        "LLM_CACHE_ENABLED": "false",
+        "TRACING_ENABLED": "false",
+        "OUTPUT_DIR": output_dir,
+    })
+
+
+def summarize(name: str, fixture: str, samples: List[float]) -> Dict[str, Any]:
+    """
+    汇总一组耗时样本
+
+    Args:
+        name (str): 测量项
+        fixture (str): 页面名称
+        samples (List[float]): 耗时（毫秒）
+
+    Returns:
+        Dict[str, Any]: 统计结果
+    """
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "name": name,
+        "fixture": fixture,
+        "iterations": len(samples),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "p95_ms": round(ordered[p95_index], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+async def measure_async(func: Callable, iterations: int, warmup: int = 1) -> List[float]:
+    """重复执行协程函数并返回每次的耗时（毫秒），预热执行不计入结果"""
+    samples = []
+    for index in range(warmup + iterations):
+        start = time.perf_counter()
+        await func()
+        if index >= warmup:
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def measure(func: Callable, iterations: int, warmup: int = 1) -> List[float]:
+    """重复执行函数并返回每次的耗时（毫秒），预热执行不计入结果"""
+    samples = []
+    for index in range(warmup + iterations):
+        start = time.perf_counter()
+        func()
+        if index >= warmup:
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def bench_browser(
+        fixture_server: FixtureServer,
+        fixtures: List[str],
+        iterations: int,
+        ready_strategy: Optional[str],
+        results: List[Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    测量 explore_page 和 _collect_page_info 的耗时
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 各页面的探索结果，作为生成测试用例的输入
+    """
+    from core.web_explorer import WebExplorer
+
+    explorer = WebExplorer(ready_strategy=ready_strategy)
+    start = time.perf_counter()
+    await explorer.initialize()
+    results.append(summarize("browser_launch", "-", [(time.perf_counter() - start) * 1000]))
+
+    pages_data = {}
+    try:
+        for fixture in fixtures:
+            url = fixture_server.url(fixture)
+            page_result = {}
+
+            async def explore():
+                nonlocal page_result
+                page_result = await explorer.explore_page(url, max_depth=0)
+
+            results.append(summarize("explore_page", fixture, await measure_async(explore, iterations)))
+            if not page_result.get("success"):
+                print(f"页面探索失败 ({fixture}): {page_result.get('error')}")
+                continue
+            pages_data[url] = page_result
+
+            # explore_page 结束后页面仍停留在该URL，直接重复收集
+            results.append(summarize(
+                "collect_page_info", fixture, await measure_async(explorer._collect_page_info, iterations)
+            ))
+    finally:
+        await explorer.close()
+    return pages_data
+
+
+async def bench_generation(
+        pages_data: Dict[str, Dict[str, Any]],
+        iterations: int,
+        results: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    测量生成测试用例的耗时，分别测量普通响应和流式响应
+
+    Returns:
+        List[Dict[str, Any]]: 生成的测试用例，作为导出Excel的输入
+    """
+    from core.test_generator import TestGenerator
+
+    requirements = {}
+    if os.path.exists(REQUIREMENTS_EXAMPLE):
+        with open(REQUIREMENTS_EXAMPLE, "r", encoding="utf-8") as f:
+            requirements[os.path.basename(REQUIREMENTS_EXAMPLE)] = f.read()
+
+    generator = TestGenerator(use_cache=False)
+    test_cases: List[Dict[str, Any]] = []
+
+    async def generate():
+        nonlocal test_cases
+        test_cases = await generator.generate_test_cases_from_multiple_sources_async(pages_data, requirements)
+
+    async def generate_stream():
+        await generator.generate_test_cases_from_multiple_sources_async(
+            pages_data, requirements, on_test_case=lambda test_case: None
+        )
+
+    label = f"{len(pages_data)}_pages"
+    results.append(summarize("generate", label, await measure_async(generate, iterations)))
+    results.append(summarize("generate_stream", label, await measure_async(generate_stream, iterations)))
+    if generator.last_prompt_report:
+        print(f"提示信息约 {generator.last_prompt_report.get('prompt_tokens')} tokens")
+    return test_cases
+
+
+def bench_export(test_cases: List[Dict[str, Any]], iterations: int, output_dir: str,
+                 results: List[Dict[str, Any]], stream_cases: int = 0, formats: Optional[List[str]] = None) -> None:
+    """
+    测量 export_test_cases 的耗时
+
+    Args:
+        stream_cases (int): 大于0时另外测量从迭代器流式导出该数量测试用例的耗时
+        formats (Optional[List[str]]): 另外测量的导出格式，如 jsonl、csv
+    """
+    from core.excel_exporter import ExcelExporter
+
+    exporter = ExcelExporter(output_dir, export_format="xlsx")
+    results.append(summarize(
+        "export_test_cases", f"{len(test_cases)}_cases",
+        measure(lambda: exporter.export_test_cases(test_cases, "benchmark.xlsx", include_timestamp=False), iterations)
+    ))
+    for export_format in formats or []:
+        if export_format == "xlsx":
+            continue
+        format_exporter = ExcelExporter(output_dir, export_format=export_format)
+        results.append(summarize(
+            f"export_{export_format}", f"{len(test_cases)}_cases",
+            measure(lambda: format_exporter.export_test_cases(test_cases, "benchmark", include_timestamp=False), iterations)
+        ))
+    if stream_cases > 0:
+        results.append(summarize(
+            "export_stream", f"{stream_cases}_cases",
+            measure(lambda: exporter.export_test_cases(
+                iter_synthetic_test_cases(stream_cases), "benchmark_stream.xlsx", include_timestamp=False
+            ), iterations, warmup=0)
+        ))
+
+
+def bench_attribution(pages: int, cases: int, iterations: int, results: List[Dict[str, Any]]) -> None:
+    """测量为测试用例推断页面来源和需求来源的耗时，包括建立索引"""
+    from core.source_attribution import SourceAttributionIndex
+
+    urls = [f"https://site{index % 7}.example.com/module{index}/list" for index in range(pages)]
+    requirements = [f"需求{index}.md" for index in range(10)]
+    test_cases = [{
+        "test_title": f"验证功能 {index}",
+        "test_steps": [f"打开 /module{index % pages}/list 页面", "填写表单字段并提交", "检查页面提示信息"] * 3
+    } for index in range(cases)]
+
+    def attribute():
+        source_index = SourceAttributionIndex(urls, requirements)
+        for test_case in test_cases:
+            source_index.page_source(test_case)
+            source_index.requirement_source(test_case)
+
+    results.append(summarize("source_attribution", f"{pages}x{cases}", measure(attribute, iterations)))
+
+
+def build_synthetic_test_cases(count: int) -> List[Dict[str, Any]]:
+    """跳过生成时用于导出的测试用例"""
+    from benchmarks.fake_llm_server import build_test_cases
+    return build_test_cases("benchmark", count)
+
+
+def iter_synthetic_test_cases(count: int, batch_size: int = 100) -> Iterator[Dict[str, Any]]:
+    """逐批生成测试用例，不在内存中保留全部用例，用于测量流式导出"""
+    from benchmarks.fake_llm_server import build_test_cases
+    for start in range(0, count, batch_size):
+        for test_case in build_test_cases(f"benchmark-{start}", min(batch_size, count - start)):
+            test_case["test_id"] = f"TC{start + int(test_case['test_id'][2:]):06d}"
+            yield test_case
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """
+    与之前的结果比较中位数耗时
+
+    Args:
+        results (List[Dict[str, Any]]): 本次结果
+        baseline_path (str): 之前保存的结果文件
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(item["name"], item["fixture"]): item for item in json.load(f)["results"]}
+
+    print(f"\n与 {baseline_path} 比较（中位数）:")
+    print(f"{'测量项':<20}{'页面':<12}{'基线(ms)':>12}{'本次(ms)':>12}{'变化':>10}")
+    for item in results:
+        old = baseline.get((item["name"], item["fixture"]))
+        if not old:
+            continue
+        change = (item["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0.0
+        print(f"{item['name']:<20}{item['fixture']:<12}{old['median_ms']:>12.1f}{item['median_ms']:>12.1f}{change:>+9.1f}%")
+
+
+async def run(args: argparse.Namespace, fixture_server: FixtureServer, output_dir: str) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    fixtures = [name.strip() for name in args.fixtures.split(",") if name.strip()]
+
+    pages_data = {}
+    if not args.skip_browser:
+        pages_data = await bench_browser(fixture_server, fixtures, args.iterations, args.wait_strategy, results)
+
+    test_cases = []
+    if pages_data and not args.skip_generation:
+        test_cases = await bench_generation(pages_data, args.iterations, results)
+
+    if args.attribution_pages > 0 and args.attribution_cases > 0:
+        bench_attribution(args.attribution_pages, args.attribution_cases, args.iterations, results)
+    bench_export(test_cases or build_synthetic_test_cases(args.llm_cases), args.iterations, output_dir, results,
+                 stream_cases=args.export_cases,
+                 formats=[name.strip() for name in args.export_formats.split(",") if name.strip()])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="离线基准测试")
+    parser.add_argument("--iterations", type=int, default=5, help="每项测量的重复次数（另有1次预热）")
+    parser.add_argument("--fixtures", type=str, default=",".join(FIXTURES), help="测试页面，逗号分隔: " + ",".join(FIXTURES))
+    parser.add_argument("--table-rows", type=int, default=1500, help="大表格页面的行数，默认约1万个DOM节点")
+    parser.add_argument("--wait-strategy", choices=["dom", "network", "fixed"], help="页面就绪等待策略")
+    parser.add_argument("--llm-latency-ms", type=int, default=200, help="模拟AI接口返回首个token前的延迟")
+    parser.add_argument("--llm-chunk-ms", type=int, default=5, help="模拟AI接口流式响应相邻两段之间的延迟")
+    parser.add_argument("--llm-cases", type=int, default=20, help="模拟AI接口每次返回的测试用例数")
+    parser.add_argument("--attribution-pages", type=int, default=100, help="测量来源推断时的页面数，0表示跳过")
+    parser.add_argument("--attribution-cases", type=int, default=500, help="测量来源推断时的测试用例数，0表示跳过")
+    parser.add_argument("--export-formats", type=str, default="jsonl,csv", help="另外测量的导出格式，逗号分隔，如 jsonl,csv,parquet")
+    parser.add_argument("--export-cases", type=int, default=0, help="另外测量流式导出该数量测试用例的耗时，如 50000")
+    parser.add_argument("--skip-browser", action="store_true", help="跳过页面探索（此时也跳过生成，只测导出）")
+    parser.add_argument("--skip-generation", action="store_true", help="跳过测试用例生成")
+    parser.add_argument("--output", type=str, help="结果文件路径，默认 output/benchmarks/bench_<时间>.json")
+    parser.add_argument("--compare", type=str, help="与之前保存的结果文件比较")
+    args = parser.parse_args()
+
+    fixture_server = FixtureServer(table_rows=args.table_rows).start()
+    llm_server = FakeLLMServer(args.llm_latency_ms, args.llm_chunk_ms, args.llm_cases).start()
+    temp_dir = tempfile.mkdtemp(prefix="benchmark_")
+    configure_environment(llm_server.base_url, temp_dir)
+
+    try:
+        results = asyncio.run(run(args, fixture_server, temp_dir))
+    finally:
+        fixture_server.stop()
+        llm_server.stop()
+
+    from core.tracing import peak_rss_bytes
+    rss = peak_rss_bytes()
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "peak_rss_mb": round(rss / (1024 * 1024), 1) if rss is not None else None,
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+
+    output_path = args.output or os.path.join(
+        PROJECT_ROOT, "output", "benchmarks", f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'测量项':<20}{'页面':<12}{'中位数(ms)':>12}{'p95(ms)':>12}")
+    for item in results:
+        print(f"{item['name']:<20}{item['fixture']:<12}{item['median_ms']:>12.1f}{item['p95_ms']:>12.1f}")
+    print(f"结果已保存: {output_path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,16 +18,72 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "deepseek-chat")  # 使用的OpenAI模型
 OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))  # 创意性参数
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.deepseek.com")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))  # 异步生成测试用例时同时进行的API请求数上限
+GENERATION_SHARDING = os.getenv("GENERATION_SHARDING", "False").lower() == "true"  # 是否将多页面数据分片并行生成测试用例
+GENERATION_PIPELINED = os.getenv("GENERATION_PIPELINED", "False").lower() == "true"  # 是否每探索完一个页面立即为其单独生成测试用例
+GENERATION_SHARD_TOKENS = int(os.getenv("GENERATION_SHARD_TOKENS", "12000"))  # 每个分片中页面数据和需求文档的token预算
+PROMPT_COMPACTION = os.getenv("PROMPT_COMPACTION", "True").lower() == "true"  # 是否压缩提示信息中的页面数据
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "24000"))  # 每个提示信息中页面数据的token预算，0表示不限制
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"  # 是否缓存AI响应，提示信息相同时不再调用API
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".cache/llm")  # AI响应缓存目录
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "604800"))  # AI响应缓存有效期（秒），0表示不过期
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "200"))  # AI响应缓存总大小上限（MB），0表示不限制
+LLM_STREAMING = os.getenv("LLM_STREAMING", "False").lower() == "true"  # 是否使用流式响应，边生成边解析测试用例
+SOURCE_TAGGING = os.getenv("SOURCE_TAGGING", "True").lower() == "true"  # 多个页面或需求文档时是否要求AI为每个测试用例标注页面来源和需求来源
+TEST_AREA_KEYWORDS = os.getenv(
+    "TEST_AREA_KEYWORDS",
+    "导航,菜单,导航栏,menu,navigation,nav,header,footer,页眉,页脚,侧边栏,sidebar,顶部栏,底部栏,链接跳转,路由,route,标签页,tab,登录,注册,login,register"
+).split(",")  # 标题或步骤包含这些词的测试用例归为页面框架测试用例，其余为主内容区域测试用例
 
 # Playwright配置
 BROWSER_TYPE = os.getenv("BROWSER_TYPE", "chromium")  # 可选: chromium, firefox, webkit
 HEADLESS = os.getenv("HEADLESS", "False").lower() == "true"  # 是否使用无头模式
 SLOW_MO = int(os.getenv("SLOW_MO", "100"))  # 慢速执行的毫秒数
 TIMEOUT = int(os.getenv("TIMEOUT", "30000"))  # 超时时间（毫秒）
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))  # 浏览器池常驻浏览器进程数
+BROWSER_MAX_CONTEXTS = int(os.getenv("BROWSER_MAX_CONTEXTS", "50"))  # 每个浏览器租出多少个上下文后回收，0表示不回收
+PAGE_READY_STRATEGY = os.getenv("PAGE_READY_STRATEGY", "dom")  # 页面就绪等待策略: dom, network, fixed
+PAGE_READY_QUIET_MS = int(os.getenv("PAGE_READY_QUIET_MS", "500"))  # 页面无变化多少毫秒后视为就绪
+PAGE_READY_TIMEOUT_MS = int(os.getenv("PAGE_READY_TIMEOUT_MS", "5000"))  # 等待页面就绪的最长时间（毫秒）
+RESOURCE_BLOCKING = os.getenv("RESOURCE_BLOCKING", "False").lower() == "true"  # 是否拦截页面信息收集用不到的资源
+BLOCKED_RESOURCE_TYPES = os.getenv("BLOCKED_RESOURCE_TYPES", "image,media,font").split(",")  # 拦截的资源类型
+BLOCKED_URL_PATTERNS = os.getenv(
+    "BLOCKED_URL_PATTERNS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,hm.baidu.com,cnzz.com"
+).split(",")  # 拦截的URL片段（统计、广告脚本等）
 
 # 输出配置
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", "output")  # 输出目录
 DEFAULT_EXCEL_FILENAME = os.getenv("DEFAULT_EXCEL_FILENAME", "测试用例.xlsx")  # 默认Excel文件名
+EXPORT_FORMAT = os.getenv("EXPORT_FORMAT", "xlsx").lower()  # 导出格式：xlsx、jsonl、csv、parquet（需要pyarrow）
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "True").lower() == "true"  # 是否记录各阶段耗时并生成运行报告
+RUN_REPORT_DIR = os.getenv("RUN_REPORT_DIR", "output/reports")  # 运行报告目录
+
+# 登录缓存配置
+SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE_ENABLED", "False").lower() == "true"  # 是否复用之前保存的登录会话（会话以明文保存在磁盘上，等同登录凭证）
+SESSION_CACHE_DIR = os.getenv("SESSION_CACHE_DIR", ".cache/sessions")  # 登录会话缓存目录
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "3600"))  # 登录会话有效期（秒），0表示不过期
+LOGIN_LOCATOR_CACHE_ENABLED = os.getenv("LOGIN_LOCATOR_CACHE_ENABLED", "True").lower() == "true"  # 是否缓存AI识别的登录元素
+LOGIN_LOCATOR_CACHE_PATH = os.getenv("LOGIN_LOCATOR_CACHE_PATH", ".cache/login_locators.json")  # 登录元素定位缓存文件
+
+# 增量生成配置
+INCREMENTAL_ENABLED = os.getenv("INCREMENTAL_ENABLED", "False").lower() == "true"  # 是否只为结构变化的页面重新生成测试用例
+SNAPSHOT_STORE_DIR = os.getenv("SNAPSHOT_STORE_DIR", ".cache/snapshots")  # 页面快照存储目录
+
+# 后台任务配置
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", ".cache/jobs.sqlite3")  # Web界面后台任务数据库文件
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # 同时执行的后台任务数
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "20"))  # 最多等待执行的后台任务数，0表示不限制
 
 # 探索配置
-EXPLORE_DEPTH = int(os.getenv("EXPLORE_DEPTH", "0"))  # 页面探索深度，0表示只访问当前页面，不进行探索 
\ No newline at end of file
+EXPLORE_DEPTH = int(os.getenv("EXPLORE_DEPTH", "0"))  # 页面探索深度，0表示只访问当前页面，不进行探索；大于0时需显式开启 
+EXPLORE_CONCURRENCY = int(os.getenv("EXPLORE_CONCURRENCY", "1"))  # 多URL并发探索数，1表示逐个串行探索
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "2"))  # 按深度探索时并发访问的页面数
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "50"))  # 从每个URL出发最多发现的页面数（含起始页面），0表示不限制
+CRAWL_HOST_CONCURRENCY = int(os.getenv("CRAWL_HOST_CONCURRENCY", "2"))  # 同一主机同时进行的页面请求数
+CRAWL_HOST_DELAY_MS = int(os.getenv("CRAWL_HOST_DELAY_MS", "500"))  # 同一主机相邻两次页面请求的最小间隔（毫秒）
+CRAWL_EXCLUDE_PATTERNS = os.getenv(
+    "CRAWL_EXCLUDE_PATTERNS",
+    "logout,signout,sign-out,log-out,loginout,exit,"
+    "delete,del,remove,destroy,disable,deactivate,reset,drop,purge,revoke,unbind"
+).split(",")  # URL中包含这些片段时不访问，避免退出登录、删除数据等副作用（探索使用已登录的会话访问链接）
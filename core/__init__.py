@@ -11,5 +11,6 @@
 from core.web_explorer import WebExplorer
 from core.test_generator import TestGenerator
 from core.excel_exporter import ExcelExporter
+from core.browser_pool import BrowserPool
 
-__all__ = ['WebExplorer', 'TestGenerator', 'ExcelExporter'] 
\ No newline at end of file
+__all__ = ['WebExplorer', 'TestGenerator', 'ExcelExporter', 'BrowserPool'] 
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:浏览器池模块，维护常驻浏览器进程并向探索任务租借独立的浏览器上下文
+=========================================
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, async_playwright
+
+from config.settings import BROWSER_POOL_SIZE, BROWSER_MAX_CONTEXTS
+from core.web_explorer import WebExplorer
+from utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+
+class _PooledBrowser:
+    """浏览器池中的单个浏览器进程及其租借计数"""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.leased = 0  # 累计租出的上下文数
+        self.active = 0  # 当前未归还的上下文数
+        self.retired = False  # 达到回收阈值后不再租出新的上下文
+
+
+class BrowserPool:
+    """浏览器池，启动一次浏览器后在多个探索任务之间复用"""
+
+    def __init__(self, size: Optional[int] = None, max_contexts_per_browser: Optional[int] = None):
+        """
+        初始化浏览器池
+
+        Args:
+            size (Optional[int]): 常驻浏览器进程数，为None时使用配置文件中的BROWSER_POOL_SIZE
+            max_contexts_per_browser (Optional[int]): 每个浏览器累计租出多少个上下文后回收重启，
+                为None时使用配置文件中的BROWSER_MAX_CONTEXTS，0表示不回收
+        """
+        self.size = max(1, size or BROWSER_POOL_SIZE)
+        self.max_contexts_per_browser = (
+            BROWSER_MAX_CONTEXTS if max_contexts_per_browser is None else max_contexts_per_browser
+        )
+        self.playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self._context_owners: Dict[BrowserContext, _PooledBrowser] = {}
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """启动Playwright并预热所有浏览器进程"""
+        if self.playwright is not None:
+            return
+
+        self.playwright = await async_playwright().start()
+        for _ in range(self.size):
+            self._browsers.append(_PooledBrowser(await WebExplorer.launch_browser(self.playwright)))
+        logger.info(f"浏览器池已启动，浏览器数: {self.size}")
+
+    async def acquire_context(self, **context_options: Any) -> BrowserContext:
+        """
+        租用一个独立的浏览器上下文
+
+        Args:
+            **context_options: 传给 new_context 的参数
+
+        Returns:
+            BrowserContext: 浏览器上下文，使用完毕后需调用 release_context 归还
+        """
+        if self.playwright is None:
+            await self.start()
+
+        async with self._lock:
+            # 补足被回收的浏览器
+            while len(self._browsers) < self.size:
+                self._browsers.append(_PooledBrowser(await WebExplorer.launch_browser(self.playwright)))
+
+            # 选择当前负载最小的浏览器
+            pooled = min(self._browsers, key=lambda item: item.active)
+            context = await pooled.browser.new_context(**context_options)
+            pooled.leased += 1
+            pooled.active += 1
+            self._context_owners[context] = pooled
+
+            # 达到回收阈值后退出池，等现有上下文归还后关闭
+            if self.max_contexts_per_browser and pooled.leased >= self.max_contexts_per_browser:
+                pooled.retired = True
+                self._browsers.remove(pooled)
+                logger.info(f"浏览器已租出 {pooled.leased} 个上下文，将在归还后回收")
+
+        return context
+
+    async def release_context(self, context: BrowserContext) -> None:
+        """
+        归还浏览器上下文
+
+        Args:
+            context (BrowserContext): acquire_context 返回的上下文
+        """
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"关闭浏览器上下文时出错: {str(e)}")
+
+        async with self._lock:
+            pooled = self._context_owners.pop(context, None)
+            if pooled is None:
+                return
+
+            pooled.active -= 1
+            if pooled.retired and pooled.active == 0:
+                await self._close_browser(pooled)
+                logger.info("已回收浏览器进程")
+
+    async def close(self) -> None:
+        """关闭池中所有浏览器和Playwright"""
+        async with self._lock:
+            retired = {pooled for pooled in self._context_owners.values() if pooled.retired}
+            for pooled in list(self._browsers) + list(retired):
+                await self._close_browser(pooled)
+            self._browsers = []
+            self._context_owners = {}
+
+            if self.playwright is not None:
+                await self.playwright.stop()
+                self.playwright = None
+        logger.info("浏览器池已关闭")
+
+    @staticmethod
+    async def _close_browser(pooled: _PooledBrowser) -> None:
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"关闭浏览器时出错: {str(e)}")
@@ -0,0 +1,239 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:爬取队列模块，提供URL规范化、同源广度优先待访问队列和按主机的访问频率限制
+=========================================
+"""
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Pattern, Set
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from config.settings import CRAWL_EXCLUDE_PATTERNS, CRAWL_HOST_CONCURRENCY, CRAWL_HOST_DELAY_MS, CRAWL_MAX_PAGES
+from utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 不会返回HTML页面的文件扩展名
+NON_PAGE_EXTENSIONS = {
+    ".pdf", ".zip", ".rar", ".7z", ".gz", ".tar", ".exe", ".dmg", ".apk",
+    ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".bmp",
+    ".mp3", ".mp4", ".avi", ".mov", ".wmv", ".webm",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".csv", ".txt",
+    ".css", ".js", ".json", ".xml",
+}
+
+# 规范化时去除的跟踪参数
+TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "spm", "from", "fbclid", "gclid"}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# 排除片段短于该长度时需作为独立的词出现，避免 del 误匹配 model、delivery
+MIN_SUBSTRING_EXCLUDE_LENGTH = 5
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    规范化URL：解析相对地址，统一协议和主机名大小写，去除默认端口、片段和跟踪参数，并对查询参数排序
+
+    Args:
+        url (str): 原始URL
+        base (Optional[str]): 解析相对地址时使用的基准URL
+
+    Returns:
+        Optional[str]: 规范化后的URL，不是http/https地址时返回None
+    """
+    if not url:
+        return None
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+
+    try:
+        parsed = urlparse(url)
+        port = parsed.port
+    except ValueError:
+        return None
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return None
+
+    netloc = parsed.hostname.lower()
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parsed.path or "/")
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunparse((scheme, netloc, path, "", query, ""))
+
+
+def url_origin(url: str) -> str:
+    """
+    获取URL的源（协议+主机+端口）
+
+    Args:
+        url (str): 规范化后的URL
+
+    Returns:
+        str: 源
+    """
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def build_exclude_regex(patterns: Iterable[str]) -> Optional[Pattern]:
+    """
+    将排除片段编译为一个不区分大小写的正则表达式
+
+    较长的片段（如 logout、delete）在URL任意位置出现即排除；较短的片段（如 del、exit）须作为独立的词出现，
+    即前后不是字母，或以驼峰形式出现，如 /user/del/3、del_user、delUser 会被排除，而 model、delivery 不会
+
+    Args:
+        patterns (Iterable[str]): 排除片段
+
+    Returns:
+        Optional[Pattern]: 正则表达式，没有片段时为None
+    """
+    branches = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        body = f"(?i:{re.escape(pattern)})"
+        if len(pattern) < MIN_SUBSTRING_EXCLUDE_LENGTH:
+            body = f"(?:(?<![A-Za-z])|(?<=[a-z0-9])(?=[A-Z])){body}(?![a-z])"
+        branches.append(body)
+    return re.compile("|".join(branches)) if branches else None
+
+
+class CrawlItem:
+    """待访问的页面"""
+
+    def __init__(self, url: str, depth: int, path: List[str], order: int):
+        self.url = url
+        self.depth = depth  # 距起始页面的链接层数
+        self.path = path  # 从起始页面到该页面经过的URL
+        self.order = order  # 发现顺序
+
+
+class CrawlFrontier:
+    """同源广度优先待访问队列，按规范化URL去重，并限制最多发现的页面数"""
+
+    def __init__(
+            self,
+            start_url: str,
+            seen: Optional[Set[str]] = None,
+            max_pages: Optional[int] = None,
+            exclude_patterns: Optional[Iterable[str]] = None
+    ):
+        """
+        初始化待访问队列
+
+        Args:
+            start_url (str): 起始页面URL，只跟踪与其同源的链接
+            seen (Optional[Set[str]]): 已发现的规范化URL集合，会被原地更新
+            max_pages (Optional[int]): 最多发现的页面数（含起始页面），为None时使用配置文件中的CRAWL_MAX_PAGES
+            exclude_patterns (Optional[Iterable[str]]): URL中包含这些片段时不访问（如退出登录），
+                为None时使用配置文件中的CRAWL_EXCLUDE_PATTERNS
+        """
+        self.start_url = normalize_url(start_url) or start_url
+        self.origin = url_origin(self.start_url)
+        self.seen = seen if seen is not None else set()
+        self.max_pages = CRAWL_MAX_PAGES if max_pages is None else max_pages
+        if exclude_patterns is None:
+            exclude_patterns = CRAWL_EXCLUDE_PATTERNS
+        self._exclude_regex = build_exclude_regex(exclude_patterns)
+        self.queue: "asyncio.Queue[CrawlItem]" = asyncio.Queue()
+        self._order = 0
+        self.seen.add(self.start_url)
+
+    def accepts(self, url: Optional[str]) -> bool:
+        """
+        判断规范化后的URL是否应当访问
+
+        Args:
+            url (Optional[str]): 规范化后的URL
+
+        Returns:
+            bool: 是否访问
+        """
+        if not url or url_origin(url) != self.origin:
+            return False
+        path = urlparse(url).path.lower()
+        if any(path.endswith(ext) for ext in NON_PAGE_EXTENSIONS):
+            return False
+        return not (self._exclude_regex and self._exclude_regex.search(url))
+
+    def add_links(self, links: Iterable[str], base: str, depth: int, parent_path: List[str]) -> int:
+        """
+        将页面上的链接加入队列
+
+        Args:
+            links (Iterable[str]): 页面上的链接
+            base (str): 链接所在页面的URL
+            depth (int): 这些链接的深度
+            parent_path (List[str]): 从起始页面到链接所在页面经过的URL
+
+        Returns:
+            int: 新加入队列的链接数
+        """
+        added = 0
+        for link in links:
+            if len(self.seen) >= self.max_pages > 0:
+                break
+            url = normalize_url(link, base)
+            if url in self.seen or not self.accepts(url):
+                continue
+            self.seen.add(url)
+            self._order += 1
+            self.queue.put_nowait(CrawlItem(url, depth, parent_path + [url], self._order))
+            added += 1
+        return added
+
+
+class HostPoliteness:
+    """按主机限制并发访问数和相邻两次请求的最小间隔"""
+
+    def __init__(self, max_concurrent: Optional[int] = None, delay_ms: Optional[int] = None):
+        """
+        初始化访问频率限制
+
+        Args:
+            max_concurrent (Optional[int]): 每个主机的最大并发访问数，为None时使用配置文件中的CRAWL_HOST_CONCURRENCY
+            delay_ms (Optional[int]): 同一主机相邻两次请求的最小间隔（毫秒），为None时使用配置文件中的CRAWL_HOST_DELAY_MS
+        """
+        self.max_concurrent = max(1, CRAWL_HOST_CONCURRENCY if max_concurrent is None else max_concurrent)
+        self.delay = (CRAWL_HOST_DELAY_MS if delay_ms is None else delay_ms) / 1000
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_request: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """
+        获取访问某个URL的许可，退出上下文时释放
+
+        Args:
+            url (str): 要访问的URL
+        """
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_concurrent))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with semaphore:
+            async with lock:
+                loop = asyncio.get_running_loop()
+                wait = self._last_request.get(host, 0) + self.delay - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_request[host] = loop.time()
+            yield
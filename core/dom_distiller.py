@@ -0,0 +1,113 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:DOM精简模块，只提取表单控件、按钮及其标签和属性，供AI识别登录元素使用
+=========================================
+"""
+from playwright.async_api import Page
+
+from utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 在页面中提取可见的表单控件、按钮、登录相关链接和验证码图片，输出为精简的HTML片段
+# 每个元素一行，只保留可用于编写xpath的属性；所在表单发生变化时输出表单标签
+LOGIN_DOM_DISTILL_SCRIPT = """({maxElements}) => {
+    const keptAttributes = ['id', 'name', 'type', 'placeholder', 'class', 'value', 'aria-label',
+                            'title', 'role', 'alt', 'src', 'href', 'for', 'action', 'method'];
+    const loginWords = /登\\s*录|登入|注册|sign\\s*in|log\\s*in|login|submit|提交|确定/i;
+    const captchaWords = /captcha|verify|验证码|code/i;
+    const clean = (text, limit) => String(text || '').replace(/\\s+/g, ' ').trim().substring(0, limit);
+    const quote = (text) => clean(text, 120).replace(/"/g, '&quot;');
+
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.height === 0) return false;
+        const style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    };
+
+    const labelOf = (el) => {
+        if (el.labels && el.labels.length > 0) return clean(el.labels[0].innerText, 40);
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const label = document.getElementById(labelledBy);
+            if (label) return clean(label.innerText, 40);
+        }
+        return '';
+    };
+
+    const openTag = (el) => {
+        const tag = el.tagName.toLowerCase();
+        let html = '<' + tag;
+        keptAttributes.forEach(name => {
+            const value = el.getAttribute(name);
+            // 不输出输入框中已填写的值，只保留按钮上的文字
+            if (name === 'value' && tag === 'input' && !['submit', 'button', 'reset'].includes(el.type)) return;
+            if (value) html += ' ' + name + '="' + quote(value) + '"';
+        });
+        return html + '>';
+    };
+
+    const describe = (el) => {
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'input' || tag === 'img') {
+            const label = labelOf(el);
+            return (label ? '<!-- ' + label + ' --> ' : '') + openTag(el);
+        }
+        const text = tag === 'select' ? '' : clean(el.innerText || el.textContent, 40);
+        return openTag(el) + text + '</' + tag + '>';
+    };
+
+    const isCandidate = (el) => {
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'input') return el.type !== 'hidden';
+        if (tag === 'textarea' || tag === 'select' || tag === 'button') return true;
+        const text = clean(el.innerText || el.textContent, 60);
+        const marker = (el.id || '') + ' ' + (typeof el.className === 'string' ? el.className : '');
+        if (tag === 'img') return captchaWords.test((el.getAttribute('src') || '') + ' ' + marker + ' ' + (el.alt || ''));
+        // 链接和可点击的div/span只保留文字较短且像登录按钮的元素
+        return text.length > 0 && text.length <= 20 && (loginWords.test(text) || loginWords.test(marker));
+    };
+
+    const lines = [];
+    let currentForm = null;
+    const elements = document.querySelectorAll(
+        'input, textarea, select, button, [role="button"], a, img, [onclick], [class*="btn"], [class*="login"], [class*="submit"]'
+    );
+    for (const el of elements) {
+        if (lines.length >= maxElements) break;
+        if (!isCandidate(el) || !isVisible(el)) continue;
+
+        const form = el.closest('form');
+        if (form !== currentForm) {
+            if (currentForm) lines.push('</form>');
+            if (form) lines.push(openTag(form));
+            currentForm = form;
+        }
+        lines.push((form ? '  ' : '') + describe(el));
+    }
+    if (currentForm) lines.push('</form>');
+    return lines.join('\\n');
+}"""
+
+
+async def distill_login_dom(page: Page, max_elements: int = 300) -> str:
+    """
+    提取页面中与登录相关的精简DOM
+
+    Args:
+        page (Page): 页面
+        max_elements (int): 最多输出的元素数量
+
+    Returns:
+        str: 精简后的HTML片段，出错时返回空字符串
+    """
+    try:
+        return await page.evaluate(LOGIN_DOM_DISTILL_SCRIPT, {"maxElements": max_elements}) or ""
+    except Exception as e:
+        logger.warning(f"精简页面DOM时出错: {str(e)}")
+        return ""
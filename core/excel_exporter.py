@@ -7,49 +7,176 @@
 =========================================
 
 """
+import json
 import os
-from typing import Any, Dict, List, Optional, Tuple, Union
+import re
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-import pandas as pd
 from datetime import datetime
-import numpy as np
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
-from config.settings import OUTPUT_DIR, DEFAULT_EXCEL_FILENAME
+from config.settings import OUTPUT_DIR, DEFAULT_EXCEL_FILENAME, EXPORT_FORMAT
+from core.exporters import (
+    EXPORT_BACKENDS, HEADER_SAMPLE_SIZE, resolve_columns, write_sidecar
+)
+from core.test_area import MAIN_CONTENT_AREA, get_test_area_classifier
+from core.tracing import traced, set_span_attributes
 from utils.logger import get_logger
 from utils.helpers import sanitize_filename, ensure_dir_exists, extract_domain
 
 # 获取日志记录器
 logger = get_logger(__name__)
 
+# 原始字段名 -> 标准化字段名
+FIELD_MAPPING = {
+    "test_id": "测试ID",
+    "testid": "测试ID",
+    "id": "测试ID",
+    "test_title": "测试标题",
+    "title": "测试标题",
+    "name": "测试标题",
+    "description": "测试标题",
+    "priority": "优先级",
+    "test_priority": "优先级",
+    "preconditions": "前置条件",
+    "precondition": "前置条件",
+    "prerequisites": "前置条件",
+    "test_steps": "测试步骤",
+    "steps": "测试步骤",
+    "step": "测试步骤",
+    "expected_results": "预期结果",
+    "expected_result": "预期结果",
+    "expected": "预期结果",
+    "test_data": "测试数据",
+    "data": "测试数据",
+    "test_type": "测试类型",
+    "type": "测试类型",
+    "category": "测试类型",
+    "page_source": "页面来源",
+    "status": "测试状态",
+    "test_status": "测试状态",
+    "state": "测试状态"
+}
+
+# 已由映射处理的字段（原始字段名和标准化字段名），不再作为其他字段导出
+MAPPED_FIELDS = frozenset(FIELD_MAPPING) | frozenset(FIELD_MAPPING.values())
+
+# 要在内部逻辑中使用但不导出的字段
+INTERNAL_FIELDS = frozenset(["测试区域", "需求来源", "test_area"])
+
+# 列表值格式化为编号列表的字段
+NUMBERED_FIELDS = frozenset(["测试步骤", "预期结果"])
+
+# 必需字段及缺失时的默认值，测试ID按序号生成
+REQUIRED_FIELD_DEFAULTS = {
+    "测试ID": "",
+    "测试标题": "",
+    "优先级": "中",
+    "前置条件": "无",
+    "测试步骤": "",
+    "预期结果": ""
+}
+
+# 列宽，未列出的列使用默认宽度15
+COLUMN_WIDTHS = {
+    "测试ID": 12,
+    "测试标题": 30,
+    "优先级": 10,
+    "前置条件": 20,
+    "测试步骤": 40,
+    "预期结果": 40,
+    "测试数据": 20,
+    "页面来源": 25
+}
+
+# 命名样式，每个工作簿注册一次，单元格只引用样式名
+HEADER_STYLE = "tc_header"
+CELL_STYLE = "tc_cell"
+
+# 工作表名称中不允许出现的字符
+INVALID_SHEET_CHARS = re.compile(r"[\\*?:/\[\]]")
+
+# 可选的导出格式，xlsx 以外的格式由 core.exporters 中的导出格式处理
+EXPORT_FORMATS = ["xlsx"] + list(EXPORT_BACKENDS)
+
+
+class _SheetStream:
+    """只写工作表，写入表头后逐行追加，每列复用同一个已设置样式的单元格"""
+
+    def __init__(self, workbook: Workbook, title: str, columns: List[str]):
+        self.worksheet = workbook.create_sheet(title)
+        self.rows = 0
+
+        # 只写模式下列宽必须在写入第一行之前设置
+        for i, column in enumerate(columns):
+            self.worksheet.column_dimensions[get_column_letter(i + 1)].width = COLUMN_WIDTHS.get(column, 15)
+
+        self.worksheet.append([self._styled_cell(column, HEADER_STYLE) for column in columns])
+        self._row_cells = [self._styled_cell("", CELL_STYLE) for _ in columns]
+
+    def _styled_cell(self, value: Any, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(self.worksheet, value=value)
+        cell.style = style
+        return cell
+
+    def append(self, values: List[Any]) -> None:
+        """
+        追加一行，行内容在追加时立即写入临时文件，单元格可以复用
+
+        Args:
+            values (List[Any]): 与表头对应的单元格值
+        """
+        for cell, value in zip(self._row_cells, values):
+            cell.value = value
+        self.worksheet.append(self._row_cells)
+        self.rows += 1
+
+
 class ExcelExporter:
     """Excel导出器，负责将测试用例导出为Excel文件"""
     
-    def __init__(self, output_dir: Optional[str] = None):
+    def __init__(self, output_dir: Optional[str] = None, export_format: Optional[str] = None):
         """
         初始化Excel导出器
         
         Args:
             output_dir (Optional[str]): 输出目录，如果为None则使用配置文件中的目录
+            export_format (Optional[str]): 导出格式，可选 "xlsx", "jsonl", "csv", "parquet"，
+                为None时使用配置文件中的EXPORT_FORMAT
         """
         self.output_dir = output_dir or OUTPUT_DIR
+        self.area_classifier = get_test_area_classifier()
+        self.export_format = (export_format or EXPORT_FORMAT).lower()
+        if self.export_format not in EXPORT_FORMATS:
+            logger.warning(f"未知的导出格式: {self.export_format}，使用 xlsx")
+            self.export_format = "xlsx"
+        if self.export_format in EXPORT_BACKENDS:
+            # 缺少依赖时直接报错，避免导出失败后仍被当作成功
+            EXPORT_BACKENDS[self.export_format].check_available()
         # 确保输出目录存在
         ensure_dir_exists(self.output_dir)
-        logger.info(f"Excel导出器初始化完成，输出目录: {self.output_dir}")
+        logger.info(f"Excel导出器初始化完成，输出目录: {self.output_dir}，导出格式: {self.export_format}")
         
+    @traced("export.excel")
     def export_test_cases(
         self, 
-        test_cases: List[Dict[str, Any]], 
+        test_cases: Iterable[Dict[str, Any]], 
         filename: Optional[str] = None, 
         include_timestamp: bool = True,
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
         """
-        导出测试用例为Excel文件
+        导出测试用例为Excel文件，测试用例逐个读取并流式写入，内存占用与用例数量无关
+        
+        导出格式不是xlsx时，文件扩展名改为对应格式的扩展名，分组和元数据写入数据文件旁的 .meta.json 文件
         
         Args:
-            test_cases (List[Dict[str, Any]]): 测试用例列表
+            test_cases (Iterable[Dict[str, Any]]): 测试用例列表或迭代器
             filename (Optional[str]): 输出文件名，如果为None则使用默认文件名
             include_timestamp (bool): 是否在文件名中包含时间戳
             metadata (Optional[Dict[str, Any]]): 元数据，包含URLs和需求文档信息等
@@ -57,10 +184,6 @@ class ExcelExporter:
         Returns:
             str: 输出文件的完整路径
         """
-        if not test_cases:
-            logger.warning("没有测试用例可导出")
-            return ""
-            
         try:
             # 处理文件名
             if filename is None:
@@ -69,6 +192,10 @@ class ExcelExporter:
             # 清理文件名
             clean_filename = sanitize_filename(filename)
             
+            backend = EXPORT_BACKENDS[self.export_format]() if self.export_format in EXPORT_BACKENDS else None
+            if backend is not None:
+                clean_filename = os.path.splitext(clean_filename)[0] + backend.extension
+            
             # 如果需要添加时间戳
             if include_timestamp:
                 # 获取当前时间戳
@@ -79,329 +206,206 @@ class ExcelExporter:
             # 构建完整输出路径
             output_path = os.path.join(self.output_dir, clean_filename)
             
-            # 将测试用例转换为DataFrame
-            df, main_content_df, page_dfs, requirement_dfs = self._test_cases_to_dataframe(test_cases)
-            
-            # 导出为Excel
-            self._export_dataframe_to_excel(
-                df, 
-                output_path, 
-                main_content_df=main_content_df,
-                page_dfs=page_dfs,
-                requirement_dfs=requirement_dfs,
-                metadata=metadata
+            # 测试用例已全部在内存中时先扫描一遍字段名确定全部列；迭代器只能根据前N个测试用例确定列
+            columns = self._resolve_columns(test_cases) if isinstance(test_cases, (list, tuple)) else None
+            normalized_cases = (
+                self._normalize_test_case(tc, index) for index, tc in enumerate(test_cases)
             )
-            
-            logger.info(f"已将 {len(test_cases)} 个测试用例导出到 {output_path}")
+            set_span_attributes(format=self.export_format)
+            if backend is None:
+                total = self._stream_to_excel(normalized_cases, output_path, metadata=metadata, columns=columns)
+            else:
+                groups, columns = backend.write(normalized_cases, output_path, columns=columns)
+                total = groups.total
+                if total:
+                    write_sidecar(output_path, backend.name, groups, columns, metadata)
+                elif os.path.exists(output_path):
+                    os.remove(output_path)
+            
+            if not total:
+                logger.warning("没有测试用例可导出")
+                return ""
+            
+            logger.info(f"已将 {total} 个测试用例导出到 {output_path}")
             return output_path
             
         except Exception as e:
             logger.error(f"导出测试用例时出错: {str(e)}")
             return ""
             
-    def _test_cases_to_dataframe(self, test_cases: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]:
+    def _normalize_test_case(self, tc: Dict[str, Any], index: int) -> Dict[str, Any]:
         """
-        将测试用例列表转换为DataFrame
+        标准化单个测试用例的字段名称（统一大小写和命名风格）
+        
+        以下划线开头的字段仅用于内部分组，不会导出：
+        _测试区域、_页面来源、_需求来源
         
         Args:
-            test_cases (List[Dict[str, Any]]): 测试用例列表
+            tc (Dict[str, Any]): 原始测试用例
+            index (int): 测试用例序号（从0开始），用于生成缺失的测试ID
             
         Returns:
-            Tuple[pd.DataFrame, pd.DataFrame, Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]: 
-                包含全部测试用例的DataFrame,
-                仅包含主内容区域测试用例的DataFrame,
-                按页面分组的测试用例DataFrame字典,
-                按需求文档分组的测试用例DataFrame字典
+            Dict[str, Any]: 标准化后的测试用例
         """
-        # 标准化字段名称（统一大小写和命名风格）
-        normalized_test_cases = []
-        
-        # 页面和需求文档分组
-        page_groups = {}
-        requirement_groups = {}
-        
-        # 要在内部逻辑中使用但不导出的字段列表
-        internal_fields = ["测试区域", "需求来源", "test_area"]
-        
-        for tc in test_cases:
-            normalized_tc = {}
-            
-            # 标准化常见字段
-            field_mapping = {
-                # 原始字段名: 标准化字段名
-                "test_id": "测试ID",
-                "testid": "测试ID",
-                "id": "测试ID",
-                "test_title": "测试标题",
-                "title": "测试标题",
-                "name": "测试标题",
-                "description": "测试标题",
-                "priority": "优先级",
-                "test_priority": "优先级",
-                "preconditions": "前置条件",
-                "precondition": "前置条件",
-                "prerequisites": "前置条件",
-                "test_steps": "测试步骤",
-                "steps": "测试步骤",
-                "step": "测试步骤",
-                "expected_results": "预期结果",
-                "expected_result": "预期结果",
-                "expected": "预期结果",
-                "test_data": "测试数据",
-                "data": "测试数据",
-                "test_type": "测试类型",
-                "type": "测试类型",
-                "category": "测试类型",
-                "page_source": "页面来源",
-                "status": "测试状态",
-                "test_status": "测试状态",
-                "state": "测试状态"
-            }
-            
-            # 分析测试区域（仅用于内部分组，不导出）
-            test_area = "主内容区域"  # 默认假设是主内容区域
-            
-            # 检查测试标题和步骤中是否包含导航相关词汇
-            navigation_keywords = ["导航", "菜单", "导航栏", "menu", "navigation", "nav", "header", "footer", 
-                                  "页眉", "页脚", "侧边栏", "sidebar", "顶部栏", "底部栏", "链接跳转", "路由", 
-                                  "route", "标签页", "tab", "登录", "注册", "login", "register"]
-            
-            title = tc.get("test_title", "") or tc.get("title", "") or tc.get("name", "") or ""
-            steps = tc.get("test_steps", []) or tc.get("steps", []) or []
-            
-            # 如果步骤是字符串，转为列表便于检查
-            if isinstance(steps, str):
-                steps = [steps]
-                
-            # 检查标题
-            if any(keyword in title.lower() for keyword in navigation_keywords):
-                test_area = "页面框架"
-                
-            # 检查步骤
-            steps_text = " ".join(str(step) for step in steps)
-            if any(keyword in steps_text.lower() for keyword in navigation_keywords):
-                test_area = "页面框架"
-                
-            # 如果测试用例自带了测试区域标记，使用该标记
-            if "test_area" in tc:
-                test_area = tc["test_area"]
-            elif "area" in tc:
-                test_area = tc["area"]
-                
-            # 仅用于内部使用的测试区域字段，不会导出
-            normalized_tc["_测试区域"] = test_area
-            
-            # 提取页面来源和需求来源
-            page_source = tc.get("page_source", "未知页面")
-            requirement_source = tc.get("requirement_source", "未知需求")
-            
-            # 如果有页面来源，添加到页面分组中
-            if page_source not in page_groups:
-                page_groups[page_source] = []
-            
-            # 如果有需求来源，添加到需求分组中
-            if requirement_source not in requirement_groups:
-                requirement_groups[requirement_source] = []
-                
-            # 应用字段映射
-            for orig_key, norm_key in field_mapping.items():
-                if orig_key in tc and norm_key not in internal_fields:
-                    # 处理列表字段，如测试步骤和预期结果
-                    if norm_key in ["测试步骤", "预期结果"] and isinstance(tc[orig_key], list):
-                        # 格式化为编号列表
-                        formatted_list = []
-                        for i, item in enumerate(tc[orig_key]):
-                            formatted_list.append(f"{i+1}. {item}")
-                        normalized_tc[norm_key] = "\n".join(formatted_list)
-                    else:
-                        normalized_tc[norm_key] = tc[orig_key]
-            
-            # 确保所有必需字段都存在
-            required_fields = ["测试ID", "测试标题", "优先级", "前置条件", "测试步骤", "预期结果"]
-            
-            for field in required_fields:
-                if field not in normalized_tc and field not in internal_fields:
-                    if field == "测试ID":
-                        # 生成一个唯一ID
-                        normalized_tc[field] = f"TC{len(normalized_test_cases) + 1:03d}"
-                    elif field == "优先级":
-                        normalized_tc[field] = "中"
-                    elif field in ["前置条件", "测试数据"]:
-                        normalized_tc[field] = "无"
-                    else:
-                        normalized_tc[field] = ""
-            
-            # 将原始测试用例中的其他字段也添加到标准化测试用例中
-            for key, value in tc.items():
-                if key not in field_mapping and key not in field_mapping.values() and key not in internal_fields:
-                    # 只添加尚未添加的字段
-                    reverse_mapping = {v: k for k, v in field_mapping.items()}
-                    if key not in reverse_mapping and key not in internal_fields:
-                        normalized_tc[key] = value
-            
-            normalized_test_cases.append(normalized_tc)
-            
-            # 添加到页面分组和需求分组
-            page_groups[page_source].append(normalized_tc)
-            requirement_groups[requirement_source].append(normalized_tc)
+        # 分析测试区域（仅用于内部分组，不导出），生成时已分类的测试用例直接使用 test_area 字段
+        test_area = self.area_classifier.ensure(tc)
+            
+        # 仅用于内部使用的字段，不会导出
+        normalized_tc = {
+            "_测试区域": test_area,
+            "_页面来源": tc.get("page_source", "未知页面"),
+            "_需求来源": tc.get("requirement_source", "未知需求")
+        }
             
-        # 创建主DataFrame
-        df = pd.DataFrame(normalized_test_cases)
+        # 应用字段映射，同一标准字段有多个原始字段时以映射表中靠后的为准
+        for orig_key, norm_key in FIELD_MAPPING.items():
+            if orig_key in tc:
+                value = tc[orig_key]
+                # 处理列表字段，如测试步骤和预期结果，格式化为编号列表
+                if norm_key in NUMBERED_FIELDS and isinstance(value, list):
+                    value = "\n".join(f"{i+1}. {item}" for i, item in enumerate(value))
+                normalized_tc[norm_key] = value
         
-        # 创建主内容区域DataFrame（使用内部字段进行筛选，但不包含在输出中）
-        if "_测试区域" in df.columns:
-            main_content_df = df[df["_测试区域"] == "主内容区域"].copy()
-            
-            # 删除内部字段，不导出
-            if "_测试区域" in main_content_df.columns:
-                main_content_df = main_content_df.drop(columns=["_测试区域"])
-        else:
-            main_content_df = pd.DataFrame()
+        # 确保所有必需字段都存在
+        for field, default in REQUIRED_FIELD_DEFAULTS.items():
+            if field not in normalized_tc:
+                # 缺失的测试ID按序号生成
+                normalized_tc[field] = f"TC{index + 1:03d}" if field == "测试ID" else default
         
-        # 从主DataFrame中删除内部字段，不导出
-        if "_测试区域" in df.columns:
-            df = df.drop(columns=["_测试区域"])
+        # 将原始测试用例中的其他字段也添加到标准化测试用例中
+        for key, value in tc.items():
+            if key not in MAPPED_FIELDS and key not in INTERNAL_FIELDS:
+                normalized_tc[key] = value
         
-        # 创建页面分组DataFrame
-        page_dfs = {}
-        for page, cases in page_groups.items():
-            if cases:  # 确认有用例
-                page_df = pd.DataFrame(cases)
-                # 删除内部字段
-                if "_测试区域" in page_df.columns:
-                    page_df = page_df.drop(columns=["_测试区域"])
-                page_dfs[page] = page_df
-                
-        # 创建需求分组DataFrame
-        requirement_dfs = {}
-        for req, cases in requirement_groups.items():
-            if cases:  # 确认有用例
-                req_df = pd.DataFrame(cases)
-                # 删除内部字段
-                if "_测试区域" in req_df.columns:
-                    req_df = req_df.drop(columns=["_测试区域"])
-                requirement_dfs[req] = req_df
-                
-        # 记录统计信息
-        logger.info(f"测试用例总数: {len(normalized_test_cases)}")
-        logger.info(f"主内容区域测试用例数: {len(main_content_df)}")
-        logger.info(f"页面分组数: {len(page_dfs)}")
-        logger.info(f"需求分组数: {len(requirement_dfs)}")
+        return normalized_tc
+    
+    @staticmethod
+    def _resolve_columns(test_cases: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        根据原始字段名确定标准化后导出的全部列，只读取字段名，不标准化字段值
         
-        return df, main_content_df, page_dfs, requirement_dfs
+        Args:
+            test_cases (Iterable[Dict[str, Any]]): 原始测试用例
             
-    def _export_dataframe_to_excel(
-            self, 
-            df: pd.DataFrame, 
+        Returns:
+            List[str]: 列名列表，与 resolve_columns 作用于全部标准化测试用例的结果相同
+        """
+        seen = dict.fromkeys(REQUIRED_FIELD_DEFAULTS)
+        for tc in test_cases:
+            for key in tc:
+                if key in FIELD_MAPPING:
+                    seen.setdefault(FIELD_MAPPING[key], None)
+                elif key not in MAPPED_FIELDS and key not in INTERNAL_FIELDS:
+                    seen.setdefault(key, None)
+        return resolve_columns([seen])
+    
+    def _stream_to_excel(
+            self,
+            normalized_cases: Iterator[Dict[str, Any]],
             output_path: str,
-            main_content_df: Optional[pd.DataFrame] = None,
-            page_dfs: Optional[Dict[str, pd.DataFrame]] = None,
-            requirement_dfs: Optional[Dict[str, pd.DataFrame]] = None,
-            metadata: Optional[Dict[str, Any]] = None
-    ) -> None:
+            metadata: Optional[Dict[str, Any]] = None,
+            columns: Optional[List[str]] = None
+    ) -> int:
         """
-        将DataFrame导出为Excel
+        以只写模式将标准化后的测试用例流式写入Excel
+        
+        每个测试用例只读取一次，同时追加到所有测试用例、主内容区域、页面分组和需求分组工作表中；
+        只写工作表的行在追加时立即写入临时文件，不在内存中保留。
         
         Args:
-            df (pd.DataFrame): 测试用例DataFrame
+            normalized_cases (Iterator[Dict[str, Any]]): 标准化后的测试用例
             output_path (str): 输出文件路径
-            main_content_df (Optional[pd.DataFrame]): 主内容区域测试用例DataFrame
-            page_dfs (Optional[Dict[str, pd.DataFrame]]): 按页面分组的测试用例DataFrame字典
-            requirement_dfs (Optional[Dict[str, pd.DataFrame]]): 按需求文档分组的测试用例DataFrame字典
             metadata (Optional[Dict[str, Any]]): 元数据
+            columns (Optional[List[str]]): 导出的全部列，为None时根据前 HEADER_SAMPLE_SIZE 个测试用例确定
+            
+        Returns:
+            int: 写入的测试用例数，为0时不生成文件
         """
-        try:
-            # 创建一个Excel写入器
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                # 导出所有测试用例
-                df.to_excel(writer, sheet_name="所有测试用例", index=False)
-                self._format_excel_sheet(writer, "所有测试用例", df)
-                
-                # 如果有主内容区域测试用例，单独导出
-                if main_content_df is not None and not main_content_df.empty:
-                    main_content_df.to_excel(writer, sheet_name="主内容区域测试用例", index=False)
-                    self._format_excel_sheet(writer, "主内容区域测试用例", main_content_df)
-                
-                # 如果有按页面分组的测试用例，分别导出
-                if page_dfs:
-                    for page_name, page_df in page_dfs.items():
-                        # 处理页面名称，提取域名作为标签
-                        if page_name != "多页面" and page_name != "未知页面":
-                            sheet_name = f"页面_{extract_domain(page_name)}"
-                        else:
-                            sheet_name = f"页面_{page_name}"
-                            
-                        # 确保工作表名称有效（Excel限制工作表名长度为31个字符）
-                        sheet_name = sheet_name[:31]
-                        page_df.to_excel(writer, sheet_name=sheet_name, index=False)
-                        self._format_excel_sheet(writer, sheet_name, page_df)
-                
-                # 如果有按需求文档分组的测试用例，分别导出
-                if requirement_dfs:
-                    for req_name, req_df in requirement_dfs.items():
-                        if req_name != "综合需求" and req_name != "未知需求":
-                            # 移除扩展名
-                            base_name = os.path.splitext(req_name)[0]
-                            sheet_name = f"需求_{base_name}"
-                        else:
-                            sheet_name = f"需求_{req_name}"
-                            
-                        # 确保工作表名称有效
-                        sheet_name = sheet_name[:31]
-                        req_df.to_excel(writer, sheet_name=sheet_name, index=False)
-                        self._format_excel_sheet(writer, sheet_name, req_df)
-                
-                # 如果有元数据，添加一个元数据工作表
-                if metadata:
-                    self._add_metadata_sheet(writer, metadata)
+        # 只写模式下表头必须先写入，未提供列时先读取一部分测试用例确定列
+        sample = list(islice(normalized_cases, HEADER_SAMPLE_SIZE))
+        if not sample:
+            return 0
+        check_dropped = columns is None
+        if columns is None:
+            columns = resolve_columns(sample)
+        known_keys = set(columns)
+        dropped_keys = set()
+        
+        workbook = Workbook(write_only=True)
+        self._register_styles(workbook)
+        
+        all_sheet = _SheetStream(workbook, "所有测试用例", columns)
+        main_sheet = None
+        
+        # 分组值 -> 工作表；工作表名称相同的分组（如同一域名下的多个页面）写入同一个工作表
+        sheets_by_title: Dict[str, _SheetStream] = {}
+        page_sheets: Dict[Any, _SheetStream] = {}
+        requirement_sheets: Dict[Any, _SheetStream] = {}
+        page_order: List[_SheetStream] = []
+        requirement_order: List[_SheetStream] = []
+        
+        def group_sheet(cache: Dict[Any, _SheetStream], order: List[_SheetStream], key: Any, title: str) -> _SheetStream:
+            sheet = cache.get(key)
+            if sheet is None:
+                sheet = sheets_by_title.get(title)
+                if sheet is None:
+                    sheet = _SheetStream(workbook, title, columns)
+                    sheets_by_title[title] = sheet
+                    order.append(sheet)
+                cache[key] = sheet
+            return sheet
+        
+        for normalized_tc in chain(sample, normalized_cases):
+            values = [self._cell_value(normalized_tc.get(column)) for column in columns]
+            if check_dropped:
+                # 以下划线开头的是内部分组字段，本就不导出
+                dropped_keys.update(
+                    key for key in normalized_tc if key not in known_keys and not str(key).startswith("_")
+                )
             
-            logger.info(f"Excel文件已保存到: {output_path}")
+            all_sheet.append(values)
             
-        except Exception as e:
-            logger.error(f"导出DataFrame到Excel时出错: {str(e)}")
+            if normalized_tc["_测试区域"] == MAIN_CONTENT_AREA:
+                if main_sheet is None:
+                    main_sheet = _SheetStream(workbook, "主内容区域测试用例", columns)
+                main_sheet.append(values)
             
-    def _format_excel_sheet(self, writer: pd.ExcelWriter, sheet_name: str, df: pd.DataFrame) -> None:
-        """
-        格式化Excel工作表
+            page_name = normalized_tc["_页面来源"]
+            group_sheet(page_sheets, page_order, page_name, self._page_sheet_title(page_name)).append(values)
+            
+            req_name = normalized_tc["_需求来源"]
+            group_sheet(requirement_sheets, requirement_order, req_name, self._requirement_sheet_title(req_name)).append(values)
+            
+        if dropped_keys:
+            logger.warning(f"以下字段未出现在前 {HEADER_SAMPLE_SIZE} 个测试用例中，未导出: {', '.join(sorted(map(str, dropped_keys)))}")
         
-        Args:
-            writer (pd.ExcelWriter): Excel写入器
-            sheet_name (str): 工作表名称
-            df (pd.DataFrame): 数据DataFrame
-        """
-        # 获取工作表对象
-        worksheet = writer.sheets[sheet_name]
+        # 工作表按首次出现的顺序创建，保存前恢复为固定顺序
+        ordered_sheets = [all_sheet] + ([main_sheet] if main_sheet else []) + page_order + requirement_order
+        for position, sheet in enumerate(ordered_sheets):
+            workbook.move_sheet(sheet.worksheet.title, offset=position - workbook.index(sheet.worksheet))
         
-        # 设置列宽
-        column_widths = {
-            "测试ID": 12,
-            "测试标题": 30,
-            "优先级": 10,
-            "前置条件": 20,
-            "测试步骤": 40,
-            "预期结果": 40,
-            "测试数据": 20,
-            "页面来源": 25
-        }
+        # 如果有元数据，添加一个元数据工作表
+        if metadata:
+            self._add_metadata_sheet(workbook, metadata)
         
-        # 应用列宽
-        for i, column in enumerate(df.columns):
-            column_letter = get_column_letter(i + 1)
-            width = column_widths.get(column, 15)  # 默认宽度为15
-            worksheet.column_dimensions[column_letter].width = width
-            
-        # 格式化标题行
-        header_fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-        header_font = Font(bold=True)
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        workbook.save(output_path)
         
-        for i, column in enumerate(df.columns):
-            cell = worksheet.cell(row=1, column=i + 1)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            
-        # 为单元格应用样式
+        # 记录统计信息
+        logger.info(f"测试用例总数: {all_sheet.rows}")
+        logger.info(f"主内容区域测试用例数: {main_sheet.rows if main_sheet else 0}")
+        logger.info(f"页面分组数: {len(page_order)}")
+        logger.info(f"需求分组数: {len(requirement_order)}")
+        logger.info(f"Excel文件已保存到: {output_path}")
+        
+        return all_sheet.rows
+    
+    def _register_styles(self, workbook: Workbook) -> None:
+        """
+        注册表头和单元格的命名样式
+        
+        Args:
+            workbook (Workbook): 工作簿
+        """
         thin_border = Border(
             left=Side(style='thin'),
             right=Side(style='thin'),
@@ -409,47 +413,113 @@ class ExcelExporter:
             bottom=Side(style='thin')
         )
         
-        # 设置文本对齐和自动换行
-        wrap_alignment = Alignment(wrap_text=True, vertical="top")
+        workbook.add_named_style(NamedStyle(
+            name=HEADER_STYLE,
+            fill=PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid"),
+            font=Font(bold=True),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=thin_border
+        ))
+        workbook.add_named_style(NamedStyle(
+            name=CELL_STYLE,
+            alignment=Alignment(wrap_text=True, vertical="top"),
+            border=thin_border
+        ))
+    
+    @staticmethod
+    def _cell_value(value: Any) -> Any:
+        """
+        转换为Excel单元格可以保存的值
+        
+        Args:
+            value (Any): 字段值
+            
+        Returns:
+            Any: 单元格值
+        """
+        if value is None:
+            return ""
+        if isinstance(value, str):
+            # 去除Excel不允许的控制字符
+            return ILLEGAL_CHARACTERS_RE.sub("", value)
+        if isinstance(value, (bool, int, float, datetime)):
+            return value
+        if isinstance(value, (list, tuple, dict)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+        return str(value)
+    
+    @staticmethod
+    def _sheet_title(title: str) -> str:
+        """
+        处理工作表名称：替换不允许的字符，Excel限制工作表名长度为31个字符
+        
+        Args:
+            title (str): 原始名称
+            
+        Returns:
+            str: 有效的工作表名称
+        """
+        return INVALID_SHEET_CHARS.sub("_", title)[:31]
+    
+    def _page_sheet_title(self, page_name: Any) -> str:
+        """
+        获取页面分组的工作表名称，使用域名作为标签
+        
+        Args:
+            page_name (Any): 页面来源
+            
+        Returns:
+            str: 工作表名称
+        """
+        page_name = str(page_name)
+        if page_name != "多页面" and page_name != "未知页面":
+            return self._sheet_title(f"页面_{extract_domain(page_name)}")
+        return self._sheet_title(f"页面_{page_name}")
+    
+    def _requirement_sheet_title(self, req_name: Any) -> str:
+        """
+        获取需求分组的工作表名称
         
-        # 应用样式到所有单元格
-        for row in range(1, len(df) + 2):  # +2是因为Excel行从1开始，还有一个标题行
-            for col in range(1, len(df.columns) + 1):
-                cell = worksheet.cell(row=row, column=col)
-                cell.border = thin_border
-                cell.alignment = wrap_alignment
+        Args:
+            req_name (Any): 需求来源
+            
+        Returns:
+            str: 工作表名称
+        """
+        req_name = str(req_name)
+        if req_name != "综合需求" and req_name != "未知需求":
+            # 移除扩展名
+            base_name = os.path.splitext(req_name)[0]
+            return self._sheet_title(f"需求_{base_name}")
+        return self._sheet_title(f"需求_{req_name}")
                 
-    def _add_metadata_sheet(self, writer: pd.ExcelWriter, metadata: Dict[str, Any]) -> None:
+    def _add_metadata_sheet(self, workbook: Workbook, metadata: Dict[str, Any]) -> None:
         """
         添加元数据工作表
         
         Args:
-            writer (pd.ExcelWriter): Excel写入器
+            workbook (Workbook): 只写模式的工作簿
             metadata (Dict[str, Any]): 元数据
         """
-        # 创建元数据DataFrame
         metadata_list = []
         
         # 添加时间信息
-        metadata_list.append({"项目": "生成时间", "值": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        metadata_list.append(["生成时间", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
         
         # 添加测试用例数量
         if "total_cases" in metadata:
-            metadata_list.append({"项目": "测试用例总数", "值": metadata["total_cases"]})
+            metadata_list.append(["测试用例总数", metadata["total_cases"]])
             
         # 添加URL信息
         if "urls" in metadata and metadata["urls"]:
             for i, url in enumerate(metadata["urls"]):
-                metadata_list.append({"项目": f"测试URL {i+1}", "值": url})
+                metadata_list.append([f"测试URL {i+1}", url])
                 
         # 添加需求文档信息
         if "requirements" in metadata and metadata["requirements"]:
             for i, req in enumerate(metadata["requirements"]):
-                metadata_list.append({"项目": f"需求文档 {i+1}", "值": req})
+                metadata_list.append([f"需求文档 {i+1}", req])
                 
-        # 创建DataFrame并导出
-        metadata_df = pd.DataFrame(metadata_list)
-        metadata_df.to_excel(writer, sheet_name="元数据", index=False)
-        
-        # 格式化元数据工作表
-        self._format_excel_sheet(writer, "元数据", metadata_df) 
\ No newline at end of file
+        sheet = _SheetStream(workbook, "元数据", ["项目", "值"])
+        for item, value in metadata_list:
+            sheet.append([item, self._cell_value(value)])
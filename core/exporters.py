@@ -0,0 +1,304 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:测试用例导出格式，JSONL、CSV和Parquet，分组和元数据写入数据文件旁的 .meta.json 文件
+=========================================
+"""
+import abc
+import csv
+import importlib.util
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from core.test_area import MAIN_CONTENT_AREA
+from utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 标准列的导出顺序，其余字段按首次出现的顺序排在后面
+STANDARD_COLUMNS = ["测试ID", "测试标题", "优先级", "前置条件", "测试步骤", "预期结果", "测试数据", "测试类型", "页面来源", "测试状态"]
+
+# 需要先写表头的格式根据前N个测试用例确定额外的列
+HEADER_SAMPLE_SIZE = 200
+
+# 标准化测试用例中仅用于分组的内部字段
+AREA_FIELD = "_测试区域"
+PAGE_FIELD = "_页面来源"
+REQUIREMENT_FIELD = "_需求来源"
+
+
+def resolve_columns(sample: Iterable[Dict[str, Any]]) -> List[str]:
+    """
+    确定导出的列：标准列在前，其他字段按首次出现的顺序排在后面，内部字段不导出
+
+    Args:
+        sample (Iterable[Dict[str, Any]]): 标准化后的测试用例
+
+    Returns:
+        List[str]: 列名列表
+    """
+    seen = {}
+    for normalized_tc in sample:
+        for key in normalized_tc:
+            if not str(key).startswith("_"):
+                seen.setdefault(key, None)
+
+    columns = [column for column in STANDARD_COLUMNS if column in seen]
+    columns.extend(key for key in seen if key not in STANDARD_COLUMNS)
+    return columns
+
+
+def text_value(value: Any) -> Optional[str]:
+    """
+    转换为文本，列表和字典转为JSON，用于CSV和Parquet这类按列保存文本的格式
+
+    Args:
+        value (Any): 字段值
+
+    Returns:
+        Optional[str]: 文本，None保持为None
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return str(value)
+
+
+class ExportGroups:
+    """按行号记录测试用例所属的主内容区域、页面和需求分组"""
+
+    def __init__(self):
+        self.total = 0
+        self.main_content: List[int] = []
+        self.pages: Dict[Any, List[int]] = {}
+        self.requirements: Dict[Any, List[int]] = {}
+
+    def add(self, normalized_tc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        记录一个测试用例的分组，并移除其中的内部字段
+
+        Args:
+            normalized_tc (Dict[str, Any]): 标准化后的测试用例，会被原地修改
+
+        Returns:
+            Dict[str, Any]: 移除内部字段后的测试用例
+        """
+        row = self.total
+        if normalized_tc.pop(AREA_FIELD, MAIN_CONTENT_AREA) == MAIN_CONTENT_AREA:
+            self.main_content.append(row)
+        self.pages.setdefault(normalized_tc.pop(PAGE_FIELD, "未知页面"), []).append(row)
+        self.requirements.setdefault(normalized_tc.pop(REQUIREMENT_FIELD, "未知需求"), []).append(row)
+        self.total += 1
+        return normalized_tc
+
+    def to_dict(self) -> Dict[str, Any]:
+        """分组信息，行号从0开始，对应数据文件中的第几个测试用例"""
+        return {
+            "main_content": self.main_content,
+            "pages": {str(page): rows for page, rows in self.pages.items()},
+            "requirements": {str(req): rows for req, rows in self.requirements.items()}
+        }
+
+
+def collect_columns(normalized_cases: Iterable[Dict[str, Any]], groups: ExportGroups) -> Dict[str, List[Any]]:
+    """
+    将标准化后的测试用例按列收集，每个测试用例只遍历一次
+
+    Args:
+        normalized_cases (Iterable[Dict[str, Any]]): 标准化后的测试用例
+        groups (ExportGroups): 记录分组的对象
+
+    Returns:
+        Dict[str, List[Any]]: 列名 -> 列值，按 resolve_columns 的顺序排列
+    """
+    columns: Dict[str, List[Any]] = {}
+    for normalized_tc in normalized_cases:
+        row = groups.total
+        groups.add(normalized_tc)
+
+        # 新出现的列用None补齐之前的行
+        for key in normalized_tc:
+            if key not in columns:
+                columns[key] = [None] * row
+        for key, column in columns.items():
+            column.append(normalized_tc.get(key))
+
+    return {column: columns[column] for column in resolve_columns([columns])}
+
+
+def sidecar_path(output_path: str) -> str:
+    """数据文件对应的元数据文件路径，如 测试用例.jsonl -> 测试用例.jsonl.meta.json"""
+    return output_path + ".meta.json"
+
+
+def write_sidecar(
+        output_path: str,
+        export_format: str,
+        groups: ExportGroups,
+        columns: Optional[List[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    写入数据文件对应的元数据文件，包含生成时间、元数据、列和分组
+
+    Args:
+        output_path (str): 数据文件路径
+        export_format (str): 导出格式
+        groups (ExportGroups): 分组信息
+        columns (Optional[List[str]]): 列名列表，JSONL不固定列时为None
+        metadata (Optional[Dict[str, Any]]): 元数据，包含URLs和需求文档信息等
+
+    Returns:
+        str: 元数据文件路径
+    """
+    path = sidecar_path(output_path)
+    sidecar = {
+        "format": export_format,
+        "data_file": os.path.basename(output_path),
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total_cases": groups.total,
+        "columns": columns,
+        "metadata": metadata or {},
+        "groups": groups.to_dict()
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, ensure_ascii=False, indent=2, default=str)
+    return path
+
+
+class ExportBackend(abc.ABC):
+    """导出格式基类"""
+
+    name = "base"
+    extension = ""
+
+    @classmethod
+    def check_available(cls) -> None:
+        """
+        检查导出所需的依赖是否已安装，未安装时抛出ImportError
+        """
+
+    @abc.abstractmethod
+    def write(
+            self,
+            normalized_cases: Iterable[Dict[str, Any]],
+            output_path: str,
+            columns: Optional[List[str]] = None
+    ) -> Tuple[ExportGroups, Optional[List[str]]]:
+        """
+        写入标准化后的测试用例
+
+        Args:
+            normalized_cases (Iterable[Dict[str, Any]]): 标准化后的测试用例，包含内部分组字段
+            output_path (str): 输出文件路径
+            columns (Optional[List[str]]): 预先确定的全部列，为None时需要先写表头的格式根据前N个测试用例确定
+
+        Returns:
+            Tuple[ExportGroups, Optional[List[str]]]: 分组信息和写入的列
+        """
+
+
+class JsonlBackend(ExportBackend):
+    """每行一个测试用例的JSON，逐个写入，内存占用与用例数量无关"""
+
+    name = "jsonl"
+    extension = ".jsonl"
+
+    def write(
+            self,
+            normalized_cases: Iterable[Dict[str, Any]],
+            output_path: str,
+            columns: Optional[List[str]] = None
+    ) -> Tuple[ExportGroups, Optional[List[str]]]:
+        groups = ExportGroups()
+        with open(output_path, "w", encoding="utf-8") as f:
+            for normalized_tc in normalized_cases:
+                record = groups.add(normalized_tc)
+                f.write(json.dumps(record, ensure_ascii=False, default=str))
+                f.write("\n")
+        return groups, None
+
+
+class CsvBackend(ExportBackend):
+    """CSV，使用带BOM的UTF-8以便Excel正确识别中文；未预先确定列时由前N个测试用例确定"""
+
+    name = "csv"
+    extension = ".csv"
+
+    def write(
+            self,
+            normalized_cases: Iterable[Dict[str, Any]],
+            output_path: str,
+            columns: Optional[List[str]] = None
+    ) -> Tuple[ExportGroups, Optional[List[str]]]:
+        groups = ExportGroups()
+        normalized_cases = iter(normalized_cases)
+        sample = [groups.add(normalized_tc) for normalized_tc in islice(normalized_cases, HEADER_SAMPLE_SIZE)]
+        check_dropped = columns is None
+        if columns is None:
+            columns = resolve_columns(sample)
+        known_keys = set(columns)
+        dropped_keys = set()
+
+        with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for record in sample:
+                writer.writerow([text_value(record.get(column)) for column in columns])
+            for normalized_tc in normalized_cases:
+                record = groups.add(normalized_tc)
+                if check_dropped:
+                    dropped_keys.update(key for key in record if key not in known_keys)
+                writer.writerow([text_value(record.get(column)) for column in columns])
+
+        if dropped_keys:
+            logger.warning(f"以下字段未出现在前 {HEADER_SAMPLE_SIZE} 个测试用例中，未导出: {', '.join(sorted(map(str, dropped_keys)))}")
+        return groups, columns
+
+
+class ParquetBackend(ExportBackend):
+    """Parquet列式文件，所有列保存为文本，需要安装pyarrow"""
+
+    name = "parquet"
+    extension = ".parquet"
+
+    # pandas.DataFrame.to_parquet 可用的引擎
+    ENGINES = ("pyarrow", "fastparquet")
+
+    @classmethod
+    def check_available(cls) -> None:
+        if not any(importlib.util.find_spec(engine) for engine in cls.ENGINES):
+            raise ImportError("导出Parquet文件需要安装pyarrow: pip install pyarrow")
+
+    def write(
+            self,
+            normalized_cases: Iterable[Dict[str, Any]],
+            output_path: str,
+            columns: Optional[List[str]] = None
+    ) -> Tuple[ExportGroups, Optional[List[str]]]:
+        import pandas as pd
+
+        # 按列收集全部测试用例，不需要预先确定列
+        groups = ExportGroups()
+        collected = collect_columns(normalized_cases, groups)
+        df = pd.DataFrame(
+            {column: [text_value(value) for value in values] for column, values in collected.items()},
+            index=pd.RangeIndex(groups.total)
+        )
+        df.to_parquet(output_path, index=False)
+        return groups, list(collected)
+
+
+# 可选的导出格式，以名称为键；xlsx 由 ExcelExporter 直接处理
+EXPORT_BACKENDS: Dict[str, Type[ExportBackend]] = {
+    JsonlBackend.name: JsonlBackend,
+    CsvBackend.name: CsvBackend,
+    ParquetBackend.name: ParquetBackend,
+}
@@ -0,0 +1,319 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:后台任务队列模块，使用SQLite持久化任务状态和进度事件，由固定数量的工作线程依次执行
+=========================================
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import JOB_DB_PATH, JOB_QUEUE_LIMIT, JOB_WORKERS
+from core.progress import STAGE_JOB_FAILED, STAGE_JOB_STARTED, STAGE_JOB_SUCCEEDED, ProgressReporter
+from utils.logger import get_logger
+from utils.helpers import ensure_dir_exists
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 任务状态
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# 任务结束后从参数中清除的敏感字段
+SENSITIVE_PARAMS = ("password", "cookies")
+
+JobHandler = Callable[[Dict[str, Any], ProgressReporter], Dict[str, Any]]
+
+
+class JobQueueFullError(Exception):
+    """等待执行的任务数已达上限"""
+
+
+class JobStore:
+    """任务存储，每个任务一行，参数和结果以JSON保存；进度事件按写入顺序保存在单独的表中"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化任务存储
+
+        Args:
+            db_path (Optional[str]): SQLite数据库文件路径，为None时使用配置文件中的JOB_DB_PATH
+        """
+        self.db_path = db_path or JOB_DB_PATH
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            ensure_dir_exists(db_dir)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL, result TEXT, error TEXT, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, event TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每次操作使用独立连接，工作线程和请求线程之间不共享连接
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _execute(self, sql: str, args: tuple = ()) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(sql, args)
+
+    def create(self, params: Dict[str, Any]) -> str:
+        """
+        新建排队中的任务
+
+        Args:
+            params (Dict[str, Any]): 任务参数
+
+        Returns:
+            str: 任务ID
+        """
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, status, params, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, JOB_QUEUED, json.dumps(params, ensure_ascii=False), time.time())
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取任务
+
+        Args:
+            job_id (str): 任务ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 任务信息，不存在时返回None
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def unfinished_ids(self) -> List[str]:
+        """
+        获取未完成（排队中或执行中）的任务ID，按提交顺序排列
+
+        Returns:
+            List[str]: 任务ID列表
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        """
+        统计各状态的任务数
+
+        Returns:
+            Dict[str, int]: 状态 -> 任务数，包含所有状态
+        """
+        counts = {status: 0 for status in (JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED)}
+        with closing(self._connect()) as conn:
+            for row in conn.execute("SELECT status, COUNT(*) AS total FROM jobs GROUP BY status"):
+                counts[row["status"]] = row["total"]
+        return counts
+
+    def add_event(self, job_id: str, event: Dict[str, Any]) -> None:
+        """
+        追加进度事件
+
+        Args:
+            job_id (str): 任务ID
+            event (Dict[str, Any]): ProgressReporter 生成的事件
+        """
+        self._execute(
+            "INSERT INTO job_events (job_id, event) VALUES (?, ?)",
+            (job_id, json.dumps(event, ensure_ascii=False))
+        )
+
+    def events(self, job_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        读取进度事件
+
+        Args:
+            job_id (str): 任务ID
+            after_id (int): 只返回ID大于该值的事件，用于断线后续传
+
+        Returns:
+            List[Dict[str, Any]]: 事件列表，每个事件附带自增的id
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, event FROM job_events WHERE job_id = ? AND id > ? ORDER BY id",
+                (job_id, after_id)
+            ).fetchall()
+        return [dict(json.loads(row["event"]), id=row["id"]) for row in rows]
+
+    def mark_queued(self, job_id: str) -> None:
+        # 重新执行时清除上次的进度事件
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE jobs SET status = ?, started_at = NULL WHERE id = ?", (JOB_QUEUED, job_id))
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+
+    def mark_running(self, job_id: str) -> None:
+        self._execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (JOB_RUNNING, time.time(), job_id))
+
+    def mark_succeeded(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._finish(job_id, JOB_SUCCEEDED, result=json.dumps(result, ensure_ascii=False))
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._finish(job_id, JOB_FAILED, error=error)
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        job = self.get(job_id)
+        params = job["params"] if job else {}
+        # 任务结束后不再需要登录凭据，避免长期保存明文密码和Cookie
+        for field in SENSITIVE_PARAMS:
+            if params.get(field):
+                params[field] = None
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, params = ? WHERE id = ?",
+            (status, result, error, time.time(), json.dumps(params, ensure_ascii=False), job_id)
+        )
+
+
+class JobQueue:
+    """
+    后台任务队列
+
+    提交的任务先写入SQLite再放入内存队列，由固定数量的工作线程依次执行；
+    等待执行的任务数达到上限时拒绝新任务。启动时会重新排队上次退出前未完成的任务。
+    """
+
+    def __init__(
+            self,
+            handler: JobHandler,
+            store: Optional[JobStore] = None,
+            workers: Optional[int] = None,
+            max_pending: Optional[int] = None
+    ):
+        """
+        初始化任务队列
+
+        Args:
+            handler (JobHandler): 执行任务的函数，接收任务参数和进度报告器，返回可序列化为JSON的结果
+            store (Optional[JobStore]): 任务存储，为None时使用默认路径新建
+            workers (Optional[int]): 工作线程数，为None时使用配置文件中的JOB_WORKERS
+            max_pending (Optional[int]): 最多等待执行的任务数，为None时使用配置文件中的JOB_QUEUE_LIMIT，0表示不限制
+        """
+        self.handler = handler
+        self.store = store or JobStore()
+        self.workers = max(1, JOB_WORKERS if workers is None else workers)
+        self.max_pending = JOB_QUEUE_LIMIT if max_pending is None else max_pending
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._submit_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """启动工作线程，并重新排队未完成的任务"""
+        if self._threads:
+            return
+
+        # 执行到一半的任务无法从中断处继续，重新执行
+        unfinished = self.store.unfinished_ids()
+        for job_id in unfinished:
+            self.store.mark_queued(job_id)
+            self._queue.put(job_id)
+        if unfinished:
+            logger.info(f"恢复 {len(unfinished)} 个未完成的后台任务")
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"后台任务队列已启动，工作线程数: {self.workers}")
+
+    def submit(self, params: Dict[str, Any]) -> str:
+        """
+        提交任务
+
+        Args:
+            params (Dict[str, Any]): 任务参数
+
+        Returns:
+            str: 任务ID
+
+        Raises:
+            JobQueueFullError: 等待执行的任务数已达上限
+        """
+        with self._submit_lock:
+            if 0 < self.max_pending <= self._queue.qsize():
+                raise JobQueueFullError(f"等待执行的任务已达上限 ({self.max_pending})，请稍后再试")
+            job_id = self.store.create(params)
+            self._queue.put(job_id)
+        logger.info(f"提交后台任务: {job_id}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取任务信息，排队中的任务附带前面等待的任务数
+
+        Args:
+            job_id (str): 任务ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 任务信息，不存在时返回None
+        """
+        job = self.store.get(job_id)
+        if job and job["status"] == JOB_QUEUED:
+            with self._queue.mutex:
+                pending = list(self._queue.queue)
+            job["queue_position"] = pending.index(job_id) + 1 if job_id in pending else None
+        return job
+
+    def _worker(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if not job or job["status"] != JOB_QUEUED:
+            return
+
+        self.store.mark_running(job_id)
+        logger.info(f"开始执行后台任务: {job_id}")
+        progress = ProgressReporter(lambda event: self.store.add_event(job_id, event))
+        progress.emit(STAGE_JOB_STARTED, "任务开始执行", wait_ms=int((progress.started_at - job["created_at"]) * 1000))
+        try:
+            result = self.handler(job["params"], progress)
+        except Exception as e:
+            logger.error(f"后台任务执行失败 ({job_id}): {str(e)}")
+            # 先写入最后一个事件再更新状态，读取进度的一方看到任务结束时已能读到全部事件
+            progress.emit(STAGE_JOB_FAILED, str(e))
+            self.store.mark_failed(job_id, str(e))
+            return
+        event = progress.emit(STAGE_JOB_SUCCEEDED, "任务执行完成")
+        self.store.mark_succeeded(job_id, result or {})
+        logger.info(f"后台任务执行完成 ({job_id})，耗时 {event['elapsed_ms'] / 1000:.1f} 秒")
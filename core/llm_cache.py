@@ -0,0 +1,161 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:AI响应缓存模块，以模型、温度、系统提示和提示信息的哈希为键持久化保存API响应
+=========================================
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Optional
+
+from config.settings import LLM_CACHE_DIR, LLM_CACHE_MAX_MB, LLM_CACHE_TTL
+from utils.logger import get_logger
+from utils.helpers import ensure_dir_exists
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+
+class LLMResponseCache:
+    """AI响应缓存，每个响应保存为一个以内容哈希命名的文件，按有效期和总大小淘汰"""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[int] = None, max_mb: Optional[int] = None):
+        """
+        初始化AI响应缓存
+
+        Args:
+            cache_dir (Optional[str]): 缓存目录，为None时使用配置文件中的LLM_CACHE_DIR
+            ttl (Optional[int]): 缓存有效期（秒），为None时使用配置文件中的LLM_CACHE_TTL，0表示不过期
+            max_mb (Optional[int]): 缓存总大小上限（MB），为None时使用配置文件中的LLM_CACHE_MAX_MB，0表示不限制
+        """
+        self.cache_dir = cache_dir or LLM_CACHE_DIR
+        self.ttl = LLM_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = (LLM_CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+        ensure_dir_exists(self.cache_dir)
+
+    @staticmethod
+    def make_key(model: str, temperature: float, system_message: str, prompt: str) -> str:
+        """
+        计算缓存键
+
+        Args:
+            model (str): 模型名称
+            temperature (float): 温度参数
+            system_message (str): 系统提示
+            prompt (str): 提示信息
+
+        Returns:
+            str: sha256十六进制摘要
+        """
+        payload = json.dumps([model, temperature, system_message, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的响应
+
+        Args:
+            key (str): 缓存键
+
+        Returns:
+            Optional[str]: 响应文本，不存在或已过期时返回None
+        """
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception as e:
+            logger.warning(f"读取AI响应缓存失败: {str(e)}")
+            self._remove(path)
+            return None
+
+        if self._is_expired(entry.get("saved_at", 0)):
+            self._remove(path)
+            return None
+
+        # 只更新访问时间（atime），修改时间（mtime）保持为写入时间；按大小淘汰时优先删除最久未使用的响应
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+        logger.info(f"命中AI响应缓存: {key[:12]}")
+        return entry.get("response")
+
+    def put(self, key: str, response: str, model: str = "") -> None:
+        """
+        保存响应并按需淘汰旧缓存
+
+        Args:
+            key (str): 缓存键
+            response (str): 响应文本
+            model (str): 模型名称，仅用于记录
+        """
+        entry = {
+            "model": model,
+            "saved_at": time.time(),
+            "response": response
+        }
+        try:
+            # 先写临时文件再替换，避免并发生成时读到写了一半的文件
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._cache_path(key))
+        except Exception as e:
+            logger.warning(f"保存AI响应缓存失败: {str(e)}")
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """删除过期的响应，总大小超出上限时再按访问时间从旧到新删除"""
+        files = []
+        total_bytes = 0
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            # mtime即写入时间，无需读取文件内容即可判断是否过期
+            if self._is_expired(stat.st_mtime):
+                self._remove(path)
+                continue
+            files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+            total_bytes += stat.st_size
+
+        if self.max_bytes <= 0 or total_bytes <= self.max_bytes:
+            return
+
+        files.sort()
+        for _, size, path in files:
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+        logger.info(f"AI响应缓存超出 {self.max_bytes // (1024 * 1024)} MB，已淘汰最久未使用的响应")
+
+    def _is_expired(self, saved_at: float) -> bool:
+        if self.ttl <= 0:
+            return False
+        return time.time() - saved_at > self.ttl
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
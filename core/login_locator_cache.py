@@ -0,0 +1,110 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:登录元素定位缓存模块，按登录页面结构指纹缓存AI识别出的xpath，重复登录时跳过AI调用
+=========================================
+"""
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import LOGIN_LOCATOR_CACHE_PATH
+from utils.logger import get_logger
+from utils.helpers import ensure_dir_exists
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 在页面中收集登录页结构特征：表单和表单控件的标签及关键属性，不包含用户输入的值
+LOGIN_FINGERPRINT_SCRIPT = """() => {
+    return Array.from(document.querySelectorAll('form, input, button, select, textarea, [role="button"]'))
+        .map(el => [
+            el.tagName.toLowerCase(),
+            el.getAttribute('type') || '',
+            el.getAttribute('name') || '',
+            el.id || '',
+            el.getAttribute('placeholder') || '',
+            el.getAttribute('action') || ''
+        ].join('|'))
+        .join('\\n');
+}"""
+
+
+class LoginLocatorCache:
+    """登录元素定位缓存，以登录页面结构指纹为键保存xpath"""
+
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        初始化登录元素定位缓存
+
+        Args:
+            cache_path (Optional[str]): 缓存文件路径，为None时使用配置文件中的LOGIN_LOCATOR_CACHE_PATH
+        """
+        self.cache_path = cache_path or LOGIN_LOCATOR_CACHE_PATH
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取登录元素定位缓存失败: {str(e)}")
+            return {}
+
+    def _save(self, entries: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.cache_path) or "."
+        ensure_dir_exists(directory)
+        try:
+            # 先写临时文件再替换，避免并发运行时读到写了一半的文件
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"保存登录元素定位缓存失败: {str(e)}")
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, str]]:
+        """
+        读取指纹对应的登录元素xpath
+
+        Args:
+            fingerprint (str): 登录页面结构指纹
+
+        Returns:
+            Optional[Dict[str, str]]: 登录元素xpath字典，未命中时返回None
+        """
+        entry = self._load().get(fingerprint)
+        return dict(entry["login_elements"]) if entry else None
+
+    def put(self, fingerprint: str, login_elements: Dict[str, str], url: str = "") -> None:
+        """
+        保存指纹对应的登录元素xpath
+
+        Args:
+            fingerprint (str): 登录页面结构指纹
+            login_elements (Dict[str, str]): 登录元素xpath字典
+            url (str): 登录页面URL，仅用于记录
+        """
+        entries = self._load()
+        entries[fingerprint] = {
+            "url": url,
+            "saved_at": time.time(),
+            "login_elements": login_elements
+        }
+        self._save(entries)
+
+    def invalidate(self, fingerprint: str) -> None:
+        """
+        删除指纹对应的缓存
+
+        Args:
+            fingerprint (str): 登录页面结构指纹
+        """
+        entries = self._load()
+        if entries.pop(fingerprint, None) is not None:
+            self._save(entries)
@@ -0,0 +1,225 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:页面就绪等待策略，页面真正稳定后立即返回，并以超时时间作为上限
+=========================================
+"""
+import abc
+import asyncio
+import time
+from typing import Dict, Optional, Set, Type, Union
+
+from playwright.async_api import BrowserContext, Page, Request
+
+from config.settings import PAGE_READY_STRATEGY, PAGE_READY_QUIET_MS, PAGE_READY_TIMEOUT_MS
+from utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 在页面中等待DOM在静默窗口内不再变化，返回 "stable" 或 "timeout"
+DOM_STABLE_SCRIPT = """({quietMs, timeoutMs}) => new Promise(resolve => {
+    let quietTimer = null;
+    let ceilingTimer = null;
+    let observer = null;
+    const done = (reason) => {
+        if (observer) observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(ceilingTimer);
+        resolve(reason);
+    };
+    const restartQuietTimer = () => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done('stable'), quietMs);
+    };
+    observer = new MutationObserver(restartQuietTimer);
+    observer.observe(document.documentElement || document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    restartQuietTimer();
+    ceilingTimer = setTimeout(() => done('timeout'), timeoutMs);
+})"""
+
+
+class PageReadinessStrategy(abc.ABC):
+    """页面就绪等待策略基类"""
+
+    name = "base"
+
+    def __init__(self, quiet_ms: Optional[int] = None, timeout_ms: Optional[int] = None):
+        """
+        初始化等待策略
+
+        Args:
+            quiet_ms (Optional[int]): 静默窗口（毫秒），为None时使用配置文件中的PAGE_READY_QUIET_MS
+            timeout_ms (Optional[int]): 最长等待时间（毫秒），为None时使用配置文件中的PAGE_READY_TIMEOUT_MS
+        """
+        self.quiet_ms = PAGE_READY_QUIET_MS if quiet_ms is None else quiet_ms
+        self.timeout_ms = PAGE_READY_TIMEOUT_MS if timeout_ms is None else timeout_ms
+
+    def attach(self, context: BrowserContext) -> None:
+        """
+        在浏览器上下文创建后、打开页面之前调用，需要跟踪页面事件的策略在此注册监听
+
+        Args:
+            context (BrowserContext): 浏览器上下文
+        """
+
+    @abc.abstractmethod
+    async def wait(self, page: Page) -> None:
+        """
+        等待页面就绪
+
+        Args:
+            page (Page): 要等待的页面
+        """
+
+    async def wait_after_login(self, page: Page) -> None:
+        """
+        提交登录表单后等待页面就绪，默认与 wait 相同
+
+        Args:
+            page (Page): 要等待的页面
+        """
+        await self.wait(page)
+
+
+class FixedDelayReadiness(PageReadinessStrategy):
+    """固定等待，保留旧版行为：页面加载后等待2秒，提交登录后等待3秒"""
+
+    name = "fixed"
+
+    def __init__(self, delay: float = 2.0, login_delay: float = 3.0, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.login_delay = login_delay
+
+    async def wait(self, page: Page) -> None:
+        await asyncio.sleep(self.delay)
+
+    async def wait_after_login(self, page: Page) -> None:
+        await asyncio.sleep(self.login_delay)
+
+
+class DomStableReadiness(PageReadinessStrategy):
+    """使用MutationObserver等待DOM在静默窗口内不再变化"""
+
+    name = "dom"
+
+    async def wait(self, page: Page) -> None:
+        try:
+            reason = await page.evaluate(
+                DOM_STABLE_SCRIPT, {"quietMs": self.quiet_ms, "timeoutMs": self.timeout_ms}
+            )
+            if reason == "timeout":
+                logger.debug(f"DOM在 {self.timeout_ms} 毫秒内未稳定，继续执行")
+        except Exception as e:
+            # 等待期间发生导航时执行上下文会被销毁，退回到等待新页面加载
+            logger.debug(f"等待DOM稳定时出错: {str(e)}")
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=self.timeout_ms)
+            except Exception:
+                pass
+
+
+class _RequestTracker:
+    """单个页面进行中的请求和最近一次请求活动的时间"""
+
+    def __init__(self):
+        self.pending: Set[Request] = set()
+        self.last_activity = time.monotonic()
+
+    def on_request(self, request: Request) -> None:
+        self.pending.add(request)
+        self.last_activity = time.monotonic()
+
+    def on_request_done(self, request: Request) -> None:
+        self.pending.discard(request)
+        self.last_activity = time.monotonic()
+
+
+class NetworkQuietReadiness(PageReadinessStrategy):
+    """
+    跟踪进行中的请求，所有请求结束并保持静默窗口后返回
+
+    请求监听在页面创建时注册（见 attach），因此 goto 或点击触发的请求在调用 wait 之前就已计入
+    """
+
+    name = "network"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._trackers: Dict[Page, _RequestTracker] = {}
+
+    def attach(self, context: BrowserContext) -> None:
+        for page in context.pages:
+            self.track(page)
+        context.on("page", self.track)
+
+    def track(self, page: Page) -> _RequestTracker:
+        """
+        开始跟踪页面的请求，重复调用时返回已有的跟踪器
+
+        Args:
+            page (Page): 页面
+
+        Returns:
+            _RequestTracker: 请求跟踪器
+        """
+        tracker = self._trackers.get(page)
+        if tracker is None:
+            tracker = _RequestTracker()
+            self._trackers[page] = tracker
+            page.on("request", tracker.on_request)
+            page.on("requestfinished", tracker.on_request_done)
+            page.on("requestfailed", tracker.on_request_done)
+            page.on("close", lambda closed_page: self._trackers.pop(closed_page, None))
+        return tracker
+
+    async def wait(self, page: Page) -> None:
+        tracker = self._trackers.get(page)
+        if tracker is None:
+            # 未通过 attach 注册的页面只能从现在开始跟踪，之前发出的请求无法计入
+            logger.debug("页面未在创建时注册请求跟踪，从现在开始跟踪")
+            tracker = self.track(page)
+
+        quiet = self.quiet_ms / 1000
+        deadline = time.monotonic() + self.timeout_ms / 1000
+        while time.monotonic() < deadline:
+            if not tracker.pending and time.monotonic() - tracker.last_activity >= quiet:
+                return
+            await asyncio.sleep(0.05)
+        logger.debug(f"仍有 {len(tracker.pending)} 个请求在 {self.timeout_ms} 毫秒内未完成，继续执行")
+
+
+# 可选的等待策略，以名称为键
+READINESS_STRATEGIES: Dict[str, Type[PageReadinessStrategy]] = {
+    FixedDelayReadiness.name: FixedDelayReadiness,
+    DomStableReadiness.name: DomStableReadiness,
+    NetworkQuietReadiness.name: NetworkQuietReadiness,
+}
+
+
+def get_readiness_strategy(
+        strategy: Optional[Union[str, PageReadinessStrategy]] = None
+) -> PageReadinessStrategy:
+    """
+    根据名称获取页面就绪等待策略
+
+    Args:
+        strategy (Optional[Union[str, PageReadinessStrategy]]): 策略名称或策略实例，
+            为None时使用配置文件中的PAGE_READY_STRATEGY
+
+    Returns:
+        PageReadinessStrategy: 等待策略实例
+    """
+    if isinstance(strategy, PageReadinessStrategy):
+        return strategy
+
+    name = (strategy or PAGE_READY_STRATEGY).lower()
+    if name not in READINESS_STRATEGIES:
+        logger.warning(f"未知的页面就绪等待策略: {name}，使用 {DomStableReadiness.name}")
+        name = DomStableReadiness.name
+    return READINESS_STRATEGIES[name]()
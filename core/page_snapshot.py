@@ -0,0 +1,486 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:页面快照脚本，一次遍历DOM并在一次evaluate调用中返回页面信息的所有部分
+=========================================
+"""
+from typing import Any, Dict
+
+# 页面信息各部分及其出错时的默认值（顺序即结果字典中的顺序）
+PAGE_SNAPSHOT_SECTIONS: Dict[str, Any] = {
+    "page_structure": {},
+    "meta": {},
+    "functional_areas": [],
+    "forms": [],
+    "interactive_elements": {},
+    "content_structure": [],
+    "messages": [],
+    "input_controls": [],
+}
+
+# 在页面中执行的快照脚本
+# 返回 {sections: {部分名: 值}, errors: {部分名: 错误信息}, timings: {部分名: 耗时毫秒}}，每个部分单独捕获异常，互不影响
+PAGE_SNAPSHOT_SCRIPT = """() => {
+    // 排除的区域选择器列表
+    const excludedSelectors = [
+        // 页眉区域
+        'header', '.header', '#header', '[role="banner"]',
+        // 页脚区域
+        'footer', '.footer', '#footer', '[role="contentinfo"]',
+        '.copyright', '#copyright', '.legal', '#legal',
+        '.site-info', '#site-info', '.site-footer', '#site-footer',
+        '.bottom-footer', '#bottom-footer', '.footer-bottom', '#footer-bottom',
+        '.footer-links', '#footer-links', '.footer-menu', '#footer-menu',
+        '.footer-wrapper', '#footer-wrapper', '.footer-content', '#footer-content',
+        '.friend-links', '#friend-links', '.friendship-links', '#friendship-links',
+        '.links', '.link-list', '.link-area', '.about-links',
+        '.site-record', '#site-record', '.icp', '#icp', '.beian', '#beian',
+        // 导航区域
+        'nav', '.nav', '#nav', '.navbar', '#navbar', '[role="navigation"]',
+        '.menu', '#menu', '.navigation', '#navigation',
+        '.breadcrumb', '.breadcrumbs', '#breadcrumb', '#breadcrumbs',
+        // 侧边栏区域
+        'aside', '.sidebar', '#sidebar', '[role="complementary"]',
+        // 社交和分享区域
+        '.social-links', '#social-links', '.share-buttons', '#share-buttons',
+        '.social-media', '#social-media', '.social-icons', '#social-icons',
+        // 其他通用区域
+        '.site-policy', '#site-policy', '.terms', '#terms', '.privacy', '#privacy',
+        '.about-us', '#about-us', '.contact-us', '#contact-us',
+        '.help-center', '#help-center', '.support-links', '#support-links',
+        '.subscribe', '#subscribe', '.newsletter', '#newsletter',
+        // 与底部相关的区选择器
+        '[class*="footer"]', '[id*="footer"]', '[class*="bottom"]', '[id*="bottom"]',
+        '[class*="copyright"]', '[id*="copyright"]', '[class*="rights"]', '[id*="rights"]',
+        '.about-section', '#about-section', '.contact-section', '#contact-section'
+    ];
+    // 交互元素额外排除标签页和分页区域
+    const interactiveExcludedSelectors = excludedSelectors.concat([
+        '.tabs', '#tabs', '[role="tablist"]',
+        '.pagination', '#pagination'
+    ]);
+
+    // 合并为单个选择器，由 closest() 在原生代码中完成祖先匹配
+    const excludedSelector = excludedSelectors.join(', ');
+    const interactiveExcludedSelector = interactiveExcludedSelectors.join(', ');
+    const excludedCache = new Map();
+    const interactiveExcludedCache = new Map();
+    const isInExcludedArea = (element) => {
+        if (!element) return false;
+        if (!excludedCache.has(element)) excludedCache.set(element, !!element.closest(excludedSelector));
+        return excludedCache.get(element);
+    };
+    const isInInteractiveExcludedArea = (element) => {
+        if (!element) return false;
+        if (!interactiveExcludedCache.has(element)) {
+            interactiveExcludedCache.set(element, !!element.closest(interactiveExcludedSelector));
+        }
+        return interactiveExcludedCache.get(element);
+    };
+
+    const interactiveSelector = 'button, a, input, select, textarea';
+    const buttonSelector = 'button, input[type="button"], input[type="submit"], [role="button"]';
+    const messageSelector = '.error, .alert, .message, .notification, [role="alert"], [aria-live]';
+    const moduleSelectors = ['section', '.card', '.panel', '.box', '.container', '.module', '[role="region"]'];
+    const moduleSelector = moduleSelectors.join(', ');
+
+    // 一次遍历DOM，按用途分桶
+    const buckets = {
+        header: 0, footer: 0, nav: 0, main: 0, aside: 0,
+        links: [], structureButtonCount: 0, inputs: [], imageCount: 0, tableCount: 0,
+        metas: [], buttons: [], headings: [], lists: [], paragraphs: [], messages: [],
+        modules: moduleSelectors.map(() => [])
+    };
+    const all = document.getElementsByTagName('*');
+    for (let i = 0; i < all.length; i++) {
+        const el = all[i];
+        const tag = el.tagName;
+        switch (tag) {
+            case 'HEADER': buckets.header++; break;
+            case 'FOOTER': buckets.footer++; break;
+            case 'NAV': buckets.nav++; break;
+            case 'MAIN': buckets.main++; break;
+            case 'ASIDE': buckets.aside++; break;
+            case 'A': buckets.links.push(el); break;
+            case 'IMG': buckets.imageCount++; break;
+            case 'TABLE': buckets.tableCount++; break;
+            case 'META': buckets.metas.push(el); break;
+            case 'BUTTON': buckets.structureButtonCount++; break;
+            case 'INPUT':
+                if (el.type === 'button' || el.type === 'submit') buckets.structureButtonCount++;
+                else buckets.inputs.push(el);
+                break;
+            case 'TEXTAREA': case 'SELECT': buckets.inputs.push(el); break;
+            case 'H1': case 'H2': case 'H3': case 'H4': case 'H5': case 'H6': buckets.headings.push(el); break;
+            case 'UL': case 'OL': buckets.lists.push(el); break;
+            case 'P': buckets.paragraphs.push(el); break;
+        }
+        if (el.matches(buttonSelector)) buckets.buttons.push(el);
+        if (el.matches(messageSelector)) buckets.messages.push(el);
+        if (el.matches(moduleSelector)) {
+            moduleSelectors.forEach((selector, index) => {
+                if (el.matches(selector)) buckets.modules[index].push(el);
+            });
+        }
+    }
+
+    const mainElement = document.querySelector('main') ||
+                        document.querySelector('article') ||
+                        document.querySelector('#content') ||
+                        document.querySelector('.content');
+
+    // 各部分的采集函数
+    const collectors = {};
+
+    // 获取页面结构概览（提供整体结构而不是详细内容）
+    collectors.page_structure = () => ({
+        hasHeader: buckets.header > 0,
+        hasFooter: buckets.footer > 0,
+        hasNavigation: buckets.nav > 0,
+        hasMainContent: buckets.main > 0,
+        hasSidebar: buckets.aside > 0,
+        hasForms: document.forms.length > 0,
+        formCount: document.forms.length,
+        linkCount: buckets.links.length,
+        buttonCount: buckets.structureButtonCount,
+        inputCount: buckets.inputs.length,
+        imageCount: buckets.imageCount,
+        tableCount: buckets.tableCount
+    });
+
+    // 获取重要的meta标签（减少不重要的元数据）
+    collectors.meta = () => {
+        const importantMeta = {};
+        const importantMetaNames = ['description', 'keywords', 'viewport', 'author', 'og:title', 'og:description'];
+        buckets.metas.forEach(meta => {
+            const name = meta.name || meta.property;
+            if (name && importantMetaNames.includes(name)) {
+                importantMeta[name] = meta.content;
+            }
+        });
+        return importantMeta;
+    };
+
+    // 分析并提取页面主要功能而不是所有元素
+    collectors.functional_areas = () => {
+        const functionalAreas = [];
+        const viewportHeight = window.innerHeight;
+        const viewportWidth = window.innerWidth;
+
+        // 识别页面上的主要功能区域和操作
+        const addFunctionalArea = (element, type, importance = 'medium') => {
+            if (!element) return;
+
+            // 检查是否在排除区域内
+            if (isInExcludedArea(element)) return;
+
+            const elementRect = element.getBoundingClientRect();
+            if (elementRect.width === 0 || elementRect.height === 0) return;
+
+            // 计算到视口中心的距离（归一化）
+            const elementCenterY = elementRect.top + elementRect.height / 2;
+            const elementCenterX = elementRect.left + elementRect.width / 2;
+            const distanceToCenter = Math.sqrt(
+                Math.pow((elementCenterX - viewportWidth / 2) / viewportWidth, 2) +
+                Math.pow((elementCenterY - viewportHeight / 2) / viewportHeight, 2)
+            );
+
+            // 计算元素大小得分
+            const sizeScore = (elementRect.width * elementRect.height) / (viewportWidth * viewportHeight);
+
+            // 根据元素包含的交互元素计算功能重要性
+            const interactiveCount = element.querySelectorAll(interactiveSelector).length;
+
+            // 总得分 = 位置得分 + 大小得分 + 交互元素得分
+            const totalScore = (1 - distanceToCenter) * 0.4 + sizeScore * 0.3 + Math.min(interactiveCount * 0.05, 0.3);
+
+            // 根据得分确定重要性
+            let calculatedImportance = 'low';
+            if (totalScore > 0.6) calculatedImportance = 'high';
+            else if (totalScore > 0.3) calculatedImportance = 'medium';
+
+            functionalAreas.push({
+                type,
+                tagName: element.tagName.toLowerCase(),
+                id: element.id,
+                className: element.className,
+                text: element.textContent.trim().substring(0, 100),
+                importance: importance === 'high' ? 'high' : calculatedImportance,
+                interactiveElementCount: interactiveCount,
+                position: {
+                    top: Math.round(elementRect.top),
+                    left: Math.round(elementRect.left),
+                    width: Math.round(elementRect.width),
+                    height: Math.round(elementRect.height)
+                }
+            });
+        };
+
+        // 识别主要内容区域
+        if (mainElement) addFunctionalArea(mainElement, 'main_content', 'high');
+
+        // 识别表单（高优先级功能区域）
+        Array.from(document.forms).forEach(form => addFunctionalArea(form, 'form', 'high'));
+
+        // 识别可能的功能卡片/面板，仅添加包含交互元素的区域
+        buckets.modules.forEach(elements => {
+            elements.forEach(el => {
+                if (!isInExcludedArea(el) && el.querySelector(interactiveSelector)) {
+                    addFunctionalArea(el, 'functional_module');
+                }
+            });
+        });
+
+        // 根据重要性排序
+        const importanceScores = { 'high': 3, 'medium': 2, 'low': 1 };
+        functionalAreas.sort((a, b) => importanceScores[b.importance] - importanceScores[a.importance]);
+        return functionalAreas;
+    };
+
+    // 智能分析表单（关注关键属性而非所有属性）
+    collectors.forms = () => Array.from(document.forms)
+        .filter(form => !isInExcludedArea(form))
+        .map(form => {
+            // 分析表单的用途
+            const formPurpose = (() => {
+                const action = (form.action || '').toLowerCase();
+                const id = (form.id || '').toLowerCase();
+                const className = (form.className || '').toLowerCase();
+                const buttonText = Array.from(form.querySelectorAll('button, input[type="submit"]'))
+                    .map(el => el.textContent || el.value || '').join(' ').toLowerCase();
+                const has = (...words) => words.some(word =>
+                    action.includes(word) || id.includes(word) || className.includes(word) || buttonText.includes(word));
+
+                if (has('login') || buttonText.includes('sign in') || buttonText.includes('登录')) return 'login';
+                if (has('register') || buttonText.includes('sign up') || buttonText.includes('注册')) return 'registration';
+                if (has('search') || buttonText.includes('搜索')) return 'search';
+                if (has('contact') || buttonText.includes('send') || buttonText.includes('联系')) return 'contact';
+                if (form.querySelector('input[name="password"], input[type="password"]')) return 'authentication';
+                return 'data_entry';
+            })();
+
+            // 分析表单的关键字段
+            const formFields = Array.from(form.elements)
+                .filter(el => el.tagName !== 'BUTTON' && el.type !== 'submit' && el.type !== 'reset' && el.type !== 'button')
+                .map(el => {
+                    const fieldPurpose = (() => {
+                        const name = (el.name || '').toLowerCase();
+                        const id = (el.id || '').toLowerCase();
+                        const placeholder = (el.placeholder || '').toLowerCase();
+                        const label = el.labels && el.labels.length > 0
+                            ? el.labels[0].textContent.toLowerCase()
+                            : '';
+                        const has = (word) => name.includes(word) || id.includes(word) || placeholder.includes(word) || label.includes(word);
+
+                        if (el.type === 'password') return 'password';
+                        if (el.required) return 'required_field';
+                        if (has('email')) return 'email';
+                        if (has('name')) return 'name';
+                        if (has('phone')) return 'phone';
+                        if (has('address')) return 'address';
+                        if (has('date')) return 'date';
+                        if (el.type === 'checkbox') return 'option';
+                        if (el.type === 'radio') return 'selection';
+                        if (el.tagName === 'SELECT') return 'dropdown';
+                        if (el.tagName === 'TEXTAREA') return 'text_area';
+                        return 'text_field';
+                    })();
+
+                    return {
+                        type: el.type || el.tagName.toLowerCase(),
+                        name: el.name,
+                        id: el.id,
+                        placeholder: el.placeholder,
+                        required: el.required,
+                        disabled: el.disabled,
+                        fieldPurpose: fieldPurpose
+                    };
+                });
+
+            return {
+                id: form.id,
+                action: form.action,
+                method: form.method,
+                purpose: formPurpose,
+                formFields: formFields
+            };
+        });
+
+    // 提取页面关键交互元素（按钮、链接等）
+    collectors.interactive_elements = () => {
+        // 分析页面交互元素的结构和目的
+        const getElementPurpose = (el) => {
+            const text = (el.textContent || el.value || '').trim().toLowerCase();
+            const classes = (typeof el.className === 'string' ? el.className : '').toLowerCase();
+            const hasText = (...words) => words.some(word => text.includes(word));
+
+            // 根据文本推断按钮目的
+            if (hasText('login', 'sign in', '登录')) return 'login';
+            if (hasText('register', 'sign up', '注册')) return 'registration';
+            if (hasText('submit', 'save', '提交', '保存')) return 'submission';
+            if (hasText('search', '搜索')) return 'search';
+            if (hasText('cancel', 'close', '取消', '关闭')) return 'cancellation';
+            if (hasText('delete', 'remove', '删除', '移除')) return 'deletion';
+            if (hasText('edit', 'modify', '编辑', '修改')) return 'editing';
+            if (hasText('add', 'create', 'new', '添加', '创建')) return 'creation';
+            if (hasText('view', 'show', '查看', '显示')) return 'viewing';
+            if (hasText('next', 'continue', '下一步', '继续')) return 'navigation_forward';
+            if (hasText('previous', 'back', '上一步', '返回')) return 'navigation_backward';
+
+            // 根据类名推断
+            if (classes.includes('btn-primary') || classes.includes('primary-button')) return 'primary_action';
+            if (classes.includes('btn-secondary') || classes.includes('secondary-button')) return 'secondary_action';
+            if (classes.includes('btn-danger') || classes.includes('danger-button')) return 'danger_action';
+            if (classes.includes('btn-warning') || classes.includes('warning-button')) return 'warning_action';
+            if (classes.includes('btn-success') || classes.includes('success-button')) return 'success_action';
+
+            return 'interaction';
+        };
+
+        const isVisible = (el) => {
+            const style = window.getComputedStyle(el);
+            return style.display !== 'none' && style.visibility !== 'hidden';
+        };
+
+        // 获取重要的按钮，过滤掉隐藏、禁用和排除区域内的按钮
+        const importantButtons = buckets.buttons
+            .filter(btn => isVisible(btn) && !btn.disabled && !isInInteractiveExcludedArea(btn))
+            .map(btn => {
+                const rect = btn.getBoundingClientRect();
+                return {
+                    text: (btn.textContent || btn.value || '').trim(),
+                    type: btn.type,
+                    purpose: getElementPurpose(btn),
+                    isFormSubmit: btn.type === 'submit',
+                    isDisabled: btn.disabled,
+                    isVisible: true,
+                    position: { top: Math.round(rect.top), left: Math.round(rect.left) }
+                };
+            });
+
+        // 获取重要的链接，过滤掉空链接、隐藏链接和排除区域内的链接
+        const importantLinks = buckets.links
+            .filter(link => (link.textContent || '').trim().length > 0 && isVisible(link) && !isInInteractiveExcludedArea(link))
+            .map(link => {
+                const rect = link.getBoundingClientRect();
+                return {
+                    text: link.textContent.trim(),
+                    href: link.href,
+                    purpose: getElementPurpose(link),
+                    isExternal: link.hostname !== window.location.hostname,
+                    position: { top: Math.round(rect.top), left: Math.round(rect.left) }
+                };
+            });
+
+        return {
+            buttons: importantButtons,
+            links: importantLinks
+        };
+    };
+
+    // 提取页面内容语义结构（而不是完整文本）
+    collectors.content_structure = () => {
+        const structure = [];
+
+        // 提取标题层次结构
+        const headingStructure = buckets.headings
+            .filter(heading => !isInExcludedArea(heading))
+            .map(heading => ({
+                level: parseInt(heading.tagName.substring(1)),
+                text: heading.textContent.trim()
+            }));
+        if (headingStructure.length > 0) {
+            structure.push({ type: 'heading_hierarchy', content: headingStructure });
+        }
+
+        // 提取列表结构
+        const listStructure = buckets.lists
+            .filter(list => !isInExcludedArea(list))
+            .map(list => ({
+                type: list.tagName.toLowerCase(),
+                items: Array.from(list.querySelectorAll('li')).map(li => li.textContent.trim())
+            }));
+        if (listStructure.length > 0) {
+            structure.push({ type: 'lists', content: listStructure });
+        }
+
+        // 提取主要段落结构，智能提取段落摘要，保留关键信息
+        if (mainElement) {
+            const paragraphs = buckets.paragraphs
+                .filter(p => mainElement.contains(p) && p.textContent.trim().length > 0 && !isInExcludedArea(p))
+                .map(p => {
+                    const text = p.textContent.trim();
+                    return text.length > 100 ? text.substring(0, 100) + '...' : text;
+                });
+            if (paragraphs.length > 0) {
+                structure.push({ type: 'paragraphs', content: paragraphs });
+            }
+        }
+
+        return structure;
+    };
+
+    // 提取页面重要的错误信息和提示
+    collectors.messages = () => buckets.messages
+        .filter(el => el.textContent.trim().length > 0)
+        .map(el => {
+            const classes = (typeof el.className === 'string' ? el.className : '').toLowerCase();
+            let messageType = 'info';
+            if (classes.includes('error') || classes.includes('danger')) messageType = 'error';
+            else if (classes.includes('warn')) messageType = 'warning';
+            else if (classes.includes('success')) messageType = 'success';
+            return { type: messageType, text: el.textContent.trim() };
+        });
+
+    // 提取关键输入控件的特征
+    collectors.input_controls = () => buckets.inputs
+        .filter(el => window.getComputedStyle(el).display !== 'none')
+        .map(el => {
+            const fieldPurpose = (() => {
+                const name = (el.name || '').toLowerCase();
+                const id = (el.id || '').toLowerCase();
+                const placeholder = (el.placeholder || '').toLowerCase();
+                const has = (word) => name.includes(word) || id.includes(word) || placeholder.includes(word);
+
+                if (el.type === 'password') return 'password';
+                if (has('email')) return 'email';
+                if (has('name')) return 'name';
+                if (has('phone')) return 'phone';
+                if (has('search')) return 'search';
+                if (el.type === 'date') return 'date';
+                if (el.type === 'checkbox') return 'checkbox';
+                if (el.type === 'radio') return 'radio';
+                if (el.tagName === 'SELECT') return 'dropdown';
+                if (el.tagName === 'TEXTAREA') return 'long_text';
+                return 'text';
+            })();
+
+            return {
+                type: el.type || el.tagName.toLowerCase(),
+                purpose: fieldPurpose,
+                name: el.name,
+                id: el.id,
+                placeholder: el.placeholder,
+                required: el.required,
+                disabled: el.disabled,
+                readOnly: el.readOnly
+            };
+        });
+
+    // 每个部分单独捕获异常，保持与逐个调用时相同的错误隔离
+    const sections = {};
+    const errors = {};
+    const timings = {};
+    Object.keys(collectors).forEach(key => {
+        const start = performance.now();
+        try {
+            sections[key] = collectors[key]();
+        } catch (e) {
+            errors[key] = String(e && e.message ? e.message : e);
+        }
+        timings[key] = performance.now() - start;
+    });
+    return { sections, errors, timings };
+}"""
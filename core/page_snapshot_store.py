@@ -0,0 +1,215 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:页面快照存储模块，按URL保存上次收集的页面信息及生成的测试用例，并比较页面结构变化
+=========================================
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from config.settings import SNAPSHOT_STORE_DIR
+from utils.logger import get_logger
+from utils.helpers import ensure_dir_exists
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 参与结构比较的字段，只保留决定测试用例的结构特征，忽略位置、文本摘要和链接等易变内容
+STRUCTURE_FIELDS = {
+    "forms": ("id", "action", "method", "purpose"),
+    "form_fields": ("type", "name", "id", "placeholder", "required", "disabled", "fieldPurpose"),
+    "input_controls": ("type", "purpose", "name", "id", "placeholder", "required", "disabled", "readOnly"),
+    "functional_areas": ("type", "tagName", "id", "interactiveElementCount"),
+    "buttons": ("text", "type", "purpose", "isFormSubmit"),
+}
+
+
+def _pick(item: Dict[str, Any], fields: tuple) -> Dict[str, Any]:
+    return {field: item.get(field) for field in fields if item.get(field) not in (None, "", False)}
+
+
+def _page_info_of(page_data: Dict[str, Any]) -> Dict[str, Any]:
+    # explore_page 的返回值把页面信息放在 page_info 中
+    page_info = page_data.get("page_info")
+    return page_info if isinstance(page_info, dict) else page_data
+
+
+def structural_signature(page_data: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    提取页面的结构特征：表单、输入控件和功能区域/按钮
+
+    Args:
+        page_data (Dict[str, Any]): 页面探索数据
+
+    Returns:
+        Dict[str, List[str]]: 各部分排序后的特征列表，每个特征为紧凑JSON字符串
+    """
+    page_info = _page_info_of(page_data)
+
+    def encode(items: List[Dict[str, Any]], fields: tuple) -> List[str]:
+        return sorted({
+            json.dumps(_pick(item, fields), ensure_ascii=False, sort_keys=True)
+            for item in items if isinstance(item, dict)
+        })
+
+    forms = []
+    form_fields = []
+    for form in page_info.get("forms") or []:
+        if not isinstance(form, dict):
+            continue
+        forms.append(form)
+        form_fields.extend(form.get("formFields") or [])
+
+    interactive = page_info.get("interactive_elements") or {}
+    return {
+        "forms": encode(forms, STRUCTURE_FIELDS["forms"]),
+        "form_fields": encode(form_fields, STRUCTURE_FIELDS["form_fields"]),
+        "input_controls": encode(page_info.get("input_controls") or [], STRUCTURE_FIELDS["input_controls"]),
+        "functional_areas": encode(page_info.get("functional_areas") or [], STRUCTURE_FIELDS["functional_areas"]),
+        "buttons": encode(interactive.get("buttons") or [], STRUCTURE_FIELDS["buttons"]),
+    }
+
+
+def signature_hash(signature: Dict[str, List[str]]) -> str:
+    """
+    计算结构特征的哈希
+
+    Args:
+        signature (Dict[str, List[str]]): structural_signature 的返回值
+
+    Returns:
+        str: sha256十六进制摘要
+    """
+    return hashlib.sha256(json.dumps(signature, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def diff_signatures(old: Dict[str, List[str]], new: Dict[str, List[str]]) -> Dict[str, Dict[str, List[str]]]:
+    """
+    比较两次结构特征
+
+    Args:
+        old (Dict[str, List[str]]): 上次的结构特征
+        new (Dict[str, List[str]]): 本次的结构特征
+
+    Returns:
+        Dict[str, Dict[str, List[str]]]: 有变化的部分及其新增、删除的特征，无变化时为空字典
+    """
+    changes = {}
+    for section in sorted(set(old) | set(new)):
+        old_items = set(old.get(section, []))
+        new_items = set(new.get(section, []))
+        added = sorted(new_items - old_items)
+        removed = sorted(old_items - new_items)
+        if added or removed:
+            changes[section] = {"added": added, "removed": removed}
+    return changes
+
+
+class PageSnapshotStore:
+    """页面快照存储，每个URL一个文件，保存页面信息、结构特征和上次生成的测试用例"""
+
+    def __init__(self, store_dir: Optional[str] = None):
+        """
+        初始化页面快照存储
+
+        Args:
+            store_dir (Optional[str]): 存储目录，为None时使用配置文件中的SNAPSHOT_STORE_DIR
+        """
+        self.store_dir = store_dir or SNAPSHOT_STORE_DIR
+        ensure_dir_exists(self.store_dir)
+
+    def _snapshot_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.store_dir, f"{key}.json")
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        读取URL的上次快照
+
+        Args:
+            url (str): 页面URL
+
+        Returns:
+            Optional[Dict[str, Any]]: 快照，不存在时返回None
+        """
+        path = self._snapshot_path(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取页面快照失败 ({url}): {str(e)}")
+            return None
+
+    def save(self, url: str, page_data: Dict[str, Any], test_cases: List[Dict[str, Any]], context_hash: str) -> None:
+        """
+        保存URL的快照
+
+        Args:
+            url (str): 页面URL
+            page_data (Dict[str, Any]): 页面探索数据
+            test_cases (List[Dict[str, Any]]): 为该页面生成的测试用例
+            context_hash (str): 生成上下文（模型、需求文档等）的哈希，上下文变化时快照中的测试用例不再复用
+        """
+        signature = structural_signature(page_data)
+        snapshot = {
+            "url": url,
+            "saved_at": time.time(),
+            "context_hash": context_hash,
+            "signature_hash": signature_hash(signature),
+            "signature": signature,
+            "page_data": page_data,
+            "test_cases": test_cases
+        }
+        try:
+            # 先写临时文件再替换，避免中途退出留下不完整的快照
+            fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self._snapshot_path(url))
+        except Exception as e:
+            logger.warning(f"保存页面快照失败 ({url}): {str(e)}")
+
+    def reusable_test_cases(
+            self,
+            url: str,
+            page_data: Dict[str, Any],
+            context_hash: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        页面结构和生成上下文都未变化时返回上次生成的测试用例
+
+        Args:
+            url (str): 页面URL
+            page_data (Dict[str, Any]): 本次收集的页面探索数据
+            context_hash (str): 本次生成上下文的哈希
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 可复用的测试用例，需要重新生成时返回None
+        """
+        snapshot = self.load(url)
+        if not snapshot or not snapshot.get("test_cases"):
+            logger.info(f"页面没有可用快照，需要生成测试用例: {url}")
+            return None
+
+        if snapshot.get("context_hash") != context_hash:
+            logger.info(f"需求文档或生成配置已变化，需要重新生成测试用例: {url}")
+            return None
+
+        signature = structural_signature(page_data)
+        if snapshot.get("signature_hash") == signature_hash(signature):
+            return snapshot["test_cases"]
+
+        changes = diff_signatures(snapshot.get("signature") or {}, signature)
+        summary = "，".join(
+            f"{section} +{len(change['added'])} -{len(change['removed'])}" for section, change in changes.items()
+        )
+        logger.info(f"页面结构已变化（{summary}），需要重新生成测试用例: {url}")
+        return None
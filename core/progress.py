@@ -0,0 +1,98 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:进度报告模块，记录生成流程各阶段的事件及耗时
+=========================================
+"""
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 进度阶段
+STAGE_JOB_STARTED = "job_started"
+STAGE_BROWSER_READY = "browser_ready"
+STAGE_LOGIN_DONE = "login_done"
+STAGE_PAGE_COLLECTED = "page_collected"
+STAGE_REQUIREMENTS_LOADED = "requirements_loaded"
+STAGE_GENERATION_STARTED = "generation_started"
+STAGE_TOKENS_STREAMED = "tokens_streamed"
+STAGE_CASE_PARSED = "case_parsed"
+STAGE_RESPONSE_TRUNCATED = "response_truncated"
+STAGE_GENERATION_DONE = "generation_done"
+STAGE_EXCEL_WRITTEN = "excel_written"
+STAGE_JOB_SUCCEEDED = "job_succeeded"
+STAGE_JOB_FAILED = "job_failed"
+
+ProgressSink = Callable[[Dict[str, Any]], None]
+
+
+class ProgressReporter:
+    """
+    进度报告器
+
+    每个事件包含阶段名、说明、自开始以来的耗时（elapsed_ms）、距上一个事件的耗时（delta_ms）
+    以及该阶段已出现的次数（count，如"第N个页面"），事件交给sink处理（如写入任务数据库）。
+    """
+
+    def __init__(self, sink: Optional[ProgressSink] = None):
+        """
+        初始化进度报告器
+
+        Args:
+            sink (Optional[ProgressSink]): 事件处理函数，为None时只写日志
+        """
+        self.sink = sink
+        self.started_at = time.time()
+        self._start = time.monotonic()
+        self._last = self._start
+        self._counts: Dict[str, int] = {}
+
+    def emit(self, stage: str, message: str = "", **data: Any) -> Dict[str, Any]:
+        """
+        报告一个进度事件
+
+        Args:
+            stage (str): 阶段名
+            message (str): 说明
+            **data: 附加数据
+
+        Returns:
+            Dict[str, Any]: 事件
+        """
+        now = time.monotonic()
+        self._counts[stage] = self._counts.get(stage, 0) + 1
+        event = {
+            "stage": stage,
+            "message": message,
+            "count": self._counts[stage],
+            "elapsed_ms": int((now - self._start) * 1000),
+            "delta_ms": int((now - self._last) * 1000),
+            "data": data
+        }
+        self._last = now
+        logger.debug(f"进度 [{stage}] {message} (+{event['delta_ms']} ms)")
+        if self.sink:
+            try:
+                self.sink(event)
+            except Exception as e:
+                # 进度报告失败不影响生成流程
+                logger.warning(f"记录进度事件失败: {str(e)}")
+        return event
+
+    def count(self, stage: str) -> int:
+        """
+        获取某阶段已报告的次数
+
+        Args:
+            stage (str): 阶段名
+
+        Returns:
+            int: 次数
+        """
+        return self._counts.get(stage, 0)
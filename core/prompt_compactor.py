@@ -0,0 +1,255 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:提示信息压缩模块，在页面数据写入提示信息前去除低价值字段和重复元素，使其符合token预算
+=========================================
+"""
+import copy
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import PROMPT_TOKEN_BUDGET
+from utils.logger import get_logger
+from utils.helpers import estimate_tokens
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 始终去除的字段：对设计测试用例没有帮助
+DROPPED_FIELDS = {"timestamp", "success", "isVisible"}
+
+# 判断列表元素是否重复时忽略的字段：同一链接或按钮出现在页面不同位置时只保留一个
+DEDUPE_IGNORED_FIELDS = {"position"}
+
+# 字符串最大长度，超出部分截断
+MAX_STRING_LENGTH = 200
+
+
+def to_compact_json(data: Any) -> str:
+    """
+    序列化为紧凑JSON（无缩进、无多余空格）
+
+    Args:
+        data (Any): 要序列化的数据
+
+    Returns:
+        str: JSON字符串
+    """
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _normalize(value: Any) -> Any:
+    """
+    去除固定的低价值字段、空值和False，截断过长字符串，并去除列表中的重复元素
+
+    Returns:
+        Any: 处理后的值，值为空时返回None
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in DROPPED_FIELDS:
+                continue
+            item = _normalize(item)
+            if item is not None:
+                result[key] = item
+        return result or None
+
+    if isinstance(value, list):
+        result = []
+        seen = set()
+        for item in value:
+            item = _normalize(item)
+            if item is None:
+                continue
+            if isinstance(item, dict):
+                key = to_compact_json({k: v for k, v in item.items() if k not in DEDUPE_IGNORED_FIELDS})
+            else:
+                key = to_compact_json(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            result.append(item)
+        return result or None
+
+    if isinstance(value, str):
+        value = value.strip()
+        if len(value) > MAX_STRING_LENGTH:
+            value = value[:MAX_STRING_LENGTH] + "..."
+        return value or None
+
+    # 布尔字段缺省即为False
+    if value is None or value is False:
+        return None
+    return value
+
+
+def _sections_of(page: Dict[str, Any]) -> Dict[str, Any]:
+    # explore_page 的返回值把页面信息放在 page_info 中
+    page_info = page.get("page_info")
+    return page_info if isinstance(page_info, dict) else page
+
+
+def _walk(value: Any, visit: Callable[[Dict[str, Any]], None]) -> None:
+    if isinstance(value, dict):
+        visit(value)
+        for item in value.values():
+            _walk(item, visit)
+    elif isinstance(value, list):
+        for item in value:
+            _walk(item, visit)
+
+
+def _drop_positions(page: Dict[str, Any]) -> None:
+    _walk(page, lambda node: node.pop("position", None))
+
+
+def _drop_meta(page: Dict[str, Any]) -> None:
+    _sections_of(page).pop("meta", None)
+
+
+def _drop_external_links(page: Dict[str, Any]) -> None:
+    interactive = _sections_of(page).get("interactive_elements")
+    if isinstance(interactive, dict) and isinstance(interactive.get("links"), list):
+        interactive["links"] = [link for link in interactive["links"] if not link.get("isExternal")]
+
+
+def _drop_paragraphs(page: Dict[str, Any]) -> None:
+    sections = _sections_of(page)
+    if isinstance(sections.get("content_structure"), list):
+        sections["content_structure"] = [
+            block for block in sections["content_structure"] if block.get("type") != "paragraphs"
+        ]
+
+
+def _drop_page_structure(page: Dict[str, Any]) -> None:
+    _sections_of(page).pop("page_structure", None)
+
+
+def _cap_lists(limit: int) -> Callable[[Dict[str, Any]], None]:
+    def cap(page: Dict[str, Any]) -> None:
+        def visit(node: Dict[str, Any]) -> None:
+            for key, item in node.items():
+                if isinstance(item, list) and len(item) > limit:
+                    node[key] = item[:limit]
+        _walk(page, visit)
+    return cap
+
+
+# 超出预算时逐级去除的内容，按价值从低到高排列
+# 每一级为 (名称, 处理函数)，处理函数原地修改单个页面的数据
+COMPACTION_STAGES: List[Tuple[str, Callable[[Dict[str, Any]], None]]] = [
+    ("position", _drop_positions),
+    ("meta", _drop_meta),
+    ("external_links", _drop_external_links),
+    ("paragraphs", _drop_paragraphs),
+    ("page_structure", _drop_page_structure),
+    ("lists>50", _cap_lists(50)),
+    ("lists>20", _cap_lists(20)),
+    ("lists>10", _cap_lists(10)),
+    ("lists>5", _cap_lists(5)),
+]
+
+
+class PromptCompactor:
+    """提示信息压缩器，将页面数据压缩到token预算内并记录各部分使用的预算"""
+
+    def __init__(self, token_budget: Optional[int] = None):
+        """
+        初始化提示信息压缩器
+
+        Args:
+            token_budget (Optional[int]): 页面数据的token预算，为None时使用配置文件中的PROMPT_TOKEN_BUDGET，0表示不限制
+        """
+        self.token_budget = PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+        self.last_report: Dict[str, Any] = {}
+
+    def compact_page(self, page_data: Dict[str, Any], token_budget: Optional[int] = None) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        压缩单个页面的数据
+
+        Args:
+            page_data (Dict[str, Any]): 页面探索数据，不会被修改
+            token_budget (Optional[int]): token预算，为None时使用初始化时的预算
+
+        Returns:
+            Tuple[Dict[str, Any], List[str]]: 压缩后的页面数据和为满足预算执行的压缩级别
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        page = _normalize(copy.deepcopy(page_data)) or {}
+
+        applied = []
+        for name, stage in COMPACTION_STAGES:
+            if budget <= 0 or estimate_tokens(to_compact_json(page)) <= budget:
+                break
+            stage(page)
+            # 去除字段后可能出现新的空值和重复元素
+            page = _normalize(page) or {}
+            applied.append(name)
+        return page, applied
+
+    def compact_pages(self, pages_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        压缩多个页面的数据，预算在页面之间平均分配，并更新 last_report
+
+        Args:
+            pages_data (Dict[str, Dict[str, Any]]): 多个页面的探索数据，以URL为键
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 压缩后的页面数据，顺序与输入一致
+        """
+        page_budget = self.token_budget // len(pages_data) if self.token_budget > 0 and pages_data else 0
+
+        compacted = {}
+        original_tokens = 0
+        section_tokens: Dict[str, int] = {}
+        applied_stages: Dict[str, List[str]] = {}
+        for url, page_data in pages_data.items():
+            original_tokens += estimate_tokens(json.dumps(page_data, ensure_ascii=False, indent=2))
+            page, applied = self.compact_page(page_data, page_budget)
+            compacted[url] = page
+            if applied:
+                applied_stages[url] = applied
+            for section, value in _sections_of(page).items():
+                section_tokens[section] = section_tokens.get(section, 0) + estimate_tokens(to_compact_json(value))
+
+        total_tokens = estimate_tokens(to_compact_json(compacted))
+        self.last_report = {
+            "budget": self.token_budget,
+            "original_tokens": original_tokens,
+            "total_tokens": total_tokens,
+            "sections": section_tokens,
+            "applied_stages": applied_stages
+        }
+        logger.info(f"页面数据压缩: {original_tokens} -> {total_tokens} tokens（预算 {self.token_budget or '不限'}）")
+        logger.info(f"各部分token用量: {json.dumps(section_tokens, ensure_ascii=False)}")
+        if self.token_budget > 0 and total_tokens > self.token_budget:
+            logger.warning(f"页面数据压缩后仍超出预算: {total_tokens} > {self.token_budget}")
+        return compacted
+
+    def serialize_pages(self, pages_data: Dict[str, Dict[str, Any]]) -> str:
+        """
+        压缩多个页面的数据并序列化为紧凑JSON
+
+        Args:
+            pages_data (Dict[str, Dict[str, Any]]): 多个页面的探索数据，以URL为键
+
+        Returns:
+            str: JSON字符串
+        """
+        return to_compact_json(self.compact_pages(pages_data))
+
+    def serialize_page(self, page_data: Dict[str, Any]) -> str:
+        """
+        压缩单个页面的数据并序列化为紧凑JSON
+
+        Args:
+            page_data (Dict[str, Any]): 页面探索数据
+
+        Returns:
+            str: JSON字符串
+        """
+        url = page_data.get("url", "") if isinstance(page_data, dict) else ""
+        return to_compact_json(self.compact_pages({url: page_data})[url])
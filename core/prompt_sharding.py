@@ -0,0 +1,198 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:提示信息分片模块，将多页面数据和需求文档按token预算切分为多个分片，供并行生成测试用例
+=========================================
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from config.settings import GENERATION_SHARD_TOKENS, PROMPT_COMPACTION
+from core.prompt_compactor import to_compact_json
+from utils.logger import get_logger
+from utils.helpers import estimate_tokens
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 切分超出预算的需求文档时依次尝试的边界：段落、行、句子；分隔符保留在前一片段末尾，片段拼接后与原文一致
+SPLIT_BOUNDARIES = [r"(?<=\n\n)", r"(?<=\n)", r"(?<=[。！？；!?;.])"]
+
+
+class PromptShard:
+    """一次API调用需要的页面数据和需求文档"""
+
+    def __init__(self, pages_data: Dict[str, Dict[str, Any]], requirements: Dict[str, str]):
+        self.pages_data = pages_data
+        self.requirements = requirements  # 以原始文档名为键，切分过的文档只包含本分片中的部分
+        self.tokens = 0  # 估算的数据token数
+
+
+def _page_tokens(page_data: Dict[str, Any]) -> int:
+    # 与提示信息中的序列化方式保持一致
+    if PROMPT_COMPACTION:
+        return estimate_tokens(to_compact_json(page_data))
+    return estimate_tokens(json.dumps(page_data, ensure_ascii=False, indent=2))
+
+
+def _pack(items: List[tuple], budget: int) -> List[List[tuple]]:
+    """
+    按顺序把 (键, 值, token数) 装箱，每箱不超过预算；单项超出预算时独占一箱
+
+    Args:
+        items (List[tuple]): (键, 值, token数) 列表
+        budget (int): 每箱token预算
+
+    Returns:
+        List[List[tuple]]: 装箱结果
+    """
+    bins: List[List[tuple]] = []
+    current: List[tuple] = []
+    current_tokens = 0
+    for item in items:
+        if current and current_tokens + item[2] > budget:
+            bins.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += item[2]
+    if current:
+        bins.append(current)
+    return bins
+
+
+def _split_text(text: str, budget: int, level: int = 0) -> List[str]:
+    """
+    将文本切分为token数都不超过预算的片段，依次按段落、行、句子切分，单句仍超出预算时按字符数截断
+
+    Args:
+        text (str): 文本
+        budget (int): 每个片段的token预算
+        level (int): 当前使用的 SPLIT_BOUNDARIES 序号
+
+    Returns:
+        List[str]: 片段列表，按顺序拼接后与原文一致
+    """
+    if estimate_tokens(text) <= budget:
+        return [text]
+    if level < len(SPLIT_BOUNDARIES):
+        pieces = []
+        for piece in re.split(SPLIT_BOUNDARIES[level], text):
+            if piece:
+                pieces.extend(_split_text(piece, budget, level + 1))
+        return pieces
+    # 每个字符最多估算为一个token，按预算的字符数截断一定不超出预算
+    return [text[i:i + budget] for i in range(0, len(text), budget)]
+
+
+def _split_document(name: str, content: str, budget: int) -> List[tuple]:
+    """
+    将超出预算的需求文档切分为多个部分，各部分仍使用原始文档名，便于AI标注和推断需求来源
+
+    Args:
+        name (str): 文档名
+        content (str): 文档内容
+        budget (int): 每部分token预算
+
+    Returns:
+        List[tuple]: (文档名, 内容, token数) 列表
+    """
+    tokens = estimate_tokens(content)
+    if tokens <= budget:
+        return [(name, content, tokens)]
+
+    pieces = [(None, piece, estimate_tokens(piece)) for piece in _split_text(content, budget)]
+    parts = []
+    for group in _pack(pieces, budget):
+        text = "".join(p[1] for p in group).strip()
+        if text:
+            parts.append((name, text, estimate_tokens(text)))
+    logger.info(f"需求文档 {name} 约 {tokens} tokens，被切分为 {len(parts)} 个部分")
+    return parts
+
+
+def plan_prompt_shards(
+        pages_data: Dict[str, Dict[str, Any]],
+        new_requirements: Optional[Dict[str, str]] = None,
+        token_budget: Optional[int] = None
+) -> List[PromptShard]:
+    """
+    按token预算切分页面数据和需求文档
+
+    需求文档不超过预算一半时，每个分片都携带完整需求，页面数据按剩余预算装箱；
+    否则需求文档也按段落（过长时按行、句子）切分装箱，与页面分组轮流配对，保证每个页面和每段需求至少出现在一个分片中；
+    切分出的部分仍以原始文档名出现在分片中，同一文档的多个部分位于同一分片时按顺序合并。
+    单个页面超出预算时独占一个分片。
+
+    Args:
+        pages_data (Dict[str, Dict[str, Any]]): 多个页面的探索数据，以URL为键
+        new_requirements (Optional[Dict[str, str]]): 多个需求文档内容，以文件名为键
+        token_budget (Optional[int]): 每个分片的数据token预算，为None时使用配置文件中的GENERATION_SHARD_TOKENS
+
+    Returns:
+        List[PromptShard]: 分片列表，页面顺序与输入一致
+    """
+    budget = max(1, token_budget or GENERATION_SHARD_TOKENS)
+    new_requirements = new_requirements or {}
+
+    page_items = [(url, data, _page_tokens(data)) for url, data in pages_data.items()]
+    requirement_tokens = sum(estimate_tokens(content) for content in new_requirements.values())
+
+    if requirement_tokens <= budget // 2:
+        page_bins = _pack(page_items, budget - requirement_tokens) or [[]]
+        requirement_bins = [[(name, content, 0) for name, content in new_requirements.items()]]
+    else:
+        requirement_items = []
+        for name, content in new_requirements.items():
+            requirement_items.extend(_split_document(name, content, budget // 2))
+        requirement_bins = _pack(requirement_items, budget // 2)
+        page_bins = _pack(page_items, budget // 2) or [[]]
+
+    shards = []
+    for index in range(max(len(page_bins), len(requirement_bins))):
+        page_bin = page_bins[index % len(page_bins)]
+        requirement_bin = requirement_bins[index % len(requirement_bins)]
+        requirements: Dict[str, str] = {}
+        for name, content, _ in requirement_bin:
+            requirements[name] = f"{requirements[name]}\n\n{content}" if name in requirements else content
+        shard = PromptShard(
+            pages_data={url: data for url, data, _ in page_bin},
+            requirements=requirements
+        )
+        shard.tokens = sum(item[2] for item in page_bin) + sum(
+            estimate_tokens(content) for content in shard.requirements.values()
+        )
+        if shard.tokens > budget:
+            logger.warning(f"分片数据约 {shard.tokens} tokens，超出预算 {budget}: {list(shard.pages_data.keys())}")
+        shards.append(shard)
+
+    logger.info(f"{len(pages_data)} 个页面和 {len(new_requirements)} 个需求文档被切分为 {len(shards)} 个分片")
+    return shards
+
+
+def merge_shard_results(shard_results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    按分片顺序合并测试用例，去掉标题和步骤完全相同的重复用例，并重新编号test_id
+
+    Args:
+        shard_results (List[List[Dict[str, Any]]]): 每个分片生成的测试用例列表
+
+    Returns:
+        List[Dict[str, Any]]: 合并后的测试用例列表
+    """
+    merged = []
+    seen = set()
+    for test_cases in shard_results:
+        for tc in test_cases:
+            key = (str(tc.get("test_title", "")), json.dumps(tc.get("test_steps", []), ensure_ascii=False))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(tc)
+
+    width = max(3, len(str(len(merged))))
+    for index, tc in enumerate(merged, 1):
+        tc["test_id"] = f"TC{index:0{width}d}"
+    return merged
@@ -0,0 +1,144 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:资源过滤模块，在浏览器上下文中拦截页面信息收集用不到的重资源请求
+=========================================
+"""
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from playwright.async_api import BrowserContext, Response, Route
+
+from config.settings import BLOCKED_RESOURCE_TYPES, BLOCKED_URL_PATTERNS
+from utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+# 没有同类型已放行响应可参考时，各资源类型单个响应的典型大小（字节），用于估算节省的流量
+TYPICAL_RESOURCE_BYTES = {
+    "image": 20 * 1024,
+    "font": 30 * 1024,
+    "media": 300 * 1024,
+    "stylesheet": 10 * 1024,
+    "script": 20 * 1024,
+}
+
+
+class ResourceFilter:
+    """资源过滤器，按资源类型和URL片段拦截请求，并统计节省的请求数和流量"""
+
+    def __init__(
+            self,
+            blocked_types: Optional[Iterable[str]] = None,
+            blocked_url_patterns: Optional[Iterable[str]] = None
+    ):
+        """
+        初始化资源过滤器
+
+        Args:
+            blocked_types (Optional[Iterable[str]]): 要拦截的资源类型（如 image, media, font），
+                为None时使用配置文件中的BLOCKED_RESOURCE_TYPES
+            blocked_url_patterns (Optional[Iterable[str]]): 要拦截的URL片段（如统计、广告域名），
+                为None时使用配置文件中的BLOCKED_URL_PATTERNS
+        """
+        if blocked_types is None:
+            blocked_types = BLOCKED_RESOURCE_TYPES
+        if blocked_url_patterns is None:
+            blocked_url_patterns = BLOCKED_URL_PATTERNS
+
+        self.blocked_types = {t.strip().lower() for t in blocked_types if t.strip()}
+        patterns = [p.strip() for p in blocked_url_patterns if p.strip()]
+        # 所有URL片段合并为一个正则，每个请求只匹配一次
+        self._url_regex = re.compile("|".join(re.escape(p) for p in patterns), re.IGNORECASE) if patterns else None
+
+        self.blocked_requests = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+        self._bytes_by_type: Dict[str, int] = {}
+        self._sized_by_type: Dict[str, int] = {}
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """
+        判断请求是否应被拦截
+
+        Args:
+            resource_type (str): Playwright资源类型
+            url (str): 请求URL
+
+        Returns:
+            bool: 是否拦截
+        """
+        if resource_type in self.blocked_types:
+            return True
+        return bool(self._url_regex and self._url_regex.search(url))
+
+    async def attach(self, context: BrowserContext) -> None:
+        """
+        在浏览器上下文上启用请求拦截
+
+        Args:
+            context (BrowserContext): 浏览器上下文
+        """
+        await context.route("**/*", self._handle_route)
+        context.on("response", self._on_response)
+
+    async def _handle_route(self, route: Route) -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked_requests += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _on_response(self, response: Response) -> None:
+        self.allowed_requests += 1
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except (TypeError, ValueError):
+            size = 0
+        if size <= 0:
+            return
+
+        resource_type = response.request.resource_type
+        self.allowed_bytes += size
+        self._bytes_by_type[resource_type] = self._bytes_by_type.get(resource_type, 0) + size
+        self._sized_by_type[resource_type] = self._sized_by_type.get(resource_type, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取本次运行的拦截统计
+
+        被拦截的请求没有下载，节省的流量按同类型已放行响应的平均大小估算；某类型的资源全部被拦截
+        （默认拦截的图片、媒体和字体通常如此）时使用 TYPICAL_RESOURCE_BYTES 中的典型大小；
+        两者都没有的类型计入 unestimated_requests。有请求被拦截但都无法估算时 estimated_saved_bytes 为None
+
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        estimated_saved_bytes = 0
+        unestimated_requests = 0
+        for resource_type, count in self.blocked_by_type.items():
+            sized = self._sized_by_type.get(resource_type, 0)
+            if sized:
+                estimated_saved_bytes += count * self._bytes_by_type[resource_type] // sized
+            elif resource_type in TYPICAL_RESOURCE_BYTES:
+                estimated_saved_bytes += count * TYPICAL_RESOURCE_BYTES[resource_type]
+            else:
+                unestimated_requests += count
+
+        if unestimated_requests and unestimated_requests == self.blocked_requests:
+            estimated_saved_bytes = None
+
+        return {
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "allowed_requests": self.allowed_requests,
+            "allowed_bytes": self.allowed_bytes,
+            "estimated_saved_bytes": estimated_saved_bytes,
+            "unestimated_requests": unestimated_requests
+        }
@@ -0,0 +1,156 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:登录会话缓存模块，将登录成功后的storage_state保存到磁盘，供后续运行复用
+=========================================
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import SESSION_CACHE_DIR, SESSION_CACHE_TTL
+from core.crawl_frontier import normalize_url, url_origin
+from utils.logger import get_logger
+from utils.helpers import ensure_dir_exists
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+
+class SessionCache:
+    """
+    登录会话缓存，以URL的源（协议+主机+端口）和用户名为键保存Playwright的storage_state
+
+    同一站点的多个页面共用一个会话，多URL运行时只需登录一次
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[int] = None):
+        """
+        初始化登录会话缓存
+
+        Args:
+            cache_dir (Optional[str]): 缓存目录，为None时使用配置文件中的SESSION_CACHE_DIR
+            ttl (Optional[int]): 缓存有效期（秒），为None时使用配置文件中的SESSION_CACHE_TTL
+        """
+        self.cache_dir = cache_dir or SESSION_CACHE_DIR
+        self.ttl = SESSION_CACHE_TTL if ttl is None else ttl
+        self._login_locks: Dict[str, asyncio.Lock] = {}
+        ensure_dir_exists(self.cache_dir)
+
+    def _cache_path(self, url: str, username: str) -> str:
+        origin = url_origin(normalize_url(url) or url)
+        key = hashlib.sha256(f"{origin}\n{username}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def login_lock(self, url: str, username: str) -> asyncio.Lock:
+        """
+        获取同一站点、同一用户的登录锁，并发探索同一站点的多个URL时只有一个执行登录，其余等待后复用其会话
+
+        Args:
+            url (str): 页面URL
+            username (str): 用户名
+
+        Returns:
+            asyncio.Lock: 登录锁
+        """
+        return self._login_locks.setdefault(self._cache_path(url, username), asyncio.Lock())
+
+    def load(self, url: str, username: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的登录会话
+
+        Args:
+            url (str): 页面URL，按其源查找
+            username (str): 用户名
+
+        Returns:
+            Optional[Dict[str, Any]]: storage_state，不存在或已过期时返回None
+        """
+        path = self._cache_path(url, username)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception as e:
+            logger.warning(f"读取登录会话缓存失败: {str(e)}")
+            self._remove(path)
+            return None
+
+        if self._is_expired(entry):
+            logger.info(f"登录会话缓存已过期: {url_origin(url)}")
+            self._remove(path)
+            return None
+
+        logger.info(f"命中登录会话缓存: {url_origin(url)}")
+        return entry.get("storage_state")
+
+    def save(self, url: str, username: str, storage_state: Dict[str, Any]) -> None:
+        """
+        保存登录会话
+
+        Args:
+            url (str): 页面URL，按其源保存
+            username (str): 用户名
+            storage_state (Dict[str, Any]): BrowserContext.storage_state() 的返回值
+        """
+        self.evict_expired()
+
+        path = self._cache_path(url, username)
+        entry = {
+            "origin": url_origin(url),
+            "username": username,
+            "saved_at": time.time(),
+            "storage_state": storage_state
+        }
+        try:
+            # 会话中包含登录凭证，仅当前用户可读写
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            logger.info(f"已缓存登录会话: {url_origin(url)}")
+        except Exception as e:
+            logger.warning(f"保存登录会话缓存失败: {str(e)}")
+
+    def invalidate(self, url: str, username: str) -> None:
+        """
+        删除缓存的登录会话
+
+        Args:
+            url (str): 页面URL，按其源删除
+            username (str): 用户名
+        """
+        self._remove(self._cache_path(url, username))
+
+    def evict_expired(self) -> None:
+        """删除所有已过期的登录会话"""
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except Exception:
+                self._remove(path)
+                continue
+            if self._is_expired(entry):
+                self._remove(path)
+
+    def _is_expired(self, entry: Dict[str, Any]) -> bool:
+        if self.ttl <= 0:
+            return False
+        return time.time() - entry.get("saved_at", 0) > self.ttl
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
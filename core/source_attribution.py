@@ -0,0 +1,223 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:测试用例来源推断，每次生成只建立一次页面和需求文档的索引，单次扫描测试用例文本确定页面来源和需求来源
+=========================================
+"""
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Pattern
+from urllib.parse import urlsplit
+
+MULTI_PAGE_SOURCE = "多页面"
+MIXED_REQUIREMENT_SOURCE = "综合需求"
+
+# 路径去掉斜杠后短于该长度时不作为别名，避免 /a 这类路径误匹配
+MIN_PATH_ALIAS_LENGTH = 3
+
+# 去掉扩展名的需求文档名称短于该长度时不作为别名，避免 登录.md、订单.docx 匹配所有标题含"登录"、"订单"的测试用例
+MIN_REQUIREMENT_ALIAS_LENGTH = 6
+
+
+def _url_aliases(url: str) -> List[str]:
+    """
+    页面URL在测试用例中可能出现的写法：完整URL、去掉末尾斜杠、去掉协议、路径（含查询参数）
+
+    Args:
+        url (str): 页面URL
+
+    Returns:
+        List[str]: 别名列表，第一个为完整URL
+    """
+    aliases = [url, url.rstrip("/")]
+    parts = urlsplit(url)
+    if parts.netloc:
+        without_scheme = url.split("://", 1)[-1]
+        aliases.extend([without_scheme, without_scheme.rstrip("/")])
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    if len(path.strip("/")) >= MIN_PATH_ALIAS_LENGTH:
+        aliases.extend([path, path.rstrip("/")])
+    return aliases
+
+
+def _requirement_aliases(name: str) -> List[str]:
+    """需求文档在测试用例中可能出现的写法：文件名，以及足够长时去掉扩展名的文件名"""
+    aliases = [name]
+    stem = os.path.splitext(name)[0]
+    if len(stem.strip()) >= MIN_REQUIREMENT_ALIAS_LENGTH:
+        aliases.append(stem)
+    return aliases
+
+
+def _build_alias_index(names: Iterable[str], alias_builder) -> Dict[str, Optional[str]]:
+    """
+    建立 别名 -> 名称 的索引，多个名称共用的别名（如相同路径）不用于推断
+
+    Args:
+        names (Iterable[str]): 页面URL或需求文档名称
+        alias_builder: 生成别名的函数
+
+    Returns:
+        Dict[str, Optional[str]]: 别名 -> 名称，有歧义的别名为None
+    """
+    index: Dict[str, Optional[str]] = {}
+    for name in names:
+        for alias in alias_builder(name):
+            if not alias:
+                continue
+            if alias in index and index[alias] != name:
+                index[alias] = None
+            else:
+                index.setdefault(alias, name)
+    # 名称本身总能对应到自己
+    for name in names:
+        index[name] = name
+    return index
+
+
+def _build_alias_pattern(aliases: Iterable[str]) -> Optional[Pattern]:
+    """
+    将别名组成前缀树后编译为一个正则表达式
+
+    共同前缀只匹配一次，每个位置按首字符选择分支，扫描耗时随文本长度线性增长，基本不受页面数量影响；
+    较长的别名写成可选的后缀（如 /orders(?:/detail)?），同一位置优先匹配最长（最具体）的别名。
+    别名应已转为小写，匹配时文本也转为小写。
+
+    Args:
+        aliases (Iterable[str]): 别名
+
+    Returns:
+        Optional[Pattern]: 正则表达式，没有别名时为None
+    """
+    trie: Dict[str, Any] = {}
+    for alias in aliases:
+        node = trie
+        for char in alias:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    if not trie:
+        return None
+
+    def to_regex(node: Dict[str, Any]) -> str:
+        children = sorted((char, child) for char, child in node.items() if char)
+        if not children:
+            return ""
+        branches = [re.escape(char) + to_regex(child) for char, child in children]
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # 有别名在此结束时，后面更长的部分可选
+        return f"(?:{body})?" if "" in node else body
+
+    return re.compile(to_regex(trie))
+
+
+class SourceAttributionIndex:
+    """页面来源和需求来源索引，每次生成建立一次，之后每个测试用例只扫描一遍标题和步骤"""
+
+    def __init__(self, page_urls: Iterable[str], requirement_names: Optional[Iterable[str]] = None):
+        """
+        初始化索引
+
+        Args:
+            page_urls (Iterable[str]): 本次生成涉及的页面URL
+            requirement_names (Optional[Iterable[str]]): 本次生成涉及的需求文档名称
+        """
+        self.page_urls = list(page_urls)
+        self.requirement_names = list(requirement_names or [])
+
+        page_index = _build_alias_index(self.page_urls, _url_aliases)
+        self._page_aliases = {alias.lower(): url for alias, url in page_index.items() if url is not None}
+        self._page_pattern = _build_alias_pattern(self._page_aliases)
+
+        requirement_index = _build_alias_index(self.requirement_names, _requirement_aliases)
+        self._requirement_aliases = {alias.lower(): name for alias, name in requirement_index.items() if name is not None}
+        self._requirement_pattern = _build_alias_pattern(self._requirement_aliases)
+        # AI标注的来源整体比较，不会误匹配，较短的名称也可以不带扩展名
+        tag_index = _build_alias_index(self.requirement_names, lambda name: [name, os.path.splitext(name)[0]])
+        self._requirement_tags = {alias.lower(): name for alias, name in tag_index.items() if name is not None}
+
+    @staticmethod
+    def _longest_match(pattern: Optional[Pattern], aliases: Dict[str, str], texts: Iterable[Any]) -> Optional[str]:
+        """
+        在文本中查找别名，多处匹配时取最长的别名，如同时出现 /orders 和 /orders/detail 时取后者
+
+        Returns:
+            Optional[str]: 对应的页面URL或需求文档名称
+        """
+        if pattern is None:
+            return None
+        best = ""
+        for text in texts:
+            if not text:
+                continue
+            for match in pattern.finditer(str(text).lower()):
+                if len(match.group(0)) > len(best):
+                    best = match.group(0)
+        return aliases.get(best) if best else None
+
+    def _resolve_tag(
+            self,
+            tag: Any,
+            pattern: Optional[Pattern],
+            aliases: Dict[str, str],
+            exact_aliases: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
+        """解析AI标注的来源：先按别名精确查找（exact_aliases 中的别名只用于精确查找），再在标注文本中查找别名"""
+        if not tag or not isinstance(tag, str):
+            return None
+        key = tag.strip().lower()
+        return (aliases.get(key) or (exact_aliases or {}).get(key)
+                or self._longest_match(pattern, aliases, [tag]))
+
+    def page_source(self, test_case: Dict[str, Any]) -> str:
+        """
+        推断测试用例的页面来源
+
+        依次使用：AI标注的 page_source、标题中出现的页面、步骤中出现的页面；都没有时，
+        只有一个页面则为该页面，否则为"多页面"
+
+        Args:
+            test_case (Dict[str, Any]): 测试用例
+
+        Returns:
+            str: 页面URL或"多页面"
+        """
+        page = self._resolve_tag(test_case.get("page_source"), self._page_pattern, self._page_aliases)
+        if page is None:
+            page = self._longest_match(self._page_pattern, self._page_aliases, [test_case.get("test_title", "")])
+        if page is None:
+            steps = test_case.get("test_steps", [])
+            if isinstance(steps, str):
+                steps = [steps]
+            if isinstance(steps, list):
+                page = self._longest_match(self._page_pattern, self._page_aliases, steps)
+        if page is None and len(self.page_urls) == 1:
+            page = self.page_urls[0]
+        return page or MULTI_PAGE_SOURCE
+
+    def requirement_source(self, test_case: Dict[str, Any]) -> str:
+        """
+        推断测试用例的需求来源
+
+        依次使用：AI标注的 requirement_source、标题中出现的需求文档名称（足够长的名称可不带扩展名）；都没有时，
+        只有一个需求文档则为该文档，否则为"综合需求"
+
+        Args:
+            test_case (Dict[str, Any]): 测试用例
+
+        Returns:
+            str: 需求文档名称或"综合需求"
+        """
+        requirement = self._resolve_tag(
+            test_case.get("requirement_source"), self._requirement_pattern, self._requirement_aliases,
+            self._requirement_tags
+        )
+        if requirement is None:
+            requirement = self._longest_match(
+                self._requirement_pattern, self._requirement_aliases, [test_case.get("test_title", "")]
+            )
+        if requirement is None and len(self.requirement_names) == 1:
+            requirement = self.requirement_names[0]
+        return requirement or MIXED_REQUIREMENT_SOURCE
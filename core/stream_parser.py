@@ -0,0 +1,133 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:流式响应解析模块，在AI响应逐段到达时增量解析出完整的测试用例对象
+=========================================
+"""
+import json
+from typing import Any, Dict, List
+
+from utils.logger import get_logger
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+
+class IncrementalTestCaseParser:
+    """
+    增量测试用例解析器
+
+    逐字符扫描响应文本：跳过第一个 '[' 之前的说明文字和代码块标记，
+    在JSON数组内跟踪字符串、转义和括号深度，每当一个顶层对象的右括号到达时立即解析并返回该对象。
+    字符串之外的 // 注释会被忽略（模型有时会照抄格式示例中的注释）。
+    """
+
+    def __init__(self):
+        self.in_array = False  # 是否已进入顶层数组
+        self.finished = False  # 顶层数组是否已结束
+        self.depth = 0  # 数组内的括号深度
+        self.in_string = False
+        self.escape = False
+        self.in_comment = False
+        self.pending_slash = False
+        self._buffer: List[str] = []  # 当前对象的字符
+        self.parsed_count = 0
+        self.failed_count = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        输入一段响应文本
+
+        Args:
+            chunk (str): 新到达的文本
+
+        Returns:
+            List[Dict[str, Any]]: 本段文本中完成的测试用例
+        """
+        completed = []
+        for char in chunk:
+            if self.finished:
+                break
+            case = self._feed_char(char)
+            if case is not None:
+                completed.append(case)
+        return completed
+
+    def _feed_char(self, char: str):
+        if self.in_comment:
+            if char == "\n":
+                self.in_comment = False
+                self._append(char)
+            return None
+
+        if self.in_string:
+            self._append(char)
+            if self.escape:
+                self.escape = False
+            elif char == "\\":
+                self.escape = True
+            elif char == '"':
+                self.in_string = False
+            return None
+
+        if self.pending_slash:
+            self.pending_slash = False
+            if char == "/":
+                self.in_comment = True
+                return None
+            self._append("/")
+
+        if char == "/" and self.in_array:
+            self.pending_slash = True
+            return None
+
+        if not self.in_array:
+            if char == "[":
+                self.in_array = True
+            return None
+
+        if char == '"':
+            self.in_string = True
+            self._append(char)
+            return None
+
+        if char in "{[":
+            if self.depth == 0:
+                self._buffer = []
+            self.depth += 1
+            self._append(char)
+            return None
+
+        if char in "}]":
+            if self.depth == 0:
+                # 顶层数组结束
+                self.finished = True
+                return None
+            self._append(char)
+            self.depth -= 1
+            if self.depth == 0:
+                return self._emit()
+            return None
+
+        self._append(char)
+        return None
+
+    def _append(self, char: str) -> None:
+        if self.depth > 0:
+            self._buffer.append(char)
+
+    def _emit(self):
+        text = "".join(self._buffer)
+        self._buffer = []
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            self.failed_count += 1
+            logger.warning(f"流式解析测试用例失败: {str(e)}")
+            return None
+        if not isinstance(value, dict):
+            return None
+        self.parsed_count += 1
+        return value
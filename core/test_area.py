@@ -0,0 +1,139 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:测试区域分类，根据测试标题和步骤中是否包含导航相关词汇区分页面框架和主内容区域测试用例
+=========================================
+"""
+import re
+from typing import Any, Dict, Iterable, Optional, Pattern
+
+from config.settings import TEST_AREA_KEYWORDS
+
+MAIN_CONTENT_AREA = "主内容区域"
+FRAME_AREA = "页面框架"
+
+
+def build_keyword_pattern(keywords: Iterable[str]) -> Optional[Pattern]:
+    """
+    将关键词编译为一个不区分大小写的正则表达式
+
+    关键词先组成前缀树，再按树的结构生成分支，共同前缀只匹配一次；只判断是否包含关键词，
+    所以包含较短关键词的长关键词（如 nav 之于 navigation）无需单独匹配。每个位置只需按首字符选择分支，
+    匹配耗时随文本长度线性增长，基本不受关键词数量影响。
+
+    Args:
+        keywords (Iterable[str]): 关键词
+
+    Returns:
+        Optional[Pattern]: 正则表达式，没有关键词时为None
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        keyword = keyword.strip().lower()
+        if not keyword:
+            continue
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    if not trie:
+        return None
+
+    def to_regex(node: Dict[str, Any]) -> str:
+        # 某个关键词在此结束时后面的部分可选；因为只判断是否包含关键词，较短的关键词匹配即可
+        if "" in node:
+            return ""
+        branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items())]
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return re.compile(to_regex(trie), re.IGNORECASE)
+
+
+class TestAreaClassifier:
+    """测试区域分类器，关键词只编译一次，可在多个模块间共享"""
+
+    def __init__(self, keywords: Optional[Iterable[str]] = None):
+        """
+        初始化分类器
+
+        Args:
+            keywords (Optional[Iterable[str]]): 导航相关关键词，为None时使用配置文件中的TEST_AREA_KEYWORDS
+        """
+        self.keywords = [keyword for keyword in (TEST_AREA_KEYWORDS if keywords is None else keywords) if keyword.strip()]
+        self._pattern = build_keyword_pattern(self.keywords)
+
+    def matches(self, text: str) -> bool:
+        """
+        文本中是否包含任意一个关键词
+
+        Args:
+            text (str): 文本
+
+        Returns:
+            bool: 是否包含
+        """
+        return self._pattern is not None and self._pattern.search(text) is not None
+
+    def classify(self, test_case: Dict[str, Any]) -> str:
+        """
+        确定测试用例的测试区域，测试用例自带的 test_area 或 area 优先
+
+        Args:
+            test_case (Dict[str, Any]): 测试用例
+
+        Returns:
+            str: 测试区域，"主内容区域"或"页面框架"
+        """
+        if "test_area" in test_case:
+            return test_case["test_area"]
+        if "area" in test_case:
+            return test_case["area"]
+
+        # 检查测试标题和步骤中是否包含导航相关词汇
+        title = test_case.get("test_title", "") or test_case.get("title", "") or test_case.get("name", "") or ""
+        if self.matches(str(title)):
+            return FRAME_AREA
+
+        steps = test_case.get("test_steps", []) or test_case.get("steps", []) or []
+        if isinstance(steps, str):
+            steps = [steps]
+        if any(self.matches(str(step)) for step in steps):
+            return FRAME_AREA
+
+        # 默认为主内容区域
+        return MAIN_CONTENT_AREA
+
+    def ensure(self, test_case: Dict[str, Any]) -> str:
+        """
+        确定测试区域并保存到测试用例的 test_area 字段，之后再次分类直接使用该字段
+
+        Args:
+            test_case (Dict[str, Any]): 测试用例，原地修改
+
+        Returns:
+            str: 测试区域
+        """
+        if "test_area" not in test_case:
+            test_case["test_area"] = self.classify(test_case)
+        return test_case["test_area"]
+
+
+_default_classifier: Optional[TestAreaClassifier] = None
+
+
+def get_test_area_classifier() -> TestAreaClassifier:
+    """
+    获取使用配置文件中关键词的共享分类器
+
+    Returns:
+        TestAreaClassifier: 分类器
+    """
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = TestAreaClassifier()
+    return _default_classifier
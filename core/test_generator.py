@@ -6,29 +6,64 @@
 @Comment:测试用例生成模块，负责使用OpenAI分析页面数据并生成测试用例
 =========================================
 """
+import asyncio
+import copy
+import hashlib
+import inspect
 import json
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_BASE_URL
+from config.settings import (OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_BASE_URL, LLM_CONCURRENCY,
+                             PROMPT_COMPACTION, LLM_CACHE_ENABLED, SOURCE_TAGGING)
+from core.llm_cache import LLMResponseCache
+from core.page_snapshot_store import PageSnapshotStore
+from core.progress import STAGE_CASE_PARSED, STAGE_RESPONSE_TRUNCATED, STAGE_TOKENS_STREAMED, ProgressReporter
+from core.prompt_compactor import PromptCompactor
+from core.prompt_sharding import PromptShard, merge_shard_results, plan_prompt_shards
+from core.source_attribution import SourceAttributionIndex
+from core.stream_parser import IncrementalTestCaseParser
+from core.test_area import get_test_area_classifier
+from core.tracing import add_counter, set_span_attributes, trace_span, traced
 from utils.logger import get_logger, console
+from utils.helpers import estimate_tokens
 
 # 获取日志记录器
 logger = get_logger(__name__)
 
+# 流式生成时每个测试用例解析完成后的回调，可以是普通函数或协程函数
+TestCaseCallback = Callable[[Dict[str, Any]], Any]
+
 
 class TestGenerator:
     """测试用例生成器，使用OpenAI生成测试用例"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    # 系统提示词
+    SYSTEM_MESSAGE = "你是一名专业的测试工程师，擅长编写清晰、全面的测试用例。遵循测试专家的角色设定，根据提供的信息生成高质量的测试用例。"
+
+    # 流式响应时报告已接收token数的最小间隔（秒）
+    TOKEN_REPORT_INTERVAL = 0.5
+
+    def __init__(
+            self,
+            api_key: Optional[str] = None,
+            max_concurrency: Optional[int] = None,
+            compactor: Optional[PromptCompactor] = None,
+            use_cache: Optional[bool] = None,
+            progress: Optional[ProgressReporter] = None
+    ):
         """
         初始化测试用例生成器
         
         Args:
             api_key (Optional[str]): OpenAI API密钥，如果为None则使用配置文件中的密钥
+            max_concurrency (Optional[int]): 异步生成时同时进行的API请求数上限，为None时使用配置文件中的LLM_CONCURRENCY
+            compactor (Optional[PromptCompactor]): 页面数据压缩器，为None时按配置文件中的PROMPT_COMPACTION决定是否压缩
+            use_cache (Optional[bool]): 是否使用AI响应缓存，为None时使用配置文件中的LLM_CACHE_ENABLED
+            progress (Optional[ProgressReporter]): 进度报告器，提供时报告流式接收的token数和解析出的测试用例
         """
         # 设置OpenAI API密钥
         self.api_key = api_key or OPENAI_API_KEY
@@ -37,6 +72,18 @@ class TestGenerator:
 
         # 初始化OpenAI客户端
         self.client = OpenAI(api_key=self.api_key, base_url=OPENAI_BASE_URL)
+        self.async_client = AsyncOpenAI(api_key=self.api_key, base_url=OPENAI_BASE_URL)
+        self.max_concurrency = max(1, max_concurrency or LLM_CONCURRENCY)
+        self._semaphore = None
+        self.compactor = compactor or (PromptCompactor() if PROMPT_COMPACTION else None)
+        self.last_prompt_report: Dict[str, Any] = {}  # 最近一次构建提示信息时各部分的token用量
+        if use_cache is None:
+            use_cache = LLM_CACHE_ENABLED
+        self.response_cache = LLMResponseCache() if use_cache else None
+        self.progress = progress
+        self._streamed_tokens = 0
+        self._last_token_report = 0.0
+        self.area_classifier = get_test_area_classifier()
         logger.info("测试用例生成器初始化完成")
         
     def generate_test_cases_from_multiple_sources(
@@ -71,36 +118,7 @@ class TestGenerator:
             test_cases = self._parse_response(response)
             
             # 为每个测试用例添加来源标记
-            for tc in test_cases:
-                # 添加页面来源（如果可以从测试步骤中推断）
-                page_url = None
-                for url in pages_data.keys():
-                    if tc.get("test_title", "") and url in tc.get("test_title", ""):
-                        page_url = url
-                        break
-                    
-                    steps = tc.get("test_steps", [])
-                    if steps and isinstance(steps, list):
-                        for step in steps:
-                            if url in str(step):
-                                page_url = url
-                                break
-                
-                tc["page_source"] = page_url or "多页面"
-                
-                # 添加需求来源（如果可以从测试标题中推断）
-                if new_requirements:
-                    req_source = None
-                    for req_name in new_requirements.keys():
-                        if tc.get("test_title", "") and req_name in tc.get("test_title", ""):
-                            req_source = req_name
-                            break
-                    
-                    tc["requirement_source"] = req_source or "综合需求"
-                
-                # 添加测试区域
-                if "test_area" not in tc:
-                    tc["test_area"] = self._determine_test_area(tc)
+            self._annotate_sources(test_cases, SourceAttributionIndex(pages_data, new_requirements))
             
             logger.info(f"已生成 {len(test_cases)} 个测试用例")
             return test_cases
@@ -138,8 +156,7 @@ class TestGenerator:
             
             # 添加测试区域
             for tc in test_cases:
-                if "test_area" not in tc:
-                    tc["test_area"] = self._determine_test_area(tc)
+                self._ensure_test_area(tc)
 
             logger.info(f"已生成 {len(test_cases)} 个测试用例")
             return test_cases
@@ -148,41 +165,313 @@ class TestGenerator:
             logger.error(f"生成测试用例时出错: {str(e)}")
             return []
     
-    def _determine_test_area(self, test_case: Dict[str, Any]) -> str:
+    async def generate_test_cases_from_multiple_sources_async(
+            self,
+            pages_data: Dict[str, Dict[str, Any]],
+            new_requirements: Optional[Dict[str, str]] = None,
+            include_old_features: bool = False,
+            on_test_case: Optional[TestCaseCallback] = None
+    ) -> List[Dict[str, Any]]:
         """
-        确定测试用例的测试区域
+        从多个页面和多个需求文档生成测试用例（异步版本，不阻塞事件循环）
         
         Args:
-            test_case (Dict[str, Any]): 测试用例
+            pages_data (Dict[str, Dict[str, Any]]): 多个页面的探索数据，以URL为键
+            new_requirements (Optional[Dict[str, str]]): 多个需求文档内容，以文件名为键
+            include_old_features (bool): 是否包含旧功能的测试用例
+            on_test_case (Optional[TestCaseCallback]): 提供时使用流式响应，每解析出一个测试用例立即回调
+            
+        Returns:
+            List[Dict[str, Any]]: 测试用例列表
+        """
+        try:
+            logger.info(f"开始从 {len(pages_data)} 个页面和 {len(new_requirements) if new_requirements else 0} 个需求文档生成测试用例")
+            
+            prompt = self._build_multi_source_prompt(pages_data, new_requirements, include_old_features)
+            
+            # 来源索引只建立一次，流式响应中的每个测试用例共用
+            source_index = SourceAttributionIndex(pages_data, new_requirements)
+            
+            console.print("[bold yellow]正在使用AI生成测试用例，这可能需要一些时间...[/bold yellow]")
+            if on_test_case:
+                test_cases = await self._stream_test_cases_async(
+                    prompt, on_test_case, lambda tc: self._annotate_sources([tc], source_index)
+                )
+            else:
+                response = await self._call_openai_api_async(prompt)
+                test_cases = self._parse_response(response)
+                self._annotate_sources(test_cases, source_index)
+            
+            logger.info(f"已生成 {len(test_cases)} 个测试用例")
+            return test_cases
+            
+        except Exception as e:
+            logger.error(f"生成测试用例时出错: {str(e)}")
+            return []
+
+    async def generate_test_cases_sharded_async(
+            self,
+            pages_data: Dict[str, Dict[str, Any]],
+            new_requirements: Optional[Dict[str, str]] = None,
+            include_old_features: bool = False,
+            token_budget: Optional[int] = None,
+            on_test_case: Optional[TestCaseCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        分片并行生成测试用例
+        
+        将页面数据和需求文档按token预算切分为多个分片，每个分片单独调用API（并发数受 max_concurrency 限制），
+        最后按分片顺序合并结果并重新编号test_id
+        
+        Args:
+            pages_data (Dict[str, Dict[str, Any]]): 多个页面的探索数据，以URL为键
+            new_requirements (Optional[Dict[str, str]]): 多个需求文档内容，以文件名为键
+            include_old_features (bool): 是否包含旧功能的测试用例
+            token_budget (Optional[int]): 每个分片的数据token预算，为None时使用配置文件中的GENERATION_SHARD_TOKENS
+            on_test_case (Optional[TestCaseCallback]): 提供时每个分片使用流式响应，每解析出一个测试用例立即回调；
+                回调收到的是分片内的原始test_id，合并后才会重新编号
+            
+        Returns:
+            List[Dict[str, Any]]: 测试用例列表
+        """
+        shards = plan_prompt_shards(pages_data, new_requirements, token_budget)
+        if len(shards) <= 1:
+            return await self.generate_test_cases_from_multiple_sources_async(
+                pages_data, new_requirements, include_old_features, on_test_case
+            )
+        
+        console.print(f"[bold yellow]正在使用AI分 {len(shards)} 个分片并行生成测试用例，并发数: {self.max_concurrency}[/bold yellow]")
+        shard_results = await asyncio.gather(
+            *(self._generate_shard_async(index, shard, include_old_features, on_test_case)
+              for index, shard in enumerate(shards, 1))
+        )
+        
+        test_cases = merge_shard_results(shard_results)
+        logger.info(f"{len(shards)} 个分片共生成 {len(test_cases)} 个测试用例")
+        return test_cases
+
+    async def generate_test_cases_incremental_async(
+            self,
+            pages_data: Dict[str, Dict[str, Any]],
+            new_requirements: Optional[Dict[str, str]] = None,
+            include_old_features: bool = False,
+            snapshot_store: Optional[PageSnapshotStore] = None,
+            on_test_case: Optional[TestCaseCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        增量生成测试用例
+        
+        与上次快照比较每个页面的表单、输入控件和功能区域，结构和需求文档都未变化的页面直接复用上次的测试用例，
+        其余页面各自单独生成（并发数受 max_concurrency 限制），生成结果写回快照。
+        最后按页面顺序合并并重新编号test_id
+        
+        Args:
+            pages_data (Dict[str, Dict[str, Any]]): 多个页面的探索数据，以URL为键
+            new_requirements (Optional[Dict[str, str]]): 多个需求文档内容，以文件名为键
+            include_old_features (bool): 是否包含旧功能的测试用例
+            snapshot_store (Optional[PageSnapshotStore]): 页面快照存储，为None时使用默认存储目录
+            on_test_case (Optional[TestCaseCallback]): 提供时使用流式响应，复用和新生成的测试用例都会回调
             
         Returns:
-            str: 测试区域，"主内容区域"或"页面框架"
+            List[Dict[str, Any]]: 测试用例列表
         """
-        # 检查测试标题和步骤中是否包含导航相关词汇
-        navigation_keywords = ["导航", "菜单", "导航栏", "menu", "navigation", "nav", "header", "footer", 
-                              "页眉", "页脚", "侧边栏", "sidebar", "顶部栏", "底部栏", "链接跳转", "路由", 
-                              "route", "标签页", "tab", "登录", "注册", "login", "register"]
+        store = snapshot_store or PageSnapshotStore()
+        context_hash = self._generation_context_hash(new_requirements, include_old_features)
+        
+        page_results: Dict[str, List[Dict[str, Any]]] = {}
+        changed_urls = []
+        for url, page_data in pages_data.items():
+            reused = store.reusable_test_cases(url, page_data, context_hash)
+            if reused is None:
+                changed_urls.append(url)
+                continue
+            page_results[url] = copy.deepcopy(reused)
+            if on_test_case:
+                for tc in page_results[url]:
+                    await self._emit_test_case(tc, on_test_case)
+        
+        console.print(
+            f"[bold yellow]{len(pages_data)} 个页面中 {len(changed_urls)} 个需要重新生成测试用例，"
+            f"{len(pages_data) - len(changed_urls)} 个复用上次结果[/bold yellow]"
+        )
+        
+        async def generate_page(url: str) -> List[Dict[str, Any]]:
+            test_cases = await self.generate_test_cases_from_multiple_sources_async(
+                {url: pages_data[url]}, new_requirements, include_old_features, on_test_case
+            )
+            # 生成失败时不写快照，下次运行仍会重新生成
+            if test_cases:
+                store.save(url, pages_data[url], copy.deepcopy(test_cases), context_hash)
+            return test_cases
         
-        # 获取测试标题
-        title = test_case.get("test_title", "") or test_case.get("title", "") or ""
+        generated = await asyncio.gather(*(generate_page(url) for url in changed_urls))
+        page_results.update(zip(changed_urls, generated))
         
-        # 获取测试步骤
-        steps = test_case.get("test_steps", []) or []
-        if isinstance(steps, str):
-            steps = [steps]
+        test_cases = merge_shard_results([page_results.get(url, []) for url in pages_data])
+        logger.info(f"增量生成完成：重新生成 {len(changed_urls)} 个页面，共 {len(test_cases)} 个测试用例")
+        return test_cases
+
+    async def generate_test_cases_for_page_async(
+            self,
+            url: str,
+            page_data: Dict[str, Any],
+            new_requirements: Optional[Dict[str, str]] = None,
+            include_old_features: bool = False,
+            on_test_case: Optional[TestCaseCallback] = None,
+            snapshot_store: Optional[PageSnapshotStore] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        为单个页面生成测试用例，用于探索完一个页面就开始生成的流水线模式，并发数受 max_concurrency 限制
+        
+        Args:
+            url (str): 页面URL
+            page_data (Dict[str, Any]): 页面的探索数据
+            new_requirements (Optional[Dict[str, str]]): 多个需求文档内容，以文件名为键
+            include_old_features (bool): 是否包含旧功能的测试用例
+            on_test_case (Optional[TestCaseCallback]): 提供时使用流式响应，每解析出一个测试用例立即回调
+            snapshot_store (Optional[PageSnapshotStore]): 页面快照存储，提供时结构未变化的页面复用上次的测试用例，
+                新生成的测试用例写回快照
+            
+        Returns:
+            List[Dict[str, Any]]: 测试用例列表
+        """
+        context_hash = None
+        if snapshot_store is not None:
+            context_hash = self._generation_context_hash(new_requirements, include_old_features)
+            reused = snapshot_store.reusable_test_cases(url, page_data, context_hash)
+            if reused is not None:
+                test_cases = copy.deepcopy(reused)
+                if on_test_case:
+                    for tc in test_cases:
+                        await self._emit_test_case(tc, on_test_case)
+                logger.info(f"页面结构未变化，复用上次的 {len(test_cases)} 个测试用例: {url}")
+                return test_cases
         
-        # 检查标题中是否有导航关键词
-        if any(keyword in title.lower() for keyword in navigation_keywords):
-            return "页面框架"
+        test_cases = await self.generate_test_cases_from_multiple_sources_async(
+            {url: page_data}, new_requirements, include_old_features, on_test_case
+        )
+        # 生成失败时不写快照，下次运行仍会重新生成
+        if snapshot_store is not None and test_cases:
+            snapshot_store.save(url, page_data, copy.deepcopy(test_cases), context_hash)
+        return test_cases
+
+    def _generation_context_hash(self, new_requirements: Optional[Dict[str, str]], include_old_features: bool) -> str:
+        """
+        计算生成上下文的哈希，模型、系统提示、需求文档或是否包含旧功能变化时快照中的测试用例不再复用
         
-        # 检查步骤中是否有导航关键词
-        steps_text = " ".join(str(step) for step in steps)
-        if any(keyword in steps_text.lower() for keyword in navigation_keywords):
-            return "页面框架"
+        Args:
+            new_requirements (Optional[Dict[str, str]]): 多个需求文档内容，以文件名为键
+            include_old_features (bool): 是否包含旧功能的测试用例
+            
+        Returns:
+            str: sha256十六进制摘要
+        """
+        payload = json.dumps(
+            [OPENAI_MODEL, self.SYSTEM_MESSAGE, sorted((new_requirements or {}).items()), include_old_features],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _generate_shard_async(
+            self,
+            index: int,
+            shard: PromptShard,
+            include_old_features: bool,
+            on_test_case: Optional[TestCaseCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        为单个分片生成测试用例，失败时返回空列表，不影响其他分片
         
-        # 默认为主内容区域
-        return "主内容区域"
+        Args:
+            index (int): 分片序号，仅用于日志
+            shard (PromptShard): 分片
+            include_old_features (bool): 是否包含旧功能的测试用例
+            on_test_case (Optional[TestCaseCallback]): 提供时使用流式响应，每解析出一个测试用例立即回调
             
+        Returns:
+            List[Dict[str, Any]]: 测试用例列表
+        """
+        try:
+            prompt = self._build_multi_source_prompt(shard.pages_data, shard.requirements, include_old_features)
+            # 只在本分片的页面和需求中推断来源
+            source_index = SourceAttributionIndex(shard.pages_data, shard.requirements)
+            if on_test_case:
+                test_cases = await self._stream_test_cases_async(
+                    prompt, on_test_case, lambda tc: self._annotate_sources([tc], source_index)
+                )
+            else:
+                response = await self._call_openai_api_async(prompt)
+                test_cases = self._parse_response(response)
+                self._annotate_sources(test_cases, source_index)
+            logger.info(f"分片 {index}（约 {shard.tokens} tokens）生成 {len(test_cases)} 个测试用例")
+            return test_cases
+        except Exception as e:
+            logger.error(f"分片 {index} 生成测试用例时出错: {str(e)}")
+            return []
+
+    async def generate_test_cases_async(
+            self,
+            page_data: Dict[str, Any],
+            new_requirements: Optional[str] = None,
+            include_old_features: bool = False,
+            on_test_case: Optional[TestCaseCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        生成测试用例（异步版本，可与页面探索及其他生成任务并发执行）
+        
+        Args:
+            page_data (Dict[str, Any]): 页面探索数据
+            new_requirements (Optional[str]): 新需求文档
+            include_old_features (bool): 是否包含旧功能的测试用例
+            on_test_case (Optional[TestCaseCallback]): 提供时使用流式响应，每解析出一个测试用例立即回调
+            
+        Returns:
+            List[Dict[str, Any]]: 测试用例列表
+        """
+        try:
+            prompt = self._build_prompt(page_data, new_requirements, include_old_features)
+            if on_test_case:
+                test_cases = await self._stream_test_cases_async(prompt, on_test_case, self._ensure_test_area)
+            else:
+                response = await self._call_openai_api_async(prompt)
+                test_cases = self._parse_response(response)
+                for tc in test_cases:
+                    self._ensure_test_area(tc)
+
+            logger.info(f"已生成 {len(test_cases)} 个测试用例")
+            return test_cases
+
+        except Exception as e:
+            logger.error(f"生成测试用例时出错: {str(e)}")
+            return []
+
+    def _annotate_sources(self, test_cases: List[Dict[str, Any]], index: SourceAttributionIndex) -> None:
+        """
+        为测试用例添加页面来源、需求来源和测试区域标记
+        
+        Args:
+            test_cases (List[Dict[str, Any]]): 测试用例列表，原地修改
+            index (SourceAttributionIndex): 本次生成的页面和需求文档索引
+        """
+        for tc in test_cases:
+            tc["page_source"] = index.page_source(tc)
+            
+            if index.requirement_names:
+                tc["requirement_source"] = index.requirement_source(tc)
+            
+            # 添加测试区域
+            self._ensure_test_area(tc)
+
+    def _ensure_test_area(self, test_case: Dict[str, Any]) -> None:
+        """
+        测试用例没有测试区域时补充测试区域
+        
+        Args:
+            test_case (Dict[str, Any]): 测试用例，原地修改
+        """
+        self.area_classifier.ensure(test_case)
+
+    @traced("prompt.build")
     def _build_multi_source_prompt(
             self,
             pages_data: Dict[str, Dict[str, Any]],
@@ -201,7 +490,7 @@ class TestGenerator:
             str: 提示信息
         """
         # 格式化页面数据
-        pages_data_str = json.dumps(pages_data, ensure_ascii=False, indent=2)
+        pages_data_str = self._format_pages_data(pages_data)
         
         # 构建测试对象描述
         test_objects = []
@@ -223,6 +512,13 @@ class TestGenerator:
         
         test_types_str = "、".join(test_types)
         
+        # 多个页面或需求文档时要求AI标注来源，测试用例文本中没有出现URL或文档名称时也能确定来源
+        source_fields = ""
+        if SOURCE_TAGGING and len(pages_data) > 1:
+            source_fields += '    "page_source": "页面URL",        // 测试用例所属的页面，必须是测试对象中列出的URL之一\n'
+        if SOURCE_TAGGING and new_requirements and len(new_requirements) > 1:
+            source_fields += '    "requirement_source": "需求文档名称", // 测试用例对应的需求文档，必须是需求描述中的文档名称之一\n'
+        
         # 构建基础提示
         prompt = f"""
 ### **测试专家角色设定**
@@ -267,7 +563,7 @@ class TestGenerator:
       "预期结果2"
     ],
     "test_data": "测试数据",         // 测试中使用的输入数据
-    "test_type": "功能测试/UI测试"    // 测试类型
+{source_fields}    "test_type": "功能测试/UI测试"    // 测试类型
   }}
 ]
 ```
@@ -283,8 +579,10 @@ class TestGenerator:
 8. 请直接返回JSON格式的测试用例列表，不要添加额外解释
 """
 
+        self._record_prompt_report(prompt, requirements_str)
         return prompt
 
+    @traced("prompt.build")
     def _build_prompt(
             self,
             page_data: Dict[str, Any],
@@ -303,7 +601,10 @@ class TestGenerator:
             str: 提示信息
         """
         # 格式化页面数据
-        page_data_str = json.dumps(page_data, ensure_ascii=False, indent=2)
+        if self.compactor:
+            page_data_str = self.compactor.serialize_page(page_data)
+        else:
+            page_data_str = json.dumps(page_data, ensure_ascii=False, indent=2)
         
         # 确定测试类型
         test_types = ["功能测试", "UI测试"]
@@ -373,8 +674,38 @@ class TestGenerator:
 7. 请直接返回JSON格式的测试用例列表，不要添加额外解释
 """
 
+        self._record_prompt_report(prompt, new_requirements or "")
         return prompt
 
+    def _format_pages_data(self, pages_data: Dict[str, Dict[str, Any]]) -> str:
+        """
+        格式化多个页面的数据，启用压缩时输出压缩后的紧凑JSON
+        
+        Args:
+            pages_data (Dict[str, Dict[str, Any]]): 多个页面的探索数据，以URL为键
+            
+        Returns:
+            str: JSON字符串
+        """
+        if self.compactor:
+            return self.compactor.serialize_pages(pages_data)
+        return json.dumps(pages_data, ensure_ascii=False, indent=2)
+
+    def _record_prompt_report(self, prompt: str, requirements_text: str) -> None:
+        """
+        记录提示信息各部分的token用量
+        
+        Args:
+            prompt (str): 构建完成的提示信息
+            requirements_text (str): 提示信息中的需求描述
+        """
+        report = dict(self.compactor.last_report) if self.compactor else {}
+        report["requirements_tokens"] = estimate_tokens(requirements_text)
+        report["prompt_tokens"] = estimate_tokens(prompt)
+        self.last_prompt_report = report
+        set_span_attributes(prompt_tokens=report["prompt_tokens"], requirements_tokens=report["requirements_tokens"])
+        logger.info(f"提示信息约 {report['prompt_tokens']} tokens，其中需求描述约 {report['requirements_tokens']} tokens")
+
     def _call_openai_api(self, prompt: str) -> str:
         """
         调用OpenAI API
@@ -385,6 +716,10 @@ class TestGenerator:
         Returns:
             str: API响应
         """
+        cache_key, cached = self._get_cached_response(prompt)
+        if cached is not None:
+            return cached
+        
         max_retries = 3
         retry_delay = 5  # 秒
         
@@ -392,17 +727,18 @@ class TestGenerator:
             try:
                 # 调用OpenAI Chat Completions API
                 logger.info(f"请求OpenAI prompt： {prompt} ")
-                response = self.client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": "你是一名专业的测试工程师，擅长编写清晰、全面的测试用例。遵循测试专家的角色设定，根据提供的信息生成高质量的测试用例。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                )
+                with trace_span("llm.request", model=OPENAI_MODEL, attempt=attempt + 1) as span:
+                    response = self.client.chat.completions.create(
+                        model=OPENAI_MODEL,
+                        messages=self._build_messages(prompt),
+                    )
+                    self._record_usage(span, prompt, response)
                 print(response.model_dump_json())
                 # 提取并返回响应文本
                 if response.choices and len(response.choices) > 0:
-                    return response.choices[0].message.content
+                    content = response.choices[0].message.content
+                    self._cache_response(cache_key, content)
+                    return content
                 else:
                     raise ValueError("API返回的响应格式不正确")
                     
@@ -417,6 +753,262 @@ class TestGenerator:
         
         return ""  # 这行代码永远不会被执行到，但是为了类型检查
 
+    async def _call_openai_api_async(self, prompt: str) -> str:
+        """
+        异步调用OpenAI API
+        
+        同时进行的请求数受 max_concurrency 限制，重试等待使用 asyncio.sleep，不阻塞事件循环
+        
+        Args:
+            prompt (str): 提示信息
+            
+        Returns:
+            str: API响应
+        """
+        cache_key, cached = self._get_cached_response(prompt)
+        if cached is not None:
+            return cached
+        
+        max_retries = 3
+        retry_delay = 5  # 秒
+        
+        # 信号量需要在事件循环中创建，首次调用时再初始化
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        for attempt in range(max_retries):
+            try:
+                async with self._semaphore:
+                    logger.info(f"请求OpenAI prompt： {prompt} ")
+                    with trace_span("llm.request", model=OPENAI_MODEL, attempt=attempt + 1) as span:
+                        response = await self.async_client.chat.completions.create(
+                            model=OPENAI_MODEL,
+                            messages=self._build_messages(prompt),
+                        )
+                        self._record_usage(span, prompt, response)
+                logger.debug(response.model_dump_json())
+                # 提取并返回响应文本
+                if response.choices and len(response.choices) > 0:
+                    content = response.choices[0].message.content
+                    self._cache_response(cache_key, content)
+                    return content
+                else:
+                    raise ValueError("API返回的响应格式不正确")
+                    
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    # 等待期间释放信号量，让其他请求可以继续
+                    logger.warning(f"API调用失败，将在 {retry_delay} 秒后重试: {str(e)}")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2  # 指数退避
+                else:
+                    logger.error(f"API调用失败，已达到最大重试次数: {str(e)}")
+                    raise
+        
+        return ""
+
+    async def _stream_test_cases_async(
+            self,
+            prompt: str,
+            on_test_case: TestCaseCallback,
+            prepare: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        以流式响应调用OpenAI API，每当一个测试用例对象的右括号到达时立即解析并回调
+        
+        已回调的测试用例无法撤回，因此只有在尚未解析出任何测试用例时才会重试；
+        流在中途断开时返回已解析的部分，不写入响应缓存，并报告 response_truncated 进度事件
+        
+        Args:
+            prompt (str): 提示信息
+            on_test_case (TestCaseCallback): 每个测试用例解析完成后的回调
+            prepare (Optional[Callable[[Dict[str, Any]], None]]): 回调前对测试用例的补充处理（如来源标记）
+            
+        Returns:
+            List[Dict[str, Any]]: 测试用例列表
+        """
+        cache_key, cached = self._get_cached_response(prompt)
+        if cached is not None:
+            test_cases = self._parse_response(cached)
+            for tc in test_cases:
+                await self._emit_test_case(tc, on_test_case, prepare)
+            return test_cases
+        
+        max_retries = 3
+        retry_delay = 5  # 秒
+        
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        for attempt in range(max_retries):
+            parser = IncrementalTestCaseParser()
+            chunks = []
+            test_cases = []
+            try:
+                async with self._semaphore:
+                    logger.info(f"请求OpenAI（流式） prompt： {prompt} ")
+                    with trace_span("llm.request", model=OPENAI_MODEL, attempt=attempt + 1, stream=True) as span:
+                        stream = await self.async_client.chat.completions.create(
+                            model=OPENAI_MODEL,
+                            messages=self._build_messages(prompt),
+                            stream=True,
+                        )
+                        async for chunk in stream:
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta.content
+                            if not delta:
+                                continue
+                            if not chunks:
+                                span.set(ttft_ms=round(span.elapsed_ms(), 3))
+                            chunks.append(delta)
+                            self._report_streamed_tokens(delta)
+                            for tc in parser.feed(delta):
+                                test_cases.append(tc)
+                                await self._emit_test_case(tc, on_test_case, prepare)
+                        self._record_usage(span, prompt, content="".join(chunks))
+                
+                content = "".join(chunks)
+                if not test_cases:
+                    # 响应不是对象数组时退回到整体解析
+                    test_cases = self._parse_response(content)
+                    for tc in test_cases:
+                        await self._emit_test_case(tc, on_test_case, prepare)
+                
+                self._cache_response(cache_key, content)
+                logger.info(f"流式解析 {len(test_cases)} 个测试用例")
+                return test_cases
+                
+            except Exception as e:
+                if test_cases:
+                    logger.error(f"流式响应中断，保留已解析的 {len(test_cases)} 个测试用例: {str(e)}")
+                    if self.progress is not None:
+                        self.progress.emit(STAGE_RESPONSE_TRUNCATED, f"AI响应中断，只解析出 {len(test_cases)} 个测试用例",
+                                           test_cases=len(test_cases), error=str(e))
+                    return test_cases
+                if attempt < max_retries - 1:
+                    logger.warning(f"API调用失败，将在 {retry_delay} 秒后重试: {str(e)}")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2  # 指数退避
+                else:
+                    logger.error(f"API调用失败，已达到最大重试次数: {str(e)}")
+                    raise
+        
+        return []
+
+    async def _emit_test_case(
+            self,
+            test_case: Dict[str, Any],
+            on_test_case: TestCaseCallback,
+            prepare: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> None:
+        """
+        补充处理测试用例后调用回调，回调出错不影响流式解析
+        
+        Args:
+            test_case (Dict[str, Any]): 测试用例
+            on_test_case (TestCaseCallback): 回调
+            prepare (Optional[Callable[[Dict[str, Any]], None]]): 回调前的补充处理
+        """
+        if prepare:
+            prepare(test_case)
+        if self.progress is not None:
+            self.progress.emit(STAGE_CASE_PARSED, f"已解析测试用例: {test_case.get('test_title', '')}",
+                               test_id=test_case.get("test_id"))
+        try:
+            result = on_test_case(test_case)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"处理流式测试用例时出错: {str(e)}")
+
+    def _report_streamed_tokens(self, delta: str) -> None:
+        """
+        累计流式接收的token数，并按间隔报告进度
+        
+        Args:
+            delta (str): 新到达的文本
+        """
+        if self.progress is None:
+            return
+        self._streamed_tokens += estimate_tokens(delta)
+        now = time.monotonic()
+        if now - self._last_token_report >= self.TOKEN_REPORT_INTERVAL:
+            self._last_token_report = now
+            self.progress.emit(STAGE_TOKENS_STREAMED, f"已接收约 {self._streamed_tokens} tokens",
+                               tokens=self._streamed_tokens)
+
+    def _record_usage(self, span: Any, prompt: str, response: Any = None, content: Optional[str] = None) -> None:
+        """
+        记录一次API调用的输入输出token数，响应中没有用量信息（如流式响应）时按文本估算
+        
+        Args:
+            span (Any): 当前耗时区间
+            prompt (str): 提示信息
+            response (Any): API响应，提供时优先使用其中的用量信息
+            content (Optional[str]): 响应文本，未提供response时用于估算输出token数
+        """
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+            tokens_in, tokens_out, estimated = usage.prompt_tokens, usage.completion_tokens or 0, False
+        else:
+            if content is None and response is not None and response.choices:
+                content = response.choices[0].message.content
+            tokens_in = estimate_tokens(self.SYSTEM_MESSAGE) + estimate_tokens(prompt)
+            tokens_out = estimate_tokens(content or "")
+            estimated = True
+        span.set(tokens_in=tokens_in, tokens_out=tokens_out, tokens_estimated=estimated)
+        add_counter("llm_tokens_in", tokens_in)
+        add_counter("llm_tokens_out", tokens_out)
+
+    def _get_cached_response(self, prompt: str) -> tuple:
+        """
+        计算缓存键并读取缓存的响应
+        
+        Args:
+            prompt (str): 提示信息
+            
+        Returns:
+            tuple: (缓存键, 缓存的响应)，未启用缓存时缓存键为None，未命中时响应为None
+        """
+        if self.response_cache is None:
+            return None, None
+        cache_key = LLMResponseCache.make_key(OPENAI_MODEL, OPENAI_TEMPERATURE, self.SYSTEM_MESSAGE, prompt)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            add_counter("llm_cache_hits")
+            console.print("[bold green]命中AI响应缓存，跳过API调用[/bold green]")
+        return cache_key, cached
+
+    def _cache_response(self, cache_key: Optional[str], content: Optional[str]) -> None:
+        """
+        保存API响应，只保存能解析出测试用例的响应，避免反复命中无效结果
+        
+        Args:
+            cache_key (Optional[str]): 缓存键，为None时不保存
+            content (Optional[str]): 响应文本
+        """
+        if cache_key is None or not content:
+            return
+        if self._parse_response(content):
+            self.response_cache.put(cache_key, content, model=OPENAI_MODEL)
+
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """
+        构建Chat Completions请求的消息列表
+        
+        Args:
+            prompt (str): 提示信息
+            
+        Returns:
+            List[Dict[str, str]]: 消息列表
+        """
+        return [
+            {"role": "system", "content": self.SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt}
+        ]
+
+    @traced("llm.parse")
     def _parse_response(self, response: str) -> List[Dict[str, Any]]:
         """
         解析API响应，提取测试用例
@@ -0,0 +1,404 @@
+"""
+=========================================
+@Project ：AITestCase
+@Date ：2025/3/22 上午9:39
+@Author:Echoxiawan
+@Comment:耗时追踪模块，记录运行中各阶段的耗时区间（span）和计数，输出JSON运行报告和Prometheus格式的指标
+=========================================
+"""
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config.settings import RUN_REPORT_DIR, TRACING_ENABLED
+from utils.logger import get_logger
+from utils.helpers import ensure_dir_exists
+
+try:
+    import resource
+except ImportError:  # Windows没有resource模块
+    resource = None
+
+# 获取日志记录器
+logger = get_logger(__name__)
+
+METRIC_PREFIX = "aitestcase"
+
+# 当前运行的追踪器和当前所在的span；asyncio任务创建时复制上下文，因此并发的子任务各自嵌套、互不干扰
+_current_tracer: ContextVar[Optional["Tracer"]] = ContextVar("current_tracer", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    获取当前进程的峰值常驻内存
+
+    Returns:
+        Optional[int]: 字节数，平台不支持时返回None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux返回KB，macOS返回字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MetricsRegistry:
+    """进程内的指标汇总，各阶段耗时按span名累计，供 /metrics 输出"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations: Dict[str, List[float]] = {}  # span名 -> [次数, 总秒数, 最大秒数]
+        self._counters: Dict[tuple, float] = {}  # (指标名, 标签) -> 值
+        self._gauges: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._durations.setdefault(stage, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def inc(self, metric: str, value: float = 1, **labels: str) -> None:
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def render(self) -> str:
+        """
+        输出Prometheus文本格式的指标
+
+        Returns:
+            str: 指标文本
+        """
+        rss = peak_rss_bytes()
+        if rss is not None:
+            self.set_gauge("peak_rss_bytes", rss)
+
+        lines = []
+        with self._lock:
+            name = f"{METRIC_PREFIX}_stage_duration_seconds"
+            lines.append(f"# HELP {name} 各阶段耗时")
+            lines.append(f"# TYPE {name} summary")
+            for stage, (count, total, _) in sorted(self._durations.items()):
+                lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+            name = f"{METRIC_PREFIX}_stage_duration_max_seconds"
+            lines.append(f"# TYPE {name} gauge")
+            for stage, (_, _, longest) in sorted(self._durations.items()):
+                lines.append(f'{name}{{stage="{stage}"}} {longest:.6f}')
+
+            counter_names = sorted({key[0] for key in self._counters})
+            for counter in counter_names:
+                name = f"{METRIC_PREFIX}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric != counter:
+                        continue
+                    label_text = ",".join(f'{key}="{val}"' for key, val in labels)
+                    lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+
+            for gauge, value in sorted(self._gauges.items()):
+                name = f"{METRIC_PREFIX}_{gauge}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+# 进程内共享的指标
+METRICS = MetricsRegistry()
+
+
+class Span:
+    """一个耗时区间"""
+
+    def __init__(self, name: str, span_id: int, parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time()
+        self._start = time.monotonic()
+        self.duration_ms: Optional[float] = None
+
+    def set(self, **attributes: Any) -> None:
+        """补充区间属性"""
+        self.attributes.update(attributes)
+
+    def elapsed_ms(self) -> float:
+        """区间开始至今的毫秒数"""
+        return (time.monotonic() - self._start) * 1000
+
+    def finish(self, duration_ms: Optional[float] = None) -> None:
+        self.duration_ms = self.elapsed_ms() if duration_ms is None else duration_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration_ms or 0, 3),
+            "attributes": self.attributes
+        }
+
+
+class _NullSpan:
+    """未启用追踪时使用的空区间"""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def elapsed_ms(self) -> float:
+        return 0.0
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """一次运行的追踪器，保存所有区间和计数，结束时生成运行报告"""
+
+    def __init__(self, name: str, **attributes: Any):
+        """
+        初始化追踪器
+
+        Args:
+            name (str): 运行名称（如 cli、job），也是根区间的名称
+            **attributes: 运行属性，写入报告
+        """
+        self.name = name
+        self.run_id = uuid.uuid4().hex[:12]
+        self.attributes = attributes
+        self.spans: List[Span] = []
+        self.counters: Dict[str, float] = {}
+        self.report_path: Optional[str] = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _new_span(self, name: str, attributes: Dict[str, Any]) -> Span:
+        parent = _current_span.get()
+        with self._lock:
+            self._next_id += 1
+            span = Span(name, self._next_id, parent.span_id if isinstance(parent, Span) else None, attributes)
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        记录一个耗时区间，区间内新建的区间作为其子区间
+
+        Args:
+            name (str): 区间名称
+            **attributes: 区间属性
+        """
+        span = self._new_span(name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=str(e) or type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            METRICS.observe(name, span.duration_ms / 1000)
+
+    def record(self, name: str, duration_ms: float, **attributes: Any) -> None:
+        """
+        记录一个已在别处测得耗时的区间（如页面脚本内各部分的耗时）
+
+        Args:
+            name (str): 区间名称
+            duration_ms (float): 耗时（毫秒）
+            **attributes: 区间属性
+        """
+        span = self._new_span(name, attributes)
+        span.finish(duration_ms)
+        METRICS.observe(name, duration_ms / 1000)
+
+    def add(self, counter: str, value: float = 1) -> None:
+        """
+        累加计数（如输入输出token数）
+
+        Args:
+            counter (str): 计数名称
+            value (float): 增量
+        """
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+        METRICS.inc(counter, value)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        生成运行报告
+
+        Returns:
+            Dict[str, Any]: 包含全部区间、按名称汇总的耗时、计数和峰值内存
+        """
+        summary: Dict[str, Dict[str, float]] = {}
+        for span in self.spans:
+            if span.duration_ms is None:
+                continue
+            stats = summary.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] = round(stats["total_ms"] + span.duration_ms, 3)
+            stats["max_ms"] = round(max(stats["max_ms"], span.duration_ms), 3)
+
+        ttft = [span.attributes["ttft_ms"] for span in self.spans if "ttft_ms" in span.attributes]
+        rss = peak_rss_bytes()
+        return {
+            "run_id": self.run_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "started_at": self.spans[0].start_time if self.spans else None,
+            "total_ms": round(self.spans[0].duration_ms or 0, 3) if self.spans else 0,
+            "peak_rss_mb": round(rss / (1024 * 1024), 1) if rss is not None else None,
+            "counters": self.counters,
+            "time_to_first_token_ms": min(ttft) if ttft else None,
+            "summary": dict(sorted(summary.items(), key=lambda item: -item[1]["total_ms"])),
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+    def write_report(self, report_dir: Optional[str] = None) -> Optional[str]:
+        """
+        将运行报告写入JSON文件
+
+        Args:
+            report_dir (Optional[str]): 报告目录，为None时使用配置文件中的RUN_REPORT_DIR
+
+        Returns:
+            Optional[str]: 报告文件路径，写入失败时返回None
+        """
+        report_dir = report_dir or RUN_REPORT_DIR
+        filename = f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.run_id}.json"
+        path = os.path.join(report_dir, filename)
+        try:
+            ensure_dir_exists(report_dir)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"写入运行报告失败: {str(e)}")
+            return None
+        self.report_path = path
+        return path
+
+
+def get_tracer() -> Optional[Tracer]:
+    """获取当前运行的追踪器，未启用追踪时返回None"""
+    return _current_tracer.get()
+
+
+@contextmanager
+def traced_run(name: str, report_dir: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Tracer]]:
+    """
+    追踪一次完整运行：在当前上下文中启用追踪器，结束时写入运行报告并更新指标
+
+    在 asyncio.run 之外进入即可，事件循环中的任务会继承该追踪器
+
+    Args:
+        name (str): 运行名称
+        report_dir (Optional[str]): 报告目录，为None时使用配置文件中的RUN_REPORT_DIR
+        **attributes: 运行属性
+
+    Yields:
+        Optional[Tracer]: 追踪器，配置中关闭追踪时为None
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    tracer = Tracer(name, **attributes)
+    token = _current_tracer.set(tracer)
+    status = "succeeded"
+    try:
+        with tracer.span(name):
+            yield tracer
+    except BaseException:
+        status = "failed"
+        raise
+    finally:
+        _current_tracer.reset(token)
+        METRICS.inc("runs", 1, run=name, status=status)
+        path = tracer.write_report(report_dir)
+        if path:
+            logger.info(f"运行报告已保存: {path}")
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    在当前运行中记录一个耗时区间，未启用追踪时不做任何事
+
+    Args:
+        name (str): 区间名称
+        **attributes: 区间属性
+
+    Yields:
+        区间对象，可调用 set() 补充属性
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield _NULL_SPAN
+        return
+    with tracer.span(name, **attributes) as span:
+        yield span
+
+
+def record_span(name: str, duration_ms: float, **attributes: Any) -> None:
+    """记录一个已测得耗时的区间，未启用追踪时不做任何事"""
+    tracer = _current_tracer.get()
+    if tracer is not None:
+        tracer.record(name, duration_ms, **attributes)
+
+
+def add_counter(counter: str, value: float = 1) -> None:
+    """累加当前运行的计数，未启用追踪时不做任何事"""
+    tracer = _current_tracer.get()
+    if tracer is not None:
+        tracer.add(counter, value)
+
+
+def set_span_attributes(**attributes: Any) -> None:
+    """为当前所在的区间补充属性"""
+    span = _current_span.get()
+    if span is not None and _current_tracer.get() is not None:
+        span.set(**attributes)
+
+
+def traced(name: str) -> Callable:
+    """
+    装饰器：将函数的每次调用记录为一个耗时区间，支持普通函数和协程函数
+
+    Args:
+        name (str): 区间名称
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with trace_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
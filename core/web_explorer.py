@@ -2,11 +2,13 @@
 网页探索模块，负责自动化登录网页并探索页面功能
 """
 import asyncio
+import copy
+import hashlib
 import json
 import re
 import time
 import traceback
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
 from urllib.parse import urlparse, urljoin
 
 from playwright.async_api import (
@@ -17,22 +19,84 @@ from playwright.async_api import (
 
 from config.settings import (
     BROWSER_TYPE, HEADLESS, SLOW_MO, TIMEOUT,
-    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_BASE_URL
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_BASE_URL,
+    LOGIN_LOCATOR_CACHE_ENABLED, EXPLORE_DEPTH, CRAWL_WORKERS
 )
+from core.crawl_frontier import CrawlFrontier, CrawlItem, HostPoliteness, normalize_url, url_origin
+from core.dom_distiller import distill_login_dom
+from core.login_locator_cache import LOGIN_FINGERPRINT_SCRIPT, LoginLocatorCache
+from core.page_readiness import PageReadinessStrategy, get_readiness_strategy
+from core.page_snapshot import PAGE_SNAPSHOT_SCRIPT, PAGE_SNAPSHOT_SECTIONS
+from core.resource_filter import ResourceFilter
+from core.tracing import record_span, trace_span, traced
 from utils.logger import get_logger
 from utils.helpers import (
     is_valid_url, extract_domain, parse_cookies
 )
 
+if TYPE_CHECKING:
+    from core.browser_pool import BrowserPool
+
 # 获取日志记录器
 logger = get_logger(__name__)
 
 
+# 按优先级为每组候选选择器查找第一个可见元素；必需字段未全部找到时返回null，便于wait_for_function轮询
+FIND_FIRST_VISIBLE_SCRIPT = """({groups, required}) => {
+    const normalize = (text) => (text || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && window.getComputedStyle(el).visibility !== 'hidden';
+    };
+
+    const elements = {};
+    const selectors = {};
+    for (const [name, candidates] of Object.entries(groups)) {
+        elements[name] = null;
+        selectors[name] = null;
+        for (const candidate of candidates) {
+            let matches;
+            try {
+                matches = document.querySelectorAll(candidate.css);
+            } catch (e) {
+                continue;
+            }
+            const text = candidate.text ? normalize(candidate.text) : null;
+            const element = Array.from(matches).find(el =>
+                isVisible(el) && (!text || normalize(el.innerText || el.textContent).includes(text)));
+            if (element) {
+                elements[name] = element;
+                selectors[name] = candidate.selector;
+                break;
+            }
+        }
+    }
+
+    if (required.some(name => !elements[name])) return null;
+    return { elements, selectors };
+}"""
+
+
+# 获取页面上所有链接的绝对地址
+LINK_EXTRACT_SCRIPT = """() => Array.from(document.querySelectorAll('a[href], area[href]'), a => a.href)"""
+
+
 class WebExplorer:
     """网页探索器，负责自动化登录网页并探索页面功能"""
 
-    def __init__(self):
-        """初始化网页探索器"""
+    def __init__(self, ready_strategy: Optional[Union[str, PageReadinessStrategy]] = None,
+                 resource_filter: Optional[ResourceFilter] = None):
+        """
+        初始化网页探索器
+
+        Args:
+            ready_strategy (Optional[Union[str, PageReadinessStrategy]]): 页面就绪等待策略，
+                可选 "dom", "network", "fixed"，为None时使用配置文件中的PAGE_READY_STRATEGY
+            resource_filter (Optional[ResourceFilter]): 资源过滤器，提供时拦截图片、字体等重资源请求
+        """
+        self.ready_strategy = get_readiness_strategy(ready_strategy)
+        self.resource_filter = resource_filter
+        self.login_locator_cache = LoginLocatorCache() if LOGIN_LOCATOR_CACHE_ENABLED else None
         self.playwright = None
         self.browser = None
         self.context = None
@@ -43,77 +107,123 @@ class WebExplorer:
         self.click_paths = []
         self.explored_urls = set()
         self.results = []
+        self.pool = None
+        self._owns_browser = True
+        # 已由 is_session_valid 加载并就绪的页面URL，explore_page 访问同一URL时不再重复导航
+        self._validated_url: Optional[str] = None
 
-    async def initialize(self, device_type: str = "desktop", url: str = None, cookies_str: str = None) -> None:
+    @staticmethod
+    async def launch_browser(playwright) -> Browser:
         """
-        初始化Playwright和浏览器
+        根据配置启动浏览器
 
         Args:
-            device_type (str): 设备类型，可选值为 "desktop", "mobile", "tablet"
-            cookies_str (str, optional): 可选的Cookie字符串，如果提供将在浏览器启动时直接应用
-        """
-        self.playwright = await async_playwright().start()
+            playwright: 已启动的Playwright实例
 
+        Returns:
+            Browser: 浏览器实例
+        """
         # 根据配置选择浏览器类型
         if BROWSER_TYPE == "firefox":
-            self.browser = await self.playwright.firefox.launch(
+            return await playwright.firefox.launch(
                 headless=HEADLESS, slow_mo=SLOW_MO
             )
         elif BROWSER_TYPE == "webkit":
-            self.browser = await self.playwright.webkit.launch(
+            return await playwright.webkit.launch(
                 headless=HEADLESS, slow_mo=SLOW_MO
             )
         else:  # 默认为 chromium
-            self.browser = await self.playwright.chromium.launch(
+            return await playwright.chromium.launch(
                 headless=HEADLESS, slow_mo=SLOW_MO
             )
 
-        # 准备浏览器上下文参数
-        context_options = {}
+    @staticmethod
+    def build_context_options(device_type: str = "desktop") -> Dict[str, Any]:
+        """
+        根据设备类型构建浏览器上下文参数
+
+        Args:
+            device_type (str): 设备类型，可选值为 "desktop", "mobile", "tablet"
 
-        # 根据设备类型设置视口和用户代理
+        Returns:
+            Dict[str, Any]: 传给 new_context 的参数
+        """
         if device_type == "mobile":
             # 模拟移动设备
-            context_options.update({
+            logger.info("初始化为移动设备模式")
+            return {
                 "viewport": {"width": 375, "height": 667},  # iPhone 8 尺寸
                 "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
                 "device_scale_factor": 2.0,
                 "is_mobile": True,
                 "has_touch": True
-            })
-            logger.info("初始化为移动设备模式")
+            }
         elif device_type == "tablet":
             # 模拟平板设备
-            context_options.update({
+            logger.info("初始化为平板设备模式")
+            return {
                 "viewport": {"width": 768, "height": 1024},  # iPad 尺寸
                 "user_agent": "Mozilla/5.0 (iPad; CPU OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
                 "device_scale_factor": 2.0,
                 "is_mobile": True,
                 "has_touch": True
-            })
-            logger.info("初始化为平板设备模式")
+            }
+
+        # 默认桌面设备
+        logger.info("初始化为桌面设备模式")
+        return {
+            "viewport": {"width": 1280, "height": 800},
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        }
+
+    @traced("browser.init")
+    async def initialize(self, device_type: str = "desktop", url: str = None, cookies_str: str = None,
+                         browser: Optional[Browser] = None, pool: Optional["BrowserPool"] = None,
+                         storage_state: Optional[Dict[str, Any]] = None) -> None:
+        """
+        初始化Playwright和浏览器
+
+        Args:
+            device_type (str): 设备类型，可选值为 "desktop", "mobile", "tablet"
+            cookies_str (str, optional): 可选的Cookie字符串，如果提供将在浏览器启动时直接应用
+            browser (Optional[Browser]): 共享的浏览器实例，提供时只创建独立的上下文，不再启动新浏览器
+            pool (Optional[BrowserPool]): 浏览器池，提供时从池中租用上下文，关闭时归还
+            storage_state (Optional[Dict[str, Any]]): 之前保存的登录会话，提供时在新上下文中恢复
+        """
+        # 准备浏览器上下文参数
+        context_options = self.build_context_options(device_type)
+        if storage_state:
+            context_options["storage_state"] = storage_state
+
+        if pool is not None:
+            # 从浏览器池租用上下文，浏览器由池负责启动和回收
+            self.pool = pool
+            self._owns_browser = False
+            self.context = await pool.acquire_context(**context_options)
         else:
-            # 默认桌面设备
-            context_options.update({
-                "viewport": {"width": 1280, "height": 800},
-                "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            })
-            logger.info("初始化为桌面设备模式")
-
-        # 如果提供了cookies_str，预处理并添加到storage_state
-        cookies = None
+            if browser is not None:
+                # 使用外部共享的浏览器，关闭时只关闭自己的上下文
+                self.browser = browser
+                self._owns_browser = False
+            elif self.browser is None:
+                with trace_span("browser.launch", browser=BROWSER_TYPE):
+                    self.playwright = await async_playwright().start()
+                    self.browser = await self.launch_browser(self.playwright)
+                self._owns_browser = True
+
+            # 创建浏览器上下文
+            self.context = await self.browser.new_context(**context_options)
+
+        # 在打开页面之前注册就绪等待所需的监听，导航触发的请求也能被跟踪
+        self.ready_strategy.attach(self.context)
+
+        # 启用资源拦截
+        if self.resource_filter is not None:
+            await self.resource_filter.attach(self.context)
+
+        # 如果提供了cookies_str，预处理并添加到上下文
         if cookies_str:
-            try:
-                cookies = parse_cookies(url, cookies_str)
-            except Exception as e:
-                logger.error(f"预处理Cookie时出错: {str(e)}")
-                # 出错时继续不带Cookie创建上下文
-
-        # 创建浏览器上下文
-        self.context = await self.browser.new_context(**context_options)
-        if cookies:
-            logger.info(f"使用预设的 {len(cookies)} 个Cookie初始化浏览器")
-            await self.context.add_cookies(cookies)
+            await self._add_cookies(url, cookies_str)
 
         # 设置超时
         self.context.set_default_timeout(TIMEOUT)
@@ -129,14 +239,104 @@ class WebExplorer:
 
         logger.info("浏览器初始化完成")
 
+    async def _add_cookies(self, url: str, cookies_str: str) -> None:
+        """
+        解析Cookie字符串并添加到当前浏览器上下文
+
+        Args:
+            url (str): Cookie所属的URL
+            cookies_str (str): Cookie字符串
+        """
+        try:
+            cookies = parse_cookies(url, cookies_str)
+        except Exception as e:
+            logger.error(f"预处理Cookie时出错: {str(e)}")
+            # 出错时继续不带Cookie
+            return
+
+        if cookies:
+            logger.info(f"使用预设的 {len(cookies)} 个Cookie初始化浏览器")
+            await self.context.add_cookies(cookies)
+
+    async def restart_context(self, device_type: str = "desktop", storage_state: Optional[Dict[str, Any]] = None) -> None:
+        """
+        关闭当前浏览器上下文并创建一个全新的上下文，浏览器进程保持不变
+
+        用于丢弃恢复的登录会话：clear_cookies 只清除Cookie，storage_state 恢复的 localStorage 仍会保留
+
+        Args:
+            device_type (str): 设备类型，可选值为 "desktop", "mobile", "tablet"
+            storage_state (Optional[Dict[str, Any]]): 在新上下文中恢复的登录会话，为None时不恢复
+        """
+        if self.context:
+            if self.pool is not None:
+                await self.pool.release_context(self.context)
+            else:
+                await self.context.close()
+        self.context = None
+        self.page = None
+        self._validated_url = None
+        await self.initialize(device_type=device_type, pool=self.pool, storage_state=storage_state)
+
     async def close(self) -> None:
-        """关闭浏览器和Playwright"""
+        """关闭浏览器和Playwright，共享浏览器时只关闭当前上下文"""
+        if self.pool is not None:
+            if self.context:
+                await self.pool.release_context(self.context)
+                self.context = None
+            logger.info("浏览器上下文已归还浏览器池")
+            return
+
+        if not self._owns_browser:
+            if self.context:
+                await self.context.close()
+            logger.info("浏览器上下文已关闭")
+            return
+
         if self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
         logger.info("浏览器已关闭")
 
+    @traced("login.session_check")
+    async def is_session_valid(self, url: str) -> bool:
+        """
+        检查恢复的登录会话是否仍然有效，只访问一次目标页面，不执行登录流程；
+        会话有效时页面保持在目标页面，随后 explore_page 访问同一URL时直接收集信息
+
+        Args:
+            url (str): 目标页面URL
+
+        Returns:
+            bool: 会话是否有效
+        """
+        self._validated_url = None
+        try:
+            response = await self.page.goto(url, wait_until="domcontentloaded")
+            if not response:
+                return False
+            await self.ready_strategy.wait(self.page)
+
+            # 被重定向到登录页说明会话已失效
+            current_url = self.page.url.lower()
+            if "login" in current_url and "login" not in url.lower():
+                logger.info(f"登录会话已失效(重定向到登录页): {self.page.url}")
+                return False
+
+            # 页面上仍有可见的密码输入框说明需要重新登录
+            for element in await self.page.query_selector_all("input[type='password']"):
+                if await element.is_visible():
+                    logger.info("登录会话已失效(检测到登录表单)")
+                    return False
+
+            self._validated_url = url
+            return True
+        except Exception as e:
+            logger.warning(f"检查登录会话时出错: {str(e)}")
+            return False
+
+    @traced("login.credentials")
     async def login_with_credentials(self, url: str, username: str, password: str, captcha_code: str = None) -> bool:
         """
         使用用户名和密码登录网站
@@ -161,7 +361,7 @@ class WebExplorer:
 
             # 等待页面完全加载
             await self.page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(2)  # 给页面额外的加载时间
+            await self.ready_strategy.wait(self.page)  # 等待页面真正就绪
 
             # 查找用户名输入框
             username_selectors = [
@@ -239,16 +439,18 @@ class WebExplorer:
                 "input[placeholder*='verify']"
             ]
 
-            # 查找并填写用户名
-            username_element = None
-            for selector in username_selectors:
-                try:
-                    username_element = await self.page.wait_for_selector(selector, timeout=2000)
-                    if username_element:
-                        break
-                except Exception:
-                    continue
+            # 一次页面内遍历按优先级解析所有候选选择器，替代逐个等待超时
+            selector_groups = {
+                "username": username_selectors,
+                "password": password_selectors,
+                "submit": submit_selectors
+            }
+            if captcha_code:
+                selector_groups["captcha"] = captcha_selectors
+            login_fields = await self._find_first_visible(selector_groups, required=["username", "password"])
 
+            # 填写用户名
+            username_element = login_fields.get("username")
             if not username_element:
                 logger.error("未找到用户名输入框")
                 return False
@@ -258,16 +460,8 @@ class WebExplorer:
             await username_element.type(username, delay=100)
             logger.info(f"已填写用户名: {username}")
 
-            # 查找并填写密码
-            password_element = None
-            for selector in password_selectors:
-                try:
-                    password_element = await self.page.wait_for_selector(selector, timeout=2000)
-                    if password_element:
-                        break
-                except Exception:
-                    continue
-
+            # 填写密码
+            password_element = login_fields.get("password")
             if not password_element:
                 logger.error("未找到密码输入框")
                 return False
@@ -277,17 +471,9 @@ class WebExplorer:
             await password_element.type(password, delay=100)
             logger.info("已填写密码")
 
-            # 查找并填写验证码(如果有)
+            # 填写验证码(如果有)
             if captcha_code:
-                captcha_element = None
-                for selector in captcha_selectors:
-                    try:
-                        captcha_element = await self.page.wait_for_selector(selector, timeout=2000)
-                        if captcha_element:
-                            break
-                    except Exception:
-                        continue
-
+                captcha_element = login_fields.get("captcha")
                 if captcha_element:
                     await captcha_element.click()
                     await captcha_element.fill("")  # 先清空
@@ -296,15 +482,11 @@ class WebExplorer:
                 else:
                     logger.warning("未找到验证码输入框，但提供了验证码")
 
-            # 查找并点击提交按钮
-            submit_button = None
-            for selector in submit_selectors:
-                try:
-                    submit_button = await self.page.wait_for_selector(selector, timeout=2000)
-                    if submit_button:
-                        break
-                except Exception:
-                    continue
+            # 查找提交按钮，部分页面在填写表单后才显示按钮，未找到时再等待一次
+            submit_button = login_fields.get("submit")
+            if not submit_button:
+                submit_button = (await self._find_first_visible(
+                    {"submit": submit_selectors}, required=["submit"])).get("submit")
 
             if not submit_button:
                 logger.error("未找到提交按钮")
@@ -320,8 +502,8 @@ class WebExplorer:
             except Exception as e:
                 logger.warning(f"等待网络请求完成时出错: {str(e)}")
 
-            # 等待一段时间以确保登录结果可用
-            await asyncio.sleep(3)
+            # 等待页面稳定以确保登录结果可用
+            await self.ready_strategy.wait_after_login(self.page)
 
             # 检查登录是否成功
             current_url = self.page.url
@@ -360,6 +542,55 @@ class WebExplorer:
             logger.error(f"登录过程中出错: {str(e)}")
             return False
 
+    async def _find_first_visible(
+            self,
+            selector_groups: Dict[str, List[str]],
+            required: Optional[List[str]] = None,
+            timeout: int = 5000
+    ) -> Dict[str, Optional[ElementHandle]]:
+        """
+        在一次页面内遍历中按优先级为每组候选选择器找到第一个可见元素
+
+        Args:
+            selector_groups (Dict[str, List[str]]): 以字段名为键的候选选择器列表，列表顺序即优先级
+            required (Optional[List[str]]): 必须找到的字段，全部出现前会在页面内轮询等待
+            timeout (int): 等待必需字段出现的最长时间（毫秒）
+
+        Returns:
+            Dict[str, Optional[ElementHandle]]: 以字段名为键的元素句柄，未找到时为None
+        """
+        # 将Playwright的 :has-text() 扩展拆分为CSS选择器和文本条件，交给页面内脚本处理
+        groups = {}
+        for name, selectors in selector_groups.items():
+            groups[name] = []
+            for selector in selectors:
+                match = re.match(r"^(.*):has-text\(['\"](.*)['\"]\)$", selector)
+                if match:
+                    groups[name].append({"selector": selector, "css": match.group(1), "text": match.group(2)})
+                else:
+                    groups[name].append({"selector": selector, "css": selector, "text": None})
+
+        try:
+            handle = await self.page.wait_for_function(
+                FIND_FIRST_VISIBLE_SCRIPT, arg={"groups": groups, "required": required or []}, timeout=timeout
+            )
+        except Exception as e:
+            # 必需字段未全部出现时，返回当前能找到的部分
+            logger.debug(f"等待登录元素出现时超时: {str(e)}")
+            handle = await self.page.evaluate_handle(FIND_FIRST_VISIBLE_SCRIPT, {"groups": groups, "required": []})
+
+        elements_handle = await handle.get_property("elements")
+        selectors = await (await handle.get_property("selectors")).json_value()
+
+        found = {}
+        for name in selector_groups:
+            element = (await elements_handle.get_property(name)).as_element()
+            found[name] = element
+            if element:
+                logger.info(f"找到登录元素 {name}: {selectors.get(name)}")
+        return found
+
+    @traced("login.cookies")
     async def login_with_cookies(self, url: str, cookies_str: str) -> bool:
         """
         使用Cookies登录网页
@@ -372,15 +603,9 @@ class WebExplorer:
             bool: 是否登录成功
         """
         try:
-            # 检查是否已有现有页面和上下文
-            if self.page:
-                await self.page.close()
-            if self.context:
-                await self.context.close()
-
-            # 使用cookies重新初始化浏览器
-            logger.info("使用cookies重新创建浏览器上下文")
-            await self.initialize(url=url, cookies_str=cookies_str)
+            # 直接在现有上下文中添加Cookie，无需重新初始化浏览器
+            logger.info("向当前浏览器上下文添加cookies")
+            await self._add_cookies(url, cookies_str)
 
             # 直接导航到目标URL
             logger.info(f"带Cookie直接导航到目标URL: {url}")
@@ -398,7 +623,7 @@ class WebExplorer:
             logger.info(f"当前页面URL: {current_url}")
 
             # 等待页面加载完成
-            await asyncio.sleep(2)  # 给页面一点时间加载
+            await self.ready_strategy.wait(self.page)
 
             # 检查页面内容，确认登录状态
             page_content = await self.page.content()
@@ -465,6 +690,7 @@ class WebExplorer:
             logger.error(traceback.format_exc())
             return False
 
+    @traced("login.ai")
     async def login_with_ai_recognition(self, url: str, username: str, password: str, captcha_code: str = None,
                                         use_openai: bool = True) -> bool:
         """
@@ -491,7 +717,7 @@ class WebExplorer:
 
             # 等待页面完全加载
             await self.page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(2)  # 给页面额外的加载时间
+            await self.ready_strategy.wait(self.page)  # 等待页面真正就绪
 
             # 使用AI识别登录元素
             login_elements = await self._ai_identify_login_elements(use_openai)
@@ -570,8 +796,8 @@ class WebExplorer:
             except Exception as e:
                 logger.warning(f"等待网络请求完成时出错: {str(e)}")
 
-            # 等待一段时间以确保登录结果可用
-            await asyncio.sleep(3)
+            # 等待页面稳定以确保登录结果可用
+            await self.ready_strategy.wait_after_login(self.page)
 
             # 严格检查登录是否成功
             current_url = self.page.url
@@ -632,18 +858,21 @@ class WebExplorer:
             logger.error(traceback.format_exc())
             return False
 
-    async def explore_page(self, url: str, max_depth: int = 2, device_type: str = "desktop") -> Dict[str, Any]:
+    async def explore_page(self, url: str, max_depth: Optional[int] = None, device_type: str = "desktop") -> Dict[str, Any]:
         """
-        加载页面并收集页面信息，但不再探索页面上的可点击元素
+        加载页面并收集页面信息，max_depth大于0时继续按广度优先访问同源链接
 
         Args:
             url (str): 要访问的页面URL
-            max_depth (int): 已不再使用的参数，保留向后兼容性
+            max_depth (Optional[int]): 探索深度，0表示只访问当前页面，为None时使用配置文件中的EXPLORE_DEPTH
             device_type (str): 设备类型，可选值为 "desktop", "mobile", "tablet"
 
         Returns:
-            Dict[str, Any]: 页面信息
+            Dict[str, Any]: 页面信息；探索深度大于0时 crawled_pages 中包含发现的其他页面信息，以URL为键
         """
+        if max_depth is None:
+            max_depth = EXPLORE_DEPTH
+
         try:
             # 清除之前的访问记录
             self.visited_urls = set()
@@ -658,24 +887,31 @@ class WebExplorer:
                 logger.error(f"URL无效: {url}")
                 return {"error": f"URL无效: {url}", "success": False}
 
-            # 导航到页面
-            logger.info(f"正在访问页面: {url}")
-            response = await self.page.goto(url, wait_until="networkidle")
+            validated_url, self._validated_url = self._validated_url, None
+            if validated_url == url:
+                # 检查登录会话时已加载该页面并等待就绪，不再重复导航
+                logger.info(f"页面已在检查登录会话时加载: {url}")
+            else:
+                # 导航到页面
+                logger.info(f"正在访问页面: {url}")
+                with trace_span("page.navigate", url=url):
+                    response = await self.page.goto(url, wait_until="networkidle")
 
-            if not response:
-                logger.error(f"无法加载页面: {url}")
-                return {"error": f"无法加载页面: {url}", "success": False}
+                if not response:
+                    logger.error(f"无法加载页面: {url}")
+                    return {"error": f"无法加载页面: {url}", "success": False}
 
-            # 等待页面完全加载
-            await self.page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(2)  # 给页面额外的加载时间
+                # 等待页面完全加载
+                with trace_span("page.ready", url=url):
+                    await self.page.wait_for_load_state("domcontentloaded")
+                    await self.ready_strategy.wait(self.page)  # 等待页面真正就绪
 
             # 收集页面信息
             logger.info("收集当前页面信息")
             page_info = await self._collect_page_info()
 
             # 记录结果
-            self.visited_urls.add(url)
+            self.visited_urls.add(normalize_url(url) or url)
             self.page_data[url] = page_info
 
             # 返回结果
@@ -685,6 +921,9 @@ class WebExplorer:
                 "success": True
             }
 
+            if max_depth > 0:
+                result["crawled_pages"] = await self._crawl(url, max_depth, page_info)
+
             return result
 
         except Exception as e:
@@ -692,669 +931,169 @@ class WebExplorer:
             traceback.print_exc()
             return {"error": str(e), "success": False}
 
-    async def _collect_page_info(self) -> Dict[str, Any]:
+    async def _crawl(self, start_url: str, max_depth: int, start_info: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
         """
-        收集当前页面的关键信息用于AI生成测试用例，优化数据质量而非限制数量
+        从已加载的起始页面开始按广度优先访问同源链接
+
+        使用固定数量的页面并发访问，同一主机的请求受并发数和间隔限制；
+        页面按规范化URL和内容哈希去重，发现的URL记录在explored_urls，访问过的记录在visited_urls，
+        每个页面的访问路径记录在click_paths
+
+        Args:
+            start_url (str): 起始页面URL（当前页面）
+            max_depth (int): 最大链接层数
+            start_info (Dict[str, Any]): 起始页面的页面信息
 
         Returns:
-            Dict[str, Any]: 页面信息字典
+            Dict[str, Dict[str, Any]]: 发现的其他页面信息，以URL为键，按发现顺序排列
         """
-        try:
-            url = self.page.url
-            title = await self.page.title()
+        frontier = CrawlFrontier(start_url, seen=self.explored_urls)
+        politeness = HostPoliteness()
+        content_hashes = {self._content_hash(start_info)}
+        found: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+
+        # 重定向后的地址也算起始页面，避免重复访问
+        self.visited_urls.add(normalize_url(self.page.url) or self.page.url)
+        self.explored_urls.update(self.visited_urls)
+        frontier.add_links(await self._extract_links(self.page), self.page.url, 1, [frontier.start_url])
+        if frontier.queue.empty():
+            return {}
+
+        max_pages_text = frontier.max_pages if frontier.max_pages > 0 else "不限"
+        logger.info(f"开始探索同源页面，深度: {max_depth}，最多页面数: {max_pages_text}，并发页面数: {CRAWL_WORKERS}")
+
+        async def visit(page: Page, item: CrawlItem) -> None:
+            async with politeness.slot(item.url):
+                with trace_span("page.navigate", url=item.url, depth=item.depth):
+                    response = await page.goto(item.url, wait_until="domcontentloaded")
+            if not response or not response.ok:
+                logger.info(f"跳过无法访问的页面: {item.url}")
+                return
+            if "html" not in (response.headers.get("content-type") or "html"):
+                return
+
+            # 重定向到其他源（如登录页）或已访问过的页面时跳过
+            final_url = normalize_url(page.url) or page.url
+            if url_origin(final_url) != frontier.origin or (final_url != item.url and final_url in self.visited_urls):
+                return
+            self.visited_urls.add(item.url)
+            self.visited_urls.add(final_url)
+
+            with trace_span("page.ready", url=item.url):
+                await self.ready_strategy.wait(page)
+            page_info = await self._collect_page_info(page)
+            content_hash = self._content_hash(page_info)
+            if content_hash in content_hashes:
+                logger.info(f"页面内容与已访问页面相同，跳过: {item.url}")
+            else:
+                content_hashes.add(content_hash)
+                found[item.order] = (item.url, page_info)
+                self.page_data[item.url] = page_info
+                self.click_paths.append({"url": item.url, "depth": item.depth, "path": item.path})
 
-            # 创建结果字典
-            result = {
-                "url": url,
-                "title": title,
-                "timestamp": time.time()
-            }
+            if item.depth < max_depth:
+                frontier.add_links(await self._extract_links(page), page.url, item.depth + 1, item.path)
 
-            # 使用一个共同的错误处理函数收集各种页面元素信息
-            async def safe_evaluate(js_code, default_value=None, key_name=None):
+        async def worker(page: Page) -> None:
+            while True:
+                item = await frontier.queue.get()
                 try:
-                    value = await self.page.evaluate(js_code)
-                    if key_name:
-                        result[key_name] = value
-                    return value
+                    await visit(page, item)
                 except Exception as e:
-                    logger.warning(f"获取页面信息时出错 ({key_name}): {str(e)}")
-                    if key_name:
-                        result[key_name] = default_value
-                    return default_value
-
-            # 获取页面结构概览（提供整体结构而不是详细内容）
-            await safe_evaluate("""() => {
-                // 获取页面的主要结构
-                const structure = {
-                    hasHeader: !!document.querySelector('header'),
-                    hasFooter: !!document.querySelector('footer'),
-                    hasNavigation: !!document.querySelector('nav'),
-                    hasMainContent: !!document.querySelector('main'),
-                    hasSidebar: !!document.querySelector('aside'),
-                    hasForms: document.forms.length > 0,
-                    formCount: document.forms.length,
-                    linkCount: document.querySelectorAll('a').length,
-                    buttonCount: document.querySelectorAll('button, input[type="button"], input[type="submit"]').length,
-                    inputCount: document.querySelectorAll('input:not([type="button"]):not([type="submit"]), textarea, select').length,
-                    imageCount: document.querySelectorAll('img').length,
-                    tableCount: document.querySelectorAll('table').length
-                };
-                return structure;
-            }""", {}, "page_structure")
-
-            # 获取重要的meta标签（减少不重要的元数据）
-            await safe_evaluate("""() => {
-                const importantMeta = {};
-                const importantMetaNames = ['description', 'keywords', 'viewport', 'author', 'og:title', 'og:description'];
-                document.querySelectorAll('meta').forEach(meta => {
-                    const name = meta.name || meta.property;
-                    if (name && importantMetaNames.includes(name)) {
-                        importantMeta[name] = meta.content;
-                    }
-                });
-                return importantMeta;
-            }""", {}, "meta")
-
-            # 分析并提取页面主要功能而不是所有元素
-            await safe_evaluate("""() => {
-                // 分析页面主要功能块
-                const functionalAreas = [];
-                
-                // 排除的区域选择器列表
-                const excludedSelectors = [
-                    // 页眉区域
-                    'header', '.header', '#header', '[role="banner"]',
-                    // 页脚区域
-                    'footer', '.footer', '#footer', '[role="contentinfo"]',
-                    '.copyright', '#copyright', '.legal', '#legal',
-                    '.site-info', '#site-info', '.site-footer', '#site-footer',
-                    '.bottom-footer', '#bottom-footer', '.footer-bottom', '#footer-bottom',
-                    '.footer-links', '#footer-links', '.footer-menu', '#footer-menu',
-                    '.footer-wrapper', '#footer-wrapper', '.footer-content', '#footer-content',
-                    '.friend-links', '#friend-links', '.friendship-links', '#friendship-links',
-                    '.links', '.link-list', '.link-area', '.about-links',
-                    '.site-record', '#site-record', '.icp', '#icp', '.beian', '#beian',
-                    // 导航区域
-                    'nav', '.nav', '#nav', '.navbar', '#navbar', '[role="navigation"]',
-                    '.menu', '#menu', '.navigation', '#navigation',
-                    '.breadcrumb', '.breadcrumbs', '#breadcrumb', '#breadcrumbs',
-                    // 侧边栏区域
-                    'aside', '.sidebar', '#sidebar', '[role="complementary"]',
-                    // 社交和分享区域
-                    '.social-links', '#social-links', '.share-buttons', '#share-buttons',
-                    '.social-media', '#social-media', '.social-icons', '#social-icons',
-                    // 其他通用区域
-                    '.site-policy', '#site-policy', '.terms', '#terms', '.privacy', '#privacy', 
-                    '.about-us', '#about-us', '.contact-us', '#contact-us',
-                    '.help-center', '#help-center', '.support-links', '#support-links',
-                    '.subscribe', '#subscribe', '.newsletter', '#newsletter',
-                    // 与底部相关的区选择器
-                    '[class*="footer"]', '[id*="footer"]', '[class*="bottom"]', '[id*="bottom"]',
-                    '[class*="copyright"]', '[id*="copyright"]', '[class*="rights"]', '[id*="rights"]',
-                    '.about-section', '#about-section', '.contact-section', '#contact-section'
-                ];
-                
-                // 检查元素是否在排除区域内
-                const isInExcludedArea = (element) => {
-                    if (!element) return false;
-                    
-                    // 检查元素的祖先是否匹配排除选择器
-                    let parent = element;
-                    while (parent) {
-                        for (const selector of excludedSelectors) {
-                            if (parent.matches && parent.matches(selector)) return true;
-                        }
-                        parent = parent.parentElement;
-                    }
-                    
-                    return false;
-                };
-
-                // 识别页面上的主要功能区域和操作
-                const addFunctionalArea = (element, type, importance = 'medium') => {
-                    if (!element) return;
-                    
-                    // 检查是否在排除区域内
-                    if (isInExcludedArea(element)) return;
-
-                    // 检查是否已包含此元素
-                    const elementRect = element.getBoundingClientRect();
-                    if (elementRect.width === 0 || elementRect.height === 0) return;
-
-                    // 计算元素可见性和位置得分
-                    const viewportHeight = window.innerHeight;
-                    const viewportWidth = window.innerWidth;
-                    const centerY = viewportHeight / 2;
-                    const centerX = viewportWidth / 2;
-                    const elementCenterY = elementRect.top + elementRect.height / 2;
-                    const elementCenterX = elementRect.left + elementRect.width / 2;
-
-                    // 计算到视口中心的距离（归一化）
-                    const distanceToCenter = Math.sqrt(
-                        Math.pow((elementCenterX - centerX) / viewportWidth, 2) +
-                        Math.pow((elementCenterY - centerY) / viewportHeight, 2)
-                    );
-
-                    // 计算元素大小得分
-                    const sizeScore = (elementRect.width * elementRect.height) / (viewportWidth * viewportHeight);
-
-                    // 根据元素包含的交互元素计算功能重要性
-                    const interactiveElements = element.querySelectorAll('button, a, input, select, textarea');
-                    const interactivityScore = interactiveElements.length;
-
-                    // 总得分 = 位置得分 + 大小得分 + 交互元素得分
-                    const totalScore = (1 - distanceToCenter) * 0.4 + sizeScore * 0.3 + Math.min(interactivityScore * 0.05, 0.3);
-
-                    // 根据得分确定重要性
-                    let calculatedImportance = 'low';
-                    if (totalScore > 0.6) calculatedImportance = 'high';
-                    else if (totalScore > 0.3) calculatedImportance = 'medium';
-
-                    const finalImportance = importance === 'high' ? 'high' : calculatedImportance;
-
-                    // 提取元素的关键信息
-                    functionalAreas.push({
-                        type,
-                        tagName: element.tagName.toLowerCase(),
-                        id: element.id,
-                        className: element.className,
-                        text: element.textContent.trim().substring(0, 100),
-                        importance: finalImportance,
-                        interactiveElementCount: interactiveElements.length,
-                        position: {
-                            top: Math.round(elementRect.top),
-                            left: Math.round(elementRect.left),
-                            width: Math.round(elementRect.width),
-                            height: Math.round(elementRect.height)
-                        }
-                    });
-                };
-
-                // 识别主要内容区域
-                const mainContent = document.querySelector('main') ||
-                                    document.querySelector('article') ||
-                                    document.querySelector('#content') ||
-                                    document.querySelector('.content');
-                if (mainContent) {
-                    addFunctionalArea(mainContent, 'main_content', 'high');
-                }
+                    logger.warning(f"探索页面时出错 ({item.url}): {str(e)}")
+                finally:
+                    frontier.queue.task_done()
 
-                // 识别表单（高优先级功能区域）
-                document.querySelectorAll('form').forEach(form => {
-                    if (!isInExcludedArea(form)) {
-                        addFunctionalArea(form, 'form', 'high');
-                    }
-                });
-
-                // 识别可能的功能卡片/面板
-                ['section', '.card', '.panel', '.box', '.container', '.module', '[role="region"]'].forEach(selector => {
-                    document.querySelectorAll(selector).forEach(el => {
-                        // 仅添加包含交互元素且不在排除区域内的区域
-                        if (!isInExcludedArea(el) && el.querySelectorAll('button, a, input, select, textarea').length > 0) {
-                            addFunctionalArea(el, 'functional_module');
-                        }
-                    });
-                });
-
-                // 根据重要性排序
-                const importanceScores = { 'high': 3, 'medium': 2, 'low': 1 };
-                functionalAreas.sort((a, b) => importanceScores[b.importance] - importanceScores[a.importance]);
-
-                return functionalAreas;
-            }""", [], "functional_areas")
-
-            # 智能分析表单（关注关键属性而非所有属性）
-            await safe_evaluate("""() => {
-                // 排除的区域选择器列表
-                const excludedSelectors = [
-                    // 页眉区域
-                    'header', '.header', '#header', '[role="banner"]',
-                    // 页脚区域
-                    'footer', '.footer', '#footer', '[role="contentinfo"]',
-                    '.copyright', '#copyright', '.legal', '#legal',
-                    '.site-info', '#site-info', '.site-footer', '#site-footer',
-                    '.bottom-footer', '#bottom-footer', '.footer-bottom', '#footer-bottom',
-                    '.footer-links', '#footer-links', '.footer-menu', '#footer-menu',
-                    '.footer-wrapper', '#footer-wrapper', '.footer-content', '#footer-content',
-                    '.friend-links', '#friend-links', '.friendship-links', '#friendship-links',
-                    '.links', '.link-list', '.link-area', '.about-links',
-                    '.site-record', '#site-record', '.icp', '#icp', '.beian', '#beian',
-                    // 导航区域
-                    'nav', '.nav', '#nav', '.navbar', '#navbar', '[role="navigation"]',
-                    '.menu', '#menu', '.navigation', '#navigation',
-                    '.breadcrumb', '.breadcrumbs', '#breadcrumb', '#breadcrumbs',
-                    // 侧边栏区域
-                    'aside', '.sidebar', '#sidebar', '[role="complementary"]',
-                    // 社交和分享区域
-                    '.social-links', '#social-links', '.share-buttons', '#share-buttons',
-                    '.social-media', '#social-media', '.social-icons', '#social-icons',
-                    // 其他通用区域
-                    '.site-policy', '#site-policy', '.terms', '#terms', '.privacy', '#privacy', 
-                    '.about-us', '#about-us', '.contact-us', '#contact-us',
-                    '.help-center', '#help-center', '.support-links', '#support-links',
-                    '.subscribe', '#subscribe', '.newsletter', '#newsletter',
-                    // 与底部相关的区选择器
-                    '[class*="footer"]', '[id*="footer"]', '[class*="bottom"]', '[id*="bottom"]',
-                    '[class*="copyright"]', '[id*="copyright"]', '[class*="rights"]', '[id*="rights"]',
-                    '.about-section', '#about-section', '.contact-section', '#contact-section'
-                ];
-                
-                // 检查元素是否在排除区域内
-                const isInExcludedArea = (element) => {
-                    if (!element) return false;
-                    
-                    // 检查元素的祖先是否匹配排除选择器
-                    let parent = element;
-                    while (parent) {
-                        for (const selector of excludedSelectors) {
-                            if (parent.matches && parent.matches(selector)) return true;
-                        }
-                        parent = parent.parentElement;
-                    }
-                    
-                    return false;
-                };
-                
-                return Array.from(document.forms)
-                    .filter(form => !isInExcludedArea(form)) // 过滤掉在排除区域内的表单
-                    .map(form => {
-                    // 分析表单的用途
-                    const formPurpose = (() => {
-                        const action = form.action.toLowerCase();
-                        const id = (form.id || '').toLowerCase();
-                        const className = (form.className || '').toLowerCase();
-                        const buttonText = Array.from(form.querySelectorAll('button, input[type="submit"]'))
-                            .map(el => el.textContent || el.value || '').join(' ').toLowerCase();
-
-                        if (action.includes('login') || id.includes('login') || className.includes('login') ||
-                            buttonText.includes('login') || buttonText.includes('sign in') || buttonText.includes('登录')) {
-                            return 'login';
-                        } else if (action.includes('register') || id.includes('register') || className.includes('register') ||
-                                 buttonText.includes('register') || buttonText.includes('sign up') || buttonText.includes('注册')) {
-                            return 'registration';
-                        } else if (action.includes('search') || id.includes('search') || className.includes('search') ||
-                                 buttonText.includes('search') || buttonText.includes('搜索')) {
-                            return 'search';
-                        } else if (action.includes('contact') || id.includes('contact') || className.includes('contact') ||
-                                 buttonText.includes('contact') || buttonText.includes('send') || buttonText.includes('联系')) {
-                            return 'contact';
-                        } else if (form.querySelector('input[name="password"]') || form.querySelector('input[type="password"]')) {
-                            return 'authentication';
-                        } else {
-                            return 'data_entry';
-                        }
-                    })();
-
-                    // 分析表单的关键字段
-                    const formFields = Array.from(form.elements)
-                        .filter(el => el.tagName !== 'BUTTON' && el.type !== 'submit' && el.type !== 'reset' && el.type !== 'button')
-                        .map(el => {
-                            // 确定字段类型和用途
-                            const fieldPurpose = (() => {
-                                const name = (el.name || '').toLowerCase();
-                                const id = (el.id || '').toLowerCase();
-                                const placeholder = (el.placeholder || '').toLowerCase();
-                                const label = el.labels && el.labels.length > 0
-                                    ? el.labels[0].textContent.toLowerCase()
-                                    : '';
-
-                                if (el.type === 'password') return 'password';
-                                if (el.required) return 'required_field';
-                                if (name.includes('email') || id.includes('email') || placeholder.includes('email') || label.includes('email')) return 'email';
-                                if (name.includes('name') || id.includes('name') || placeholder.includes('name') || label.includes('name')) return 'name';
-                                if (name.includes('phone') || id.includes('phone') || placeholder.includes('phone') || label.includes('phone')) return 'phone';
-                                if (name.includes('address') || id.includes('address') || placeholder.includes('address') || label.includes('address')) return 'address';
-                                if (name.includes('date') || id.includes('date') || placeholder.includes('date') || label.includes('date')) return 'date';
-                                if (el.type === 'checkbox') return 'option';
-                                if (el.type === 'radio') return 'selection';
-                                if (el.tagName === 'SELECT') return 'dropdown';
-                                if (el.tagName === 'TEXTAREA') return 'text_area';
-
-                                return 'text_field';
-                            })();
-
-                            return {
-                                type: el.type || el.tagName.toLowerCase(),
-                                name: el.name,
-                                id: el.id,
-                                placeholder: el.placeholder,
-                                required: el.required,
-                                disabled: el.disabled,
-                                fieldPurpose: fieldPurpose
-                            };
-                        });
+        pages = [await self.context.new_page() for _ in range(max(1, CRAWL_WORKERS))]
+        workers = [asyncio.create_task(worker(page)) for page in pages]
+        try:
+            await frontier.queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for page in pages:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
 
-                    return {
-                        id: form.id,
-                        action: form.action,
-                        method: form.method,
-                        purpose: formPurpose,
-                        formFields: formFields
-                    };
-                });
-            }""", [], "forms")
-
-            # 提取页面关键交互元素（按钮、链接等）
-            await safe_evaluate("""() => {
-                // 排除的区域选择器列表
-                const excludedSelectors = [
-                    // 页眉区域
-                    'header', '.header', '#header', '[role="banner"]',
-                    // 页脚区域
-                    'footer', '.footer', '#footer', '[role="contentinfo"]',
-                    '.copyright', '#copyright', '.legal', '#legal',
-                    '.site-info', '#site-info', '.site-footer', '#site-footer',
-                    '.bottom-footer', '#bottom-footer', '.footer-bottom', '#footer-bottom',
-                    '.footer-links', '#footer-links', '.footer-menu', '#footer-menu',
-                    '.footer-wrapper', '#footer-wrapper', '.footer-content', '#footer-content',
-                    '.friend-links', '#friend-links', '.friendship-links', '#friendship-links',
-                    '.links', '.link-list', '.link-area', '.about-links',
-                    '.site-record', '#site-record', '.icp', '#icp', '.beian', '#beian',
-                    // 导航区域
-                    'nav', '.nav', '#nav', '.navbar', '#navbar', '[role="navigation"]',
-                    '.menu', '#menu', '.navigation', '#navigation',
-                    '.breadcrumb', '.breadcrumbs', '#breadcrumb', '#breadcrumbs',
-                    '.tabs', '#tabs', '[role="tablist"]', 
-                    '.pagination', '#pagination',
-                    // 侧边栏区域
-                    'aside', '.sidebar', '#sidebar', '[role="complementary"]',
-                    // 社交和分享区域
-                    '.social-links', '#social-links', '.share-buttons', '#share-buttons',
-                    '.social-media', '#social-media', '.social-icons', '#social-icons',
-                    // 其他通用区域
-                    '.site-policy', '#site-policy', '.terms', '#terms', '.privacy', '#privacy', 
-                    '.about-us', '#about-us', '.contact-us', '#contact-us',
-                    '.help-center', '#help-center', '.support-links', '#support-links',
-                    '.subscribe', '#subscribe', '.newsletter', '#newsletter',
-                    // 与底部相关的区选择器
-                    '[class*="footer"]', '[id*="footer"]', '[class*="bottom"]', '[id*="bottom"]',
-                    '[class*="copyright"]', '[id*="copyright"]', '[class*="rights"]', '[id*="rights"]',
-                    '.about-section', '#about-section', '.contact-section', '#contact-section'
-                ];
-                
-                // 检查元素是否在排除区域内
-                const isInExcludedArea = (element) => {
-                    if (!element) return false;
-                    
-                    // 检查元素的祖先是否匹配排除选择器
-                    let parent = element;
-                    while (parent) {
-                        for (const selector of excludedSelectors) {
-                            if (parent.matches && parent.matches(selector)) return true;
-                        }
-                        parent = parent.parentElement;
-                    }
-                    
-                    return false;
-                };
-                
-                // 分析页面交互元素的结构和目的
-                const getElementPurpose = (el) => {
-                    const text = (el.textContent || el.value || '').trim().toLowerCase();
-                    const classes = (el.className || '').toLowerCase();
-                    const id = (el.id || '').toLowerCase();
-
-                    // 根据文本和类名推断按钮目的
-                    if (text.includes('login') || text.includes('sign in') || text.includes('登录')) return 'login';
-                    if (text.includes('register') || text.includes('sign up') || text.includes('注册')) return 'registration';
-                    if (text.includes('submit') || text.includes('save') || text.includes('提交') || text.includes('保存')) return 'submission';
-                    if (text.includes('search') || text.includes('搜索')) return 'search';
-                    if (text.includes('cancel') || text.includes('close') || text.includes('取消') || text.includes('关闭')) return 'cancellation';
-                    if (text.includes('delete') || text.includes('remove') || text.includes('删除') || text.includes('移除')) return 'deletion';
-                    if (text.includes('edit') || text.includes('modify') || text.includes('编辑') || text.includes('修改')) return 'editing';
-                    if (text.includes('add') || text.includes('create') || text.includes('new') || text.includes('添加') || text.includes('创建')) return 'creation';
-                    if (text.includes('view') || text.includes('show') || text.includes('查看') || text.includes('显示')) return 'viewing';
-                    if (text.includes('next') || text.includes('continue') || text.includes('下一步') || text.includes('继续')) return 'navigation_forward';
-                    if (text.includes('previous') || text.includes('back') || text.includes('上一步') || text.includes('返回')) return 'navigation_backward';
-
-                    // 根据类名推断
-                    if (classes.includes('btn-primary') || classes.includes('primary-button')) return 'primary_action';
-                    if (classes.includes('btn-secondary') || classes.includes('secondary-button')) return 'secondary_action';
-                    if (classes.includes('btn-danger') || classes.includes('danger-button')) return 'danger_action';
-                    if (classes.includes('btn-warning') || classes.includes('warning-button')) return 'warning_action';
-                    if (classes.includes('btn-success') || classes.includes('success-button')) return 'success_action';
-
-                    // 默认目的
-                    return 'interaction';
-                };
-
-                // 获取重要的按钮
-                const importantButtons = Array.from(document.querySelectorAll('button, input[type="button"], input[type="submit"], [role="button"]'))
-                    .filter(btn => {
-                        // 过滤掉隐藏、禁用和排除区域内的按钮
-                        return window.getComputedStyle(btn).display !== 'none' &&
-                               window.getComputedStyle(btn).visibility !== 'hidden' &&
-                               !btn.disabled &&
-                               !isInExcludedArea(btn);
-                    })
-                    .map(btn => {
-                        return {
-                            text: (btn.textContent || btn.value || '').trim(),
-                            type: btn.type,
-                            purpose: getElementPurpose(btn),
-                            isFormSubmit: btn.type === 'submit',
-                            isDisabled: btn.disabled,
-                            isVisible: true,
-                            position: (() => {
-                                const rect = btn.getBoundingClientRect();
-                                return {
-                                    top: Math.round(rect.top),
-                                    left: Math.round(rect.left)
-                                };
-                            })()
-                        };
-                    });
-
-                // 获取重要的链接
-                const importantLinks = Array.from(document.querySelectorAll('a'))
-                    .filter(link => {
-                        // 过滤掉空链接、隐藏链接和排除区域内的链接
-                        const hasText = (link.textContent || '').trim().length > 0;
-                        const isVisible = window.getComputedStyle(link).display !== 'none' &&
-                                          window.getComputedStyle(link).visibility !== 'hidden';
-                        return hasText && isVisible && !isInExcludedArea(link);
-                    })
-                    .map(link => {
-                        return {
-                            text: link.textContent.trim(),
-                            href: link.href,
-                            purpose: getElementPurpose(link),
-                            isExternal: link.hostname !== window.location.hostname,
-                            position: (() => {
-                                const rect = link.getBoundingClientRect();
-                                return {
-                                    top: Math.round(rect.top),
-                                    left: Math.round(rect.left)
-                                };
-                            })()
-                        };
-                    });
+        logger.info(f"探索完成：发现 {len(self.explored_urls)} 个URL，访问 {len(self.visited_urls)} 个，新增 {len(found)} 个不重复页面")
+        return {url: page_info for _, (url, page_info) in sorted(found.items())}
 
-                return {
-                    buttons: importantButtons,
-                    links: importantLinks
-                };
-            }""", {}, "interactive_elements")
-
-            # 提取页面内容语义结构（而不是完整文本）
-            await safe_evaluate("""() => {
-                // 排除的区域选择器列表
-                const excludedSelectors = [
-                    // 页眉区域
-                    'header', '.header', '#header', '[role="banner"]',
-                    // 页脚区域
-                    'footer', '.footer', '#footer', '[role="contentinfo"]',
-                    '.copyright', '#copyright', '.legal', '#legal',
-                    '.site-info', '#site-info', '.site-footer', '#site-footer',
-                    '.bottom-footer', '#bottom-footer', '.footer-bottom', '#footer-bottom',
-                    '.footer-links', '#footer-links', '.footer-menu', '#footer-menu',
-                    '.footer-wrapper', '#footer-wrapper', '.footer-content', '#footer-content',
-                    '.friend-links', '#friend-links', '.friendship-links', '#friendship-links',
-                    '.links', '.link-list', '.link-area', '.about-links',
-                    '.site-record', '#site-record', '.icp', '#icp', '.beian', '#beian',
-                    // 导航区域
-                    'nav', '.nav', '#nav', '.navbar', '#navbar', '[role="navigation"]',
-                    '.menu', '#menu', '.navigation', '#navigation',
-                    '.breadcrumb', '.breadcrumbs', '#breadcrumb', '#breadcrumbs',
-                    // 侧边栏区域
-                    'aside', '.sidebar', '#sidebar', '[role="complementary"]',
-                    // 社交和分享区域
-                    '.social-links', '#social-links', '.share-buttons', '#share-buttons',
-                    '.social-media', '#social-media', '.social-icons', '#social-icons',
-                    // 其他通用区域
-                    '.site-policy', '#site-policy', '.terms', '#terms', '.privacy', '#privacy', 
-                    '.about-us', '#about-us', '.contact-us', '#contact-us',
-                    '.help-center', '#help-center', '.support-links', '#support-links',
-                    '.subscribe', '#subscribe', '.newsletter', '#newsletter',
-                    // 与底部相关的区选择器
-                    '[class*="footer"]', '[id*="footer"]', '[class*="bottom"]', '[id*="bottom"]',
-                    '[class*="copyright"]', '[id*="copyright"]', '[class*="rights"]', '[id*="rights"]',
-                    '.about-section', '#about-section', '.contact-section', '#contact-section'
-                ];
-                
-                // 检查元素是否在排除区域内
-                const isInExcludedArea = (element) => {
-                    if (!element) return false;
-                    
-                    // 检查元素的祖先是否匹配排除选择器
-                    let parent = element;
-                    while (parent) {
-                        for (const selector of excludedSelectors) {
-                            if (parent.matches && parent.matches(selector)) return true;
-                        }
-                        parent = parent.parentElement;
-                    }
-                    
-                    return false;
-                };
-                
-                // 提取页面的语义结构
-                const extractSemanticStructure = () => {
-                    const structure = [];
-
-                    // 提取标题层次结构
-                    const headings = Array.from(document.querySelectorAll('h1, h2, h3, h4, h5, h6'))
-                        .filter(heading => !isInExcludedArea(heading));
-                    
-                    const headingStructure = headings.map(heading => {
-                        return {
-                            level: parseInt(heading.tagName.substring(1)),
-                            text: heading.textContent.trim()
-                        };
-                    });
-
-                    if (headingStructure.length > 0) {
-                        structure.push({
-                            type: 'heading_hierarchy',
-                            content: headingStructure
-                        });
-                    }
+    @staticmethod
+    async def _extract_links(page: Page) -> List[str]:
+        """
+        获取页面上所有链接的绝对地址
 
-                    // 提取列表结构
-                    const lists = Array.from(document.querySelectorAll('ul, ol'))
-                        .filter(list => !isInExcludedArea(list));
-                    
-                    const listStructure = lists.map(list => {
-                        const items = Array.from(list.querySelectorAll('li')).map(li => li.textContent.trim());
-                        return {
-                            type: list.tagName.toLowerCase(),
-                            items: items
-                        };
-                    });
-
-                    if (listStructure.length > 0) {
-                        structure.push({
-                            type: 'lists',
-                            content: listStructure
-                        });
-                    }
+        Args:
+            page (Page): 页面
 
-                    // 提取主要段落结构
-                    const mainElement = document.querySelector('main') ||
-                                       document.querySelector('article') ||
-                                       document.querySelector('#content') ||
-                                       document.querySelector('.content');
-
-                    if (mainElement) {
-                        const paragraphs = Array.from(mainElement.querySelectorAll('p'))
-                            .filter(p => p.textContent.trim().length > 0 && !isInExcludedArea(p))
-                            .map(p => {
-                                // 智能提取段落摘要，保留关键信息
-                                const text = p.textContent.trim();
-                                return text.length > 100 ? text.substring(0, 100) + '...' : text;
-                            });
-
-                        if (paragraphs.length > 0) {
-                            structure.push({
-                                type: 'paragraphs',
-                                content: paragraphs
-                            });
-                        }
-                    }
+        Returns:
+            List[str]: 链接列表
+        """
+        try:
+            return await page.evaluate(LINK_EXTRACT_SCRIPT) or []
+        except Exception as e:
+            logger.warning(f"获取页面链接时出错: {str(e)}")
+            return []
 
-                    return structure;
-                };
+    @staticmethod
+    def _content_hash(page_info: Dict[str, Any]) -> str:
+        """
+        计算页面内容哈希，忽略URL、标题和时间戳，用于发现内容相同的不同URL
 
-                return extractSemanticStructure();
-            }""", [], "content_structure")
+        Args:
+            page_info (Dict[str, Any]): 页面信息
 
-            # 提取页面重要的错误信息和提示
-            await safe_evaluate("""() => {
-                return Array.from(document.querySelectorAll('.error, .alert, .message, .notification, [role="alert"], [aria-live]'))
-                    .filter(el => el.textContent.trim().length > 0)
-                    .map(el => {
-                        // 确定消息类型
-                        const classes = (el.className || '').toLowerCase();
-                        let messageType = 'info';
-                        if (classes.includes('error') || classes.includes('danger')) messageType = 'error';
-                        else if (classes.includes('warn')) messageType = 'warning';
-                        else if (classes.includes('success')) messageType = 'success';
+        Returns:
+            str: sha256十六进制摘要
+        """
+        content = {key: value for key, value in page_info.items() if key not in ("url", "title", "timestamp")}
+        return hashlib.sha256(json.dumps(content, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
 
-                        return {
-                            type: messageType,
-                            text: el.textContent.trim()
-                        };
-                    });
-            }""", [], "messages")
-
-            # 提取关键输入控件的特征（较优先）
-            await safe_evaluate("""() => {
-                return Array.from(document.querySelectorAll('input:not([type="button"]):not([type="submit"]), textarea, select'))
-                    .filter(el => window.getComputedStyle(el).display !== 'none')
-                    .map(el => {
-                        // 确定字段的用途
-                        const fieldPurpose = (() => {
-                            const name = (el.name || '').toLowerCase();
-                            const id = (el.id || '').toLowerCase();
-                            const placeholder = (el.placeholder || '').toLowerCase();
-
-                            if (el.type === 'password') return 'password';
-                            if (name.includes('email') || id.includes('email') || placeholder.includes('email')) return 'email';
-                            if (name.includes('name') || id.includes('name') || placeholder.includes('name')) return 'name';
-                            if (name.includes('phone') || id.includes('phone') || placeholder.includes('phone')) return 'phone';
-                            if (name.includes('search') || id.includes('search') || placeholder.includes('search')) return 'search';
-                            if (el.type === 'date') return 'date';
-                            if (el.type === 'checkbox') return 'checkbox';
-                            if (el.type === 'radio') return 'radio';
-                            if (el.tagName === 'SELECT') return 'dropdown';
-                            if (el.tagName === 'TEXTAREA') return 'long_text';
-
-                            return 'text';
-                        })();
+    @traced("page.collect")
+    async def _collect_page_info(self, page: Optional[Page] = None) -> Dict[str, Any]:
+        """
+        收集当前页面的关键信息用于AI生成测试用例，优化数据质量而非限制数量
 
-                        return {
-                            type: el.type || el.tagName.toLowerCase(),
-                            purpose: fieldPurpose,
-                            name: el.name,
-                            id: el.id,
-                            placeholder: el.placeholder,
-                            required: el.required,
-                            disabled: el.disabled,
-                            readOnly: el.readOnly
-                        };
-                    });
-            }""", [], "input_controls")
+        Args:
+            page (Optional[Page]): 要收集的页面，为None时使用当前页面
+
+        Returns:
+            Dict[str, Any]: 页面信息字典
+        """
+        page = page or self.page
+        try:
+            url = page.url
+            title = await page.title()
+
+            # 创建结果字典
+            result = {
+                "url": url,
+                "title": title,
+                "timestamp": time.time()
+            }
+
+            # 一次evaluate调用遍历DOM并返回所有部分，避免多次往返和重复遍历
+            try:
+                snapshot = await page.evaluate(PAGE_SNAPSHOT_SCRIPT) or {}
+            except Exception as e:
+                logger.warning(f"获取页面快照时出错: {str(e)}")
+                snapshot = {}
+
+            sections = snapshot.get("sections", {})
+            errors = snapshot.get("errors", {})
+            for key_name, duration_ms in (snapshot.get("timings") or {}).items():
+                record_span(f"page.section.{key_name}", duration_ms)
+            for key_name, default_value in PAGE_SNAPSHOT_SECTIONS.items():
+                if key_name in sections:
+                    result[key_name] = sections[key_name]
+                else:
+                    # 单个部分出错时使用默认值，不影响其他部分
+                    if key_name in errors:
+                        logger.warning(f"获取页面信息时出错 ({key_name}): {errors[key_name]}")
+                    result[key_name] = copy.deepcopy(default_value)
 
             return result
 
@@ -1363,7 +1102,7 @@ class WebExplorer:
             traceback.print_exc()
             # 返回最小化的结果
             return {
-                "url": self.page.url,
+                "url": page.url,
                 "title": "Error collecting page info",
                 "error": str(e),
                 "timestamp": time.time()
@@ -1388,24 +1127,46 @@ class WebExplorer:
                 logger.info("使用启发式规则识别登录元素")
                 return await self._identify_login_elements_heuristic()
 
+            # 相同结构的登录页面之前已识别过时，直接复用缓存的xpath
+            fingerprint = None
+            if self.login_locator_cache is not None:
+                fingerprint = await self._login_page_fingerprint()
+                cached_elements = self.login_locator_cache.get(fingerprint) if fingerprint else None
+                if cached_elements:
+                    if await self._login_xpaths_resolve(cached_elements):
+                        logger.info("命中登录元素定位缓存，跳过AI识别")
+                        return cached_elements
+                    # 缓存的xpath已无法定位元素，页面已变化
+                    logger.info("缓存的登录元素xpath已失效，重新使用AI识别")
+                    self.login_locator_cache.invalidate(fingerprint)
+
             # 使用OpenAI API识别
-            # 获取页面HTML内容
-            html_content = await self.page.content()
+            # 只提取表单控件、按钮及其标签和属性，脚本、样式和SVG不发送给AI
+            html_preview = await distill_login_dom(self.page)
+            if html_preview:
+                content_description = "页面中可见的表单控件和按钮（已去除脚本、样式及无关元素，缩进表示位于表单内）"
+                xpath_rule = "xpath只能使用元素的标签、属性和文字来定位，不要使用层级位置，"
+                logger.info(f"已精简页面DOM用于AI分析 (精简后大小: {len(html_preview)}字符)")
+            else:
+                # 精简结果为空时（如表单位于iframe或shadow DOM中）回退到原始HTML
+                html_content = await self.page.content()
 
-            # 截取HTML内容（避免过大的内容影响API请求）
-            html_preview = html_content[:200000] if len(html_content) > 200000 else html_content
-            if len(html_content) > 200000:
-                logger.warning(f"页面HTML内容过大，已截取前200000字符用于AI分析 (原始大小: {len(html_content)}字符)")
+                # 截取HTML内容（避免过大的内容影响API请求）
+                html_preview = html_content[:200000] if len(html_content) > 200000 else html_content
+                if len(html_content) > 200000:
+                    logger.warning(f"页面HTML内容过大，已截取前200000字符用于AI分析 (原始大小: {len(html_content)}字符)")
+                content_description = "页面的HTML内容"
+                xpath_rule = ""
 
             # 构建AI提示词
-            prompt = f"""你是一个资深的UI自动化测试工程师，你需要根据我给的html元素，找出登录用户名，密码，验证码，登录按钮的xpath，如果一个xpath对应多个元素，你需要精确到哪个元素，只需要输出json结果就行，如果没找到的话，对应的字段值设置为空就行，你只需要输出json结果，输出json格式为这样的{{
+            prompt = f"""你是一个资深的UI自动化测试工程师，你需要根据我给的html元素，找出登录用户名，密码，验证码，登录按钮的xpath，如果一个xpath对应多个元素，你需要精确到哪个元素，{xpath_rule}只需要输出json结果就行，如果没找到的话，对应的字段值设置为空就行，你只需要输出json结果，输出json格式为这样的{{
               "username_xpath": "//input[@placeholder='用户名']",
               "password_xpath": "//input[@placeholder='密码']",
               "captcha_xpath": "//input[@placeholder='验证码']",
               "login_button_xpath": "//button[@type='button' and contains(@class, 'ant-btn-primary')]"
             }}
             
-            以下是页面的HTML内容:
+            以下是{content_description}:
             {html_preview}
             """
 
@@ -1468,6 +1229,10 @@ class WebExplorer:
                             else:
                                 logger.info(f"- {key}: 未找到")
 
+                        # 识别结果能定位到元素时写入缓存
+                        if fingerprint and await self._login_xpaths_resolve(login_elements):
+                            self.login_locator_cache.put(fingerprint, login_elements, url=self.page.url)
+
                         return login_elements
                     except json.JSONDecodeError as e:
                         logger.error(f"JSON解析失败: {str(e)}")
@@ -1516,6 +1281,44 @@ class WebExplorer:
                 "login_button_xpath": ""
             }
 
+    async def _login_page_fingerprint(self) -> Optional[str]:
+        """
+        计算当前登录页面的结构指纹，由表单和表单控件的标签及关键属性哈希得到
+
+        Returns:
+            Optional[str]: 指纹，页面上没有任何表单控件或出错时返回None
+        """
+        try:
+            structure = await self.page.evaluate(LOGIN_FINGERPRINT_SCRIPT)
+        except Exception as e:
+            logger.warning(f"计算登录页面指纹时出错: {str(e)}")
+            return None
+        if not structure:
+            return None
+        return hashlib.sha256(structure.encode("utf-8")).hexdigest()
+
+    async def _login_xpaths_resolve(self, login_elements: Dict[str, str]) -> bool:
+        """
+        检查登录元素xpath是否都能在当前页面定位到可见元素
+
+        Args:
+            login_elements (Dict[str, str]): 登录元素xpath字典
+
+        Returns:
+            bool: 用户名、密码和登录按钮的xpath是否都能定位到元素
+        """
+        for key in ["username_xpath", "password_xpath", "login_button_xpath"]:
+            xpath = login_elements.get(key)
+            if not xpath:
+                return False
+            try:
+                element = await self.page.query_selector(xpath)
+                if not element or not await element.is_visible():
+                    return False
+            except Exception:
+                return False
+        return True
+
     async def _identify_login_elements_heuristic(self) -> Dict[str, str]:
         """
         使用启发式规则识别登录表单元素，无需调用OpenAI API
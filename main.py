@@ -11,13 +11,22 @@ import asyncio
 import os
 import sys
 import time
-from typing import Any, Dict, List, Optional, Tuple, Set
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Set
 import json
 import tempfile
 
+from config.settings import (EXPLORE_CONCURRENCY, GENERATION_PIPELINED, GENERATION_SHARDING, INCREMENTAL_ENABLED,
+                             LLM_STREAMING, RESOURCE_BLOCKING, SESSION_CACHE_ENABLED)
+from core.browser_pool import BrowserPool
+from core.page_snapshot_store import PageSnapshotStore
+from core.prompt_sharding import merge_shard_results
+from core.progress import STAGE_BROWSER_READY, STAGE_LOGIN_DONE, STAGE_PAGE_COLLECTED, ProgressReporter
+from core.tracing import Tracer, trace_span, traced_run
+from core.resource_filter import ResourceFilter
+from core.session_cache import SessionCache
 from core.web_explorer import WebExplorer
 from core.test_generator import TestGenerator
-from core.excel_exporter import ExcelExporter
+from core.excel_exporter import EXPORT_FORMATS, ExcelExporter
 from utils.logger import get_logger, console
 from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
@@ -36,7 +45,14 @@ async def run_web_explorer_on_multiple_urls(
         username: Optional[str] = None,
         password: Optional[str] = None,
         captcha: Optional[str] = None,
-        cookies: Optional[str] = None
+        cookies: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        ready_strategy: Optional[str] = None,
+        block_resources: Optional[bool] = None,
+        use_session_cache: Optional[bool] = None,
+        explore_depth: Optional[int] = None,
+        progress: Optional[ProgressReporter] = None,
+        on_page: Optional[Callable[[str, Dict[str, Any]], Any]] = None
 ) -> Dict[str, Dict[str, Any]]:
     """
     获取多个URL的页面信息
@@ -47,27 +63,164 @@ async def run_web_explorer_on_multiple_urls(
         password (Optional[str]): 密码
         captcha (Optional[str]): 验证码
         cookies (Optional[str]): Cookies字符串
+        concurrency (Optional[int]): 并发探索的URL数量，为None时使用配置文件中的EXPLORE_CONCURRENCY
+        ready_strategy (Optional[str]): 页面就绪等待策略，为None时使用配置文件中的PAGE_READY_STRATEGY
+        block_resources (Optional[bool]): 是否拦截图片、字体等重资源，为None时使用配置文件中的RESOURCE_BLOCKING
+        use_session_cache (Optional[bool]): 是否复用缓存的登录会话，为None时使用配置文件中的SESSION_CACHE_ENABLED
+        explore_depth (Optional[int]): 从每个URL出发探索同源链接的深度，为None时使用配置文件中的EXPLORE_DEPTH
+        progress (Optional[ProgressReporter]): 进度报告器，为None时不报告进度
+        on_page (Optional[Callable]): 每个URL探索完成时立即以(页面URL, 页面信息)回调其起始页面和探索发现的页面，
+            每个页面只回调一次，不必等待其余URL
 
     Returns:
-        Dict[str, Dict[str, Any]]: 多页面信息，以URL为键
+        Dict[str, Dict[str, Any]]: 多页面信息，以URL为键，顺序与输入URL一致，探索发现的页面紧随其起始URL
     """
-    all_results = {}
+    if concurrency is None:
+        concurrency = EXPLORE_CONCURRENCY
+    if block_resources is None:
+        block_resources = RESOURCE_BLOCKING
+
+    if use_session_cache is None:
+        use_session_cache = SESSION_CACHE_ENABLED
 
-    for url in urls:
-        console.print(f"[bold cyan]开始获取页面信息: {url}[/bold cyan]")
-        result = await run_web_explorer(url, username, password, captcha, cookies)
+    # 整个运行共享一个资源过滤器，便于汇总统计
+    resource_filter = ResourceFilter() if block_resources else None
+    session_cache = SessionCache() if use_session_cache and username and password else None
+
+    all_results = {}
+    announced: Set[str] = set()
+
+    # 串行模式：每个URL独立启动浏览器
+    if concurrency <= 1 or len(urls) <= 1:
+        for url in urls:
+            console.print(f"[bold cyan]开始获取页面信息: {url}[/bold cyan]")
+            result = await run_web_explorer(url, username, password, captcha, cookies, ready_strategy=ready_strategy,
+                                            resource_filter=resource_filter, session_cache=session_cache,
+                                            explore_depth=explore_depth, progress=progress)
+            if result:
+                _announce_pages(on_page, announced, url, result)
+                _add_page_result(all_results, url, result)
+
+        _print_resource_stats(resource_filter)
+        return all_results
+
+    # 并发模式：所有URL共享浏览器池，每个URL租用独立的浏览器上下文
+    console.print(f"[bold cyan]使用并发模式获取 {len(urls)} 个页面信息，并发数: {concurrency}[/bold cyan]")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with BrowserPool() as pool:
+
+        async def explore_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                console.print(f"[bold cyan]开始获取页面信息: {url}[/bold cyan]")
+                try:
+                    result = await run_web_explorer(url, username, password, captcha, cookies, pool=pool,
+                                                    ready_strategy=ready_strategy,
+                                                    resource_filter=resource_filter,
+                                                    session_cache=session_cache,
+                                                    explore_depth=explore_depth,
+                                                    progress=progress)
+                except Exception as e:
+                    # 单个URL的失败不影响其他URL
+                    logger.error(f"获取页面信息失败 ({url}): {str(e)}")
+                    return {}
+                if result:
+                    _announce_pages(on_page, announced, url, result)
+                return result
+
+        # gather按输入顺序返回结果
+        results = await asyncio.gather(*(explore_one(url) for url in urls))
+
+    for url, result in zip(urls, results):
         if result:
-            all_results[url] = result
+            _add_page_result(all_results, url, result)
 
+    _print_resource_stats(resource_filter)
     return all_results
 
 
+def _add_page_result(all_results: Dict[str, Dict[str, Any]], url: str, result: Dict[str, Any]) -> None:
+    """
+    记录一个URL的页面信息，并将探索发现的页面展开为独立的页面信息
+
+    Args:
+        all_results (Dict[str, Dict[str, Any]]): 多页面信息，以URL为键，原地修改
+        url (str): 起始URL
+        result (Dict[str, Any]): run_web_explorer 的返回值
+    """
+    entries = _page_entries(url, result)
+    all_results[url] = entries[0][1]
+    for crawled_url, page_result in entries[1:]:
+        # 多个起始URL可能发现同一页面，只保留第一次
+        if crawled_url not in all_results:
+            all_results[crawled_url] = page_result
+    if len(entries) > 1:
+        console.print(f"[bold cyan]从 {url} 探索发现 {len(entries) - 1} 个页面[/bold cyan]")
+
+
+def _page_entries(url: str, result: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    将一个URL的探索结果展开为起始页面和探索发现的各页面信息
+
+    Args:
+        url (str): 起始URL
+        result (Dict[str, Any]): run_web_explorer 的返回值，不会被修改
+
+    Returns:
+        List[Tuple[str, Dict[str, Any]]]: (页面URL, 页面信息)列表，第一项为起始页面
+    """
+    crawled_pages = result.get("crawled_pages") or {}
+    entries = [(url, {key: value for key, value in result.items() if key != "crawled_pages"})]
+    for crawled_url, page_info in crawled_pages.items():
+        entries.append((crawled_url, {"url": crawled_url, "page_info": page_info, "success": True}))
+    return entries
+
+
+def _announce_pages(on_page: Optional[Callable[[str, Dict[str, Any]], Any]], announced: Set[str],
+                    url: str, result: Dict[str, Any]) -> None:
+    """
+    以探索完成的顺序回调页面信息，多个起始URL发现的同一页面只回调一次
+
+    Args:
+        on_page (Optional[Callable]): 回调函数，为None时不回调
+        announced (Set[str]): 已回调的页面URL集合，原地更新
+        url (str): 起始URL
+        result (Dict[str, Any]): run_web_explorer 的返回值
+    """
+    if on_page is None:
+        return
+    for page_url, page_result in _page_entries(url, result):
+        if page_url not in announced:
+            announced.add(page_url)
+            on_page(page_url, page_result)
+
+
+def _print_resource_stats(resource_filter: Optional[ResourceFilter]) -> None:
+    """
+    输出本次运行的资源拦截统计
+
+    Args:
+        resource_filter (Optional[ResourceFilter]): 资源过滤器，为None时不输出
+    """
+    if resource_filter is None:
+        return
+
+    stats = resource_filter.stats()
+    logger.info(f"资源拦截统计: {json.dumps(stats, ensure_ascii=False)}")
+    if stats['estimated_saved_bytes'] is None:
+        saved_text = "节省的流量无法估算"
+    else:
+        saved_text = f"预计节省约 {stats['estimated_saved_bytes'] / 1024:.1f} KB 流量"
+    console.print(f"[bold cyan]已拦截 {stats['blocked_requests']} 个请求，{saved_text}[/bold cyan]")
+
+
 def run_web_explorer_on_multiple_urls_sync(
         urls: List[str],
         username: Optional[str] = None,
         password: Optional[str] = None,
         captcha: Optional[str] = None,
-        cookies: Optional[str] = None
+        cookies: Optional[str] = None,
+        progress: Optional[ProgressReporter] = None
 ) -> Dict[str, Dict[str, Any]]:
     """
     获取多个URL的页面信息(同步版本)
@@ -78,12 +231,87 @@ def run_web_explorer_on_multiple_urls_sync(
         password (Optional[str]): 密码
         captcha (Optional[str]): 验证码
         cookies (Optional[str]): Cookies字符串
+        progress (Optional[ProgressReporter]): 进度报告器，为None时不报告进度
 
     Returns:
         Dict[str, Dict[str, Any]]: 多页面信息，以URL为键
     """
     # 使用asyncio.run执行异步函数
-    return asyncio.run(run_web_explorer_on_multiple_urls(urls, username, password, captcha, cookies))
+    return asyncio.run(run_web_explorer_on_multiple_urls(urls, username, password, captcha, cookies, progress=progress))
+
+
+async def _login(
+        explorer: WebExplorer,
+        url: str,
+        username: Optional[str],
+        password: Optional[str],
+        captcha: Optional[str],
+        cookies: Optional[str],
+        use_ai_login: bool,
+        session_cache: Optional[SessionCache],
+        storage_state: Optional[Dict[str, Any]]
+) -> bool:
+    """
+    按提供的登录信息登录网页，需要账号密码登录时应持有该站点的登录锁
+
+    恢复的登录会话已由调用方验证失效；等待登录锁期间其他任务可能已登录并保存了新的会话，先重新读取缓存，
+    仍然无效时才换用全新的上下文执行完整登录
+
+    Args:
+        explorer (WebExplorer): 已初始化的浏览器
+        url (str): 要访问的网页URL
+        username (Optional[str]): 用户名
+        password (Optional[str]): 密码
+        captcha (Optional[str]): 验证码
+        cookies (Optional[str]): Cookies字符串
+        use_ai_login (bool): 是否使用AI智能识别登录元素
+        session_cache (Optional[SessionCache]): 登录会话缓存，为None时不读写缓存
+        storage_state (Optional[Dict[str, Any]]): 初始化浏览器时恢复且已验证失效的登录会话
+
+    Returns:
+        bool: 是否登录成功
+    """
+    if cookies:
+        console.print("[bold yellow]使用Cookies登录...[/bold yellow]")
+        return await explorer.login_with_cookies(url, cookies)
+
+    if not (username and password):
+        # 如果没有提供登录信息，直接访问URL
+        console.print("[bold yellow]无需登录，直接访问页面...[/bold yellow]")
+        return True
+
+    if session_cache is not None:
+        cached_state = session_cache.load(url, username)
+        if cached_state is not None and cached_state != storage_state:
+            # 等待登录锁期间其他任务已登录并保存了新的会话
+            await explorer.restart_context(storage_state=cached_state)
+            if await explorer.is_session_valid(url):
+                console.print("[bold yellow]使用同一站点刚保存的登录会话，跳过登录...[/bold yellow]")
+                return True
+            storage_state = cached_state
+
+    if storage_state:
+        # 缓存的会话已失效，删除缓存并换用全新的上下文，避免恢复的localStorage/sessionStorage影响登录
+        session_cache.invalidate(url, username)
+        await explorer.restart_context()
+
+    if use_ai_login:
+        # 确定是否使用OpenAI API
+        use_openai = os.getenv("OPENAI_API_KEY") is not None
+        if use_openai:
+            console.print("[bold yellow]使用OpenAI API识别登录元素进行登录...[/bold yellow]")
+        else:
+            console.print("[bold yellow]使用启发式规则识别登录元素进行登录...[/bold yellow]")
+
+        login_success = await explorer.login_with_ai_recognition(url, username, password, captcha, use_openai=use_openai)
+    else:
+        console.print("[bold yellow]使用常规方法登录...[/bold yellow]")
+        login_success = await explorer.login_with_credentials(url, username, password, captcha)
+
+    # 登录成功后保存会话，同一站点的其他URL和后续运行可以复用
+    if login_success and session_cache is not None:
+        session_cache.save(url, username, await explorer.context.storage_state())
+    return login_success
 
 
 async def run_web_explorer(
@@ -92,7 +320,13 @@ async def run_web_explorer(
         password: Optional[str] = None,
         captcha: Optional[str] = None,
         cookies: Optional[str] = None,
-        use_ai_login: bool = False
+        use_ai_login: bool = False,
+        pool: Optional[BrowserPool] = None,
+        ready_strategy: Optional[str] = None,
+        resource_filter: Optional[ResourceFilter] = None,
+        session_cache: Optional[SessionCache] = None,
+        explore_depth: Optional[int] = None,
+        progress: Optional[ProgressReporter] = None
 ) -> Dict[str, Any]:
     """
     获取指定URL的页面信息
@@ -104,46 +338,48 @@ async def run_web_explorer(
         captcha (Optional[str]): 验证码
         cookies (Optional[str]): Cookies字符串
         use_ai_login (bool): 是否使用AI智能识别登录元素
+        pool (Optional[BrowserPool]): 浏览器池，提供时从池中租用上下文，为None时单独启动浏览器
+        ready_strategy (Optional[str]): 页面就绪等待策略，为None时使用配置文件中的PAGE_READY_STRATEGY
+        resource_filter (Optional[ResourceFilter]): 资源过滤器，为None时不拦截任何请求
+        session_cache (Optional[SessionCache]): 登录会话缓存，为None时每次都执行完整登录
+        explore_depth (Optional[int]): 探索同源链接的深度，为None时使用配置文件中的EXPLORE_DEPTH
+        progress (Optional[ProgressReporter]): 进度报告器，为None时不报告进度
 
     Returns:
         Dict[str, Any]: 页面信息
     """
-    explorer = WebExplorer()
+    explorer = WebExplorer(ready_strategy=ready_strategy, resource_filter=resource_filter)
+
+    # 账号密码登录时复用之前保存的同一站点的登录会话；同一站点同时只有一个任务执行登录，其余等待后复用其会话
+    use_cache = session_cache is not None and bool(username and password) and not cookies
+    login_lock = session_cache.login_lock(url, username) if use_cache else asyncio.Lock()
 
     try:
+        storage_state = session_cache.load(url, username) if use_cache else None
+
         # 初始化浏览器
-        await explorer.initialize()
-
-        # 登录网页
-        login_success = False
-        if cookies:
-            console.print("[bold yellow]使用Cookies登录...[/bold yellow]")
-            login_success = await explorer.login_with_cookies(url, cookies)
-        elif username and password:
-            if use_ai_login:
-                # 确定是否使用OpenAI API
-                use_openai = os.getenv("OPENAI_API_KEY") is not None
-                if use_openai:
-                    console.print("[bold yellow]使用OpenAI API识别登录元素进行登录...[/bold yellow]")
-                else:
-                    console.print("[bold yellow]使用启发式规则识别登录元素进行登录...[/bold yellow]")
-
-                login_success = await explorer.login_with_ai_recognition(url, username, password, captcha, use_openai=use_openai)
-            else:
-                console.print("[bold yellow]使用常规方法登录...[/bold yellow]")
-                login_success = await explorer.login_with_credentials(url, username, password, captcha)
-        else:
-            # 如果没有提供登录信息，直接访问URL
-            console.print("[bold yellow]无需登录，直接访问页面...[/bold yellow]")
+        await explorer.initialize(pool=pool, storage_state=storage_state)
+        if progress:
+            progress.emit(STAGE_BROWSER_READY, "浏览器已就绪", url=url)
+
+        # 缓存的会话在登录锁外验证，同一站点的多个URL可以同时验证，只有需要登录时才排队
+        if storage_state and await explorer.is_session_valid(url):
+            console.print("[bold yellow]使用缓存的登录会话，跳过登录...[/bold yellow]")
             login_success = True
+        else:
+            async with login_lock:
+                login_success = await _login(explorer, url, username, password, captcha, cookies, use_ai_login,
+                                             session_cache if use_cache else None, storage_state)
 
         if not login_success:
             console.print("[bold red]登录失败，无法继续获取页面信息[/bold red]")
             return {"error": "登录失败", "success": False}
+        if progress:
+            progress.emit(STAGE_LOGIN_DONE, "登录完成" if username or cookies else "无需登录", url=url)
 
         # 获取页面信息
         console.print(f"[bold green]开始获取页面信息...[/bold green]")
-        page_result = await explorer.explore_page(url)
+        page_result = await explorer.explore_page(url, max_depth=explore_depth)
 
         # 检查是否成功
         if not page_result.get("success", False):
@@ -151,6 +387,9 @@ async def run_web_explorer(
             console.print(f"[bold red]获取页面信息失败: {error_msg}[/bold red]")
             return page_result
 
+        if progress:
+            pages = 1 + len(page_result.get("crawled_pages") or {})
+            progress.emit(STAGE_PAGE_COLLECTED, f"已获取页面信息: {url}", url=url, pages=pages)
         return page_result
 
     except Exception as e:
@@ -230,7 +469,9 @@ def load_multiple_requirements(requirements_files: List[str]) -> Dict[str, str]:
     return requirements_dict
 
 
-def generate_test_cases(page_data: Dict[str, Dict[str, Any]], requirements: Dict[str, str], include_old: bool = False) -> List[Dict[str, Any]]:
+def generate_test_cases(page_data: Dict[str, Dict[str, Any]], requirements: Dict[str, str], include_old: bool = False,
+                        sharded: Optional[bool] = None, use_llm_cache: Optional[bool] = None,
+                        progress: Optional[ProgressReporter] = None) -> List[Dict[str, Any]]:
     """
     生成测试用例
 
@@ -238,11 +479,21 @@ def generate_test_cases(page_data: Dict[str, Dict[str, Any]], requirements: Dict
         page_data (Dict[str, Dict[str, Any]]): 页面数据，以URL为键
         requirements (Dict[str, str]): 需求文档内容，以文件名为键
         include_old (bool): 是否包含旧功能的测试用例
+        sharded (Optional[bool]): 是否分片并行生成，为None时使用配置文件中的GENERATION_SHARDING
+        use_llm_cache (Optional[bool]): 是否使用AI响应缓存，为None时使用配置文件中的LLM_CACHE_ENABLED
+        progress (Optional[ProgressReporter]): 进度报告器，为None时不报告进度
 
     Returns:
         List[Dict[str, Any]]: 生成的测试用例列表
     """
-    generator = TestGenerator()
+    if sharded is None:
+        sharded = GENERATION_SHARDING
+    if sharded:
+        # 分片生成依赖异步并发
+        return asyncio.run(generate_test_cases_async(page_data, requirements, include_old, sharded=True,
+                                                     use_llm_cache=use_llm_cache, progress=progress))
+
+    generator = TestGenerator(use_cache=use_llm_cache, progress=progress)
     
     # 生成测试用例
     test_cases = generator.generate_test_cases_from_multiple_sources(page_data, requirements, include_old)
@@ -250,9 +501,79 @@ def generate_test_cases(page_data: Dict[str, Dict[str, Any]], requirements: Dict
     return test_cases
 
 
-def export_to_excel(test_cases: List[Dict[str, Any]], urls: List[str], requirement_files: List[str], output_filename: Optional[str] = None, output_dir: Optional[str] = None) -> str:
+async def generate_test_cases_async(page_data: Dict[str, Dict[str, Any]], requirements: Dict[str, str], include_old: bool = False,
+                                    sharded: Optional[bool] = None, use_llm_cache: Optional[bool] = None,
+                                    on_test_case: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                                    incremental: Optional[bool] = None,
+                                    progress: Optional[ProgressReporter] = None) -> List[Dict[str, Any]]:
+    """
+    生成测试用例（异步版本，等待API响应期间不阻塞事件循环）
+
+    Args:
+        page_data (Dict[str, Dict[str, Any]]): 页面数据，以URL为键
+        requirements (Dict[str, str]): 需求文档内容，以文件名为键
+        include_old (bool): 是否包含旧功能的测试用例
+        sharded (Optional[bool]): 是否分片并行生成，为None时使用配置文件中的GENERATION_SHARDING
+        use_llm_cache (Optional[bool]): 是否使用AI响应缓存，为None时使用配置文件中的LLM_CACHE_ENABLED
+        on_test_case (Optional[Callable]): 提供时使用流式响应，每解析出一个测试用例立即回调
+        incremental (Optional[bool]): 是否只为结构变化的页面重新生成，为None时使用配置文件中的INCREMENTAL_ENABLED
+        progress (Optional[ProgressReporter]): 进度报告器，流式生成时报告接收的token数和解析出的测试用例
+
+    Returns:
+        List[Dict[str, Any]]: 生成的测试用例列表
+    """
+    if sharded is None:
+        sharded = GENERATION_SHARDING
+    if incremental is None:
+        incremental = INCREMENTAL_ENABLED
+
+    generator = TestGenerator(use_cache=use_llm_cache, progress=progress)
+    
+    # 生成测试用例
+    if incremental:
+        # 增量模式下每个变化的页面单独生成，本身就是按页面分片并行
+        test_cases = await generator.generate_test_cases_incremental_async(page_data, requirements, include_old,
+                                                                           on_test_case=on_test_case)
+    elif sharded:
+        test_cases = await generator.generate_test_cases_sharded_async(page_data, requirements, include_old,
+                                                                       on_test_case=on_test_case)
+    else:
+        test_cases = await generator.generate_test_cases_from_multiple_sources_async(page_data, requirements, include_old,
+                                                                                     on_test_case=on_test_case)
+    
+    return test_cases
+
+
+def _print_streamed_test_case(test_case: Dict[str, Any]) -> None:
+    """
+    流式生成时输出刚解析出的测试用例
+
+    Args:
+        test_case (Dict[str, Any]): 测试用例
+    """
+    console.print(f"[cyan]已生成测试用例 {test_case.get('test_id', '')}: {test_case.get('test_title', '')}[/cyan]")
+
+
+def _print_run_report(tracer: Optional[Tracer]) -> None:
     """
-    将测试用例导出到Excel文件
+    输出本次运行耗时最多的阶段和运行报告路径
+
+    Args:
+        tracer (Optional[Tracer]): 追踪器，未启用追踪时为None
+    """
+    if tracer is None or not tracer.report_path:
+        return
+
+    report = tracer.report()
+    console.print(f"[bold cyan]总耗时 {report['total_ms'] / 1000:.1f} 秒，峰值内存 {report['peak_rss_mb']} MB[/bold cyan]")
+    for name, stats in list(report["summary"].items())[1:6]:
+        console.print(f"[cyan]  {name}: {stats['total_ms'] / 1000:.2f} 秒（{stats['count']} 次）[/cyan]")
+    console.print(f"[bold cyan]运行报告已保存: {tracer.report_path}[/bold cyan]")
+
+
+def export_to_excel(test_cases: List[Dict[str, Any]], urls: List[str], requirement_files: List[str], output_filename: Optional[str] = None, output_dir: Optional[str] = None, export_format: Optional[str] = None) -> str:
+    """
+    将测试用例导出到Excel文件，或按 export_format 导出为JSONL、CSV、Parquet文件
 
     Args:
         test_cases (List[Dict[str, Any]]): 测试用例列表
@@ -260,11 +581,12 @@ def export_to_excel(test_cases: List[Dict[str, Any]], urls: List[str], requireme
         requirement_files (List[str]): 需求文档文件路径列表
         output_filename (Optional[str]): 输出文件名
         output_dir (Optional[str]): 输出目录
+        export_format (Optional[str]): 导出格式，为None时使用配置文件中的EXPORT_FORMAT
 
     Returns:
-        str: 导出的Excel文件路径
+        str: 导出的文件路径
     """
-    exporter = ExcelExporter(output_dir)
+    exporter = ExcelExporter(output_dir, export_format=export_format)
     
     # 准备元数据
     metadata = {
@@ -276,7 +598,12 @@ def export_to_excel(test_cases: List[Dict[str, Any]], urls: List[str], requireme
     # 导出测试用例
     output_path = exporter.export_test_cases(test_cases, output_filename, metadata=metadata)
     
-    console.print(f"[bold green]测试用例已导出为Excel文件: {output_path}[/bold green]")
+    if not output_path:
+        console.print("[bold red]测试用例导出失败，详见日志[/bold red]")
+    elif exporter.export_format == "xlsx":
+        console.print(f"[bold green]测试用例已导出为Excel文件: {output_path}[/bold green]")
+    else:
+        console.print(f"[bold green]测试用例已导出为{exporter.export_format.upper()}文件: {output_path}[/bold green]")
     
     return output_path
 
@@ -333,6 +660,19 @@ def get_user_input() -> Tuple[List[str], Optional[str], Optional[str], Optional[
     return urls, username, password, captcha, cookies, requirements, include_old, use_ai_login
 
 
+async def _cancel_tasks(tasks: Iterable[asyncio.Task]) -> None:
+    """
+    取消尚未完成的任务并等待其结束，已完成的任务不受影响
+
+    Args:
+        tasks (Iterable[asyncio.Task]): 任务列表
+    """
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
 async def main_async(
     urls: List[str],
     username: Optional[str] = None,
@@ -345,7 +685,18 @@ async def main_async(
     output_filename: Optional[str] = None,
     output_dir: Optional[str] = None,
     show_browser: bool = False,
-    use_ai_login: bool = False
+    use_ai_login: bool = False,
+    concurrency: Optional[int] = None,
+    ready_strategy: Optional[str] = None,
+    block_resources: Optional[bool] = None,
+    use_session_cache: Optional[bool] = None,
+    sharded: Optional[bool] = None,
+    use_llm_cache: Optional[bool] = None,
+    stream: Optional[bool] = None,
+    incremental: Optional[bool] = None,
+    explore_depth: Optional[int] = None,
+    export_format: Optional[str] = None,
+    pipelined: Optional[bool] = None
 ) -> None:
     """
     主异步函数
@@ -363,6 +714,17 @@ async def main_async(
         output_dir (Optional[str], optional): 输出目录. Defaults to None.
         show_browser (bool, optional): 是否显示浏览器. Defaults to False.
         use_ai_login (bool, optional): 是否使用AI智能识别登录元素. Defaults to False.
+        concurrency (Optional[int], optional): 并发探索的URL数量. Defaults to None.
+        ready_strategy (Optional[str], optional): 页面就绪等待策略. Defaults to None.
+        block_resources (Optional[bool], optional): 是否拦截图片、字体等重资源. Defaults to None.
+        use_session_cache (Optional[bool], optional): 是否复用缓存的登录会话. Defaults to None.
+        sharded (Optional[bool], optional): 是否分片并行生成测试用例. Defaults to None.
+        use_llm_cache (Optional[bool], optional): 是否使用AI响应缓存. Defaults to None.
+        stream (Optional[bool], optional): 是否使用流式响应，边生成边输出测试用例. Defaults to None.
+        incremental (Optional[bool], optional): 是否只为结构变化的页面重新生成测试用例. Defaults to None.
+        explore_depth (Optional[int], optional): 从每个URL出发探索同源链接的深度. Defaults to None.
+        export_format (Optional[str], optional): 导出格式，xlsx、jsonl、csv或parquet. Defaults to None.
+        pipelined (Optional[bool], optional): 是否每探索完一个页面立即为其单独生成测试用例. Defaults to None.
     """
     # 如果提供了API密钥，设置环境变量
     if api_key:
@@ -372,25 +734,69 @@ async def main_async(
     if show_browser:
         os.environ["HEADLESS"] = "false"
     
-    # 获取页面信息
-    page_data = await run_web_explorer_on_multiple_urls(
-        urls,
-        username=username,
-        password=password,
-        captcha=captcha,
-        cookies=cookies
-    )
-    
-    if not page_data:
-        console.print("[bold red]没有获取到任何页面信息，无法生成测试用例[/bold red]")
-        return
-    
-    # 生成测试用例
     if requirements is None:
         requirements = {}
+    if stream is None:
+        stream = LLM_STREAMING
+    if pipelined is None:
+        pipelined = GENERATION_PIPELINED
+    if incremental is None:
+        incremental = INCREMENTAL_ENABLED
+    on_test_case = _print_streamed_test_case if stream else None
+    
+    # 流水线模式：每个页面探索完成后立即开始为其生成测试用例，与其余URL的探索重叠，并发数受LLM_CONCURRENCY限制
+    page_tasks: Dict[str, asyncio.Task] = {}
+    on_page: Optional[Callable[[str, Dict[str, Any]], Any]] = None
+    if pipelined:
+        generator = TestGenerator(use_cache=use_llm_cache)
+        snapshot_store = PageSnapshotStore() if incremental else None
+        
+        def start_page_generation(page_url: str, page_result: Dict[str, Any]) -> None:
+            page_tasks[page_url] = asyncio.create_task(generator.generate_test_cases_for_page_async(
+                page_url, page_result, requirements, include_old,
+                on_test_case=on_test_case, snapshot_store=snapshot_store
+            ))
+        
+        on_page = start_page_generation
+        console.print("[bold cyan]使用流水线模式，每探索完一个页面立即开始生成测试用例[/bold cyan]")
     
-    console.print("[bold green]正在生成测试用例...[/bold green]")
-    test_cases = generate_test_cases(page_data, requirements, include_old)
+    try:
+        # 获取页面信息
+        with trace_span("explore", urls=len(urls)):
+            page_data = await run_web_explorer_on_multiple_urls(
+                urls,
+                username=username,
+                password=password,
+                captcha=captcha,
+                cookies=cookies,
+                concurrency=concurrency,
+                ready_strategy=ready_strategy,
+                block_resources=block_resources,
+                use_session_cache=use_session_cache,
+                explore_depth=explore_depth,
+                on_page=on_page
+            )
+        
+        if not page_data:
+            console.print("[bold red]没有获取到任何页面信息，无法生成测试用例[/bold red]")
+            return
+        
+        # 生成测试用例
+        console.print("[bold green]正在生成测试用例...[/bold green]")
+        with trace_span("generate", pages=len(page_data)) as span:
+            if pipelined:
+                # 按页面顺序等待各页面的生成结果，合并并重新编号test_id
+                page_results = await asyncio.gather(*(page_tasks[url] for url in page_data))
+                test_cases = merge_shard_results(list(page_results))
+            else:
+                test_cases = await generate_test_cases_async(page_data, requirements, include_old, sharded=sharded,
+                                                             use_llm_cache=use_llm_cache,
+                                                             on_test_case=on_test_case,
+                                                             incremental=incremental)
+            span.set(test_cases=len(test_cases))
+    finally:
+        # 探索出错、没有获取到页面信息或某个页面生成失败时，取消流水线中其余未完成的生成任务
+        await _cancel_tasks(page_tasks.values())
     
     if not test_cases:
         console.print("[bold red]未能生成任何测试用例[/bold red]")
@@ -400,7 +806,7 @@ async def main_async(
     
     # 导出为Excel
     requirement_files = list(requirements.keys()) if requirements else []
-    export_to_excel(test_cases, urls, requirement_files, output_filename, output_dir)
+    export_to_excel(test_cases, urls, requirement_files, output_filename, output_dir, export_format)
 
 
 def main():
@@ -420,7 +826,7 @@ def main():
     try:
         # 命令行参数解析
         parser = argparse.ArgumentParser(description='AI辅助测试用例生成工具')
-        parser.add_argument('--url', type=str, help='网页URL')
+        parser.add_argument('--url', type=str, help='网页URL，多个URL以逗号分隔')
         parser.add_argument('--username', type=str, help='登录用户名')
         parser.add_argument('--password', type=str, help='登录密码')
         parser.add_argument('--captcha', type=str, help='验证码')
@@ -428,12 +834,32 @@ def main():
         parser.add_argument('--requirements', type=str, help='需求文档路径，多个文件以逗号分隔')
         parser.add_argument('--output', type=str, help='输出Excel文件名')
         parser.add_argument('--output-dir', type=str, help='输出目录')
+        parser.add_argument('--format', type=str, choices=EXPORT_FORMATS, dest='export_format',
+                            help='导出格式，默认读取配置EXPORT_FORMAT；jsonl、csv、parquet另外生成包含分组和元数据的.meta.json文件')
         parser.add_argument('--api-key', type=str, help='OpenAI API密钥')
         parser.add_argument('--include-old', action='store_true', help='包含旧特性')
         parser.add_argument('--interactive', action='store_true', help='交互模式')
         parser.add_argument('--show', type=str, choices=['true', 'false'], help='是否显示浏览器操作过程')
         parser.add_argument('--login-url', type=str, help='登录页面URL')
         parser.add_argument('--use-ai-login', action='store_true', help='使用AI识别登录元素')
+        parser.add_argument('--concurrency', type=int, help='多URL并发探索数，默认读取配置EXPLORE_CONCURRENCY')
+        parser.add_argument('--depth', type=int, help='从每个URL出发探索同源链接的深度，0表示只访问该页面，默认读取配置EXPLORE_DEPTH')
+        parser.add_argument('--wait-strategy', type=str, choices=['dom', 'network', 'fixed'],
+                            help='页面就绪等待策略，默认读取配置PAGE_READY_STRATEGY')
+        parser.add_argument('--block-resources', action='store_true', default=None,
+                            help='拦截图片、字体、媒体和统计脚本等重资源，默认读取配置RESOURCE_BLOCKING')
+        parser.add_argument('--session-cache', action='store_true', default=None,
+                            help='账号密码登录成功后缓存登录会话，之后同一站点跳过登录，默认读取配置SESSION_CACHE_ENABLED')
+        parser.add_argument('--no-session-cache', action='store_true', help='不复用缓存的登录会话，强制完整登录')
+        parser.add_argument('--sharded', action='store_true', default=None,
+                            help='将页面数据和需求文档按token预算分片并行生成测试用例，默认读取配置GENERATION_SHARDING')
+        parser.add_argument('--no-llm-cache', action='store_true', help='不使用缓存的AI响应，强制重新调用API')
+        parser.add_argument('--stream', action='store_true', default=None,
+                            help='使用流式响应，每解析出一个测试用例立即输出，默认读取配置LLM_STREAMING')
+        parser.add_argument('--incremental', action='store_true', default=None,
+                            help='与上次运行的页面快照比较，只为结构变化的页面重新生成测试用例，默认读取配置INCREMENTAL_ENABLED')
+        parser.add_argument('--pipeline', action='store_true', default=None,
+                            help='每探索完一个页面立即为其单独生成测试用例，与其余页面的探索重叠，默认读取配置GENERATION_PIPELINED')
         parser.add_argument('--web', action='store_true', help='启动Web界面')
         args = parser.parse_args()
         
@@ -448,7 +874,7 @@ def main():
             urls, username, password, captcha, cookies, requirements, include_old, use_ai_login = get_user_input()
         else:
             # 从命令行参数获取
-            urls = [args.url] if args.url else []
+            urls = [url.strip() for url in args.url.split(",") if url.strip()] if args.url else []
             username = args.username
             password = args.password
             captcha = args.captcha
@@ -466,21 +892,34 @@ def main():
             
             include_old = args.include_old
         
-        # 运行异步主函数
-        asyncio.run(main_async(
-            urls=urls,
-            username=username,
-            password=password,
-            captcha=captcha,
-            cookies=cookies,
-            requirements=requirements,
-            include_old=include_old,
-            api_key=args.api_key,
-            output_filename=args.output,
-            output_dir=args.output_dir,
-            show_browser=args.show == 'true' if args.show else False,
-            use_ai_login=use_ai_login
-        ))
+        # 运行异步主函数，事件循环中的任务继承本次运行的追踪器
+        with traced_run("cli", urls=urls) as tracer:
+            asyncio.run(main_async(
+                urls=urls,
+                username=username,
+                password=password,
+                captcha=captcha,
+                cookies=cookies,
+                requirements=requirements,
+                include_old=include_old,
+                api_key=args.api_key,
+                output_filename=args.output,
+                output_dir=args.output_dir,
+                show_browser=args.show == 'true' if args.show else False,
+                use_ai_login=use_ai_login,
+                concurrency=args.concurrency,
+                ready_strategy=args.wait_strategy,
+                block_resources=args.block_resources,
+                use_session_cache=False if args.no_session_cache else args.session_cache,
+                sharded=args.sharded,
+                use_llm_cache=False if args.no_llm_cache else None,
+                stream=args.stream,
+                incremental=args.incremental,
+                explore_depth=args.depth,
+                export_format=args.export_format,
+                pipelined=args.pipeline
+            ))
+        _print_run_report(tracer)
     
     except Exception as e:
         logger.error(f"程序运行过程中出错: {str(e)}")
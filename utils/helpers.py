@@ -151,4 +151,25 @@ def parse_cookies(url: str, cookie_str: str):
                 "path": "/"
             })
 
-    return cookies
\ No newline at end of file
+    return cookies
+
+# 中日韩文字及全角标点，分词器通常每个字符编码为约一个token
+_CJK_PATTERN = re.compile(r'[　-〿㐀-䶿一-鿿豈-﫿＀-￯]')
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的token数
+    
+    不依赖具体模型的分词器：中日韩字符按每字符一个token计算，其余字符按每4个字符一个token计算，
+    结果略偏保守，用于控制提示信息大小
+    
+    Args:
+        text (str): 文本
+    
+    Returns:
+        int: 估算的token数
+    """
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4